@@ -1,5 +1,6 @@
 import ply.lex as lex
 import sys
+import plycache
 
 # Palavras reservadas
 reserved = ['AND', 'ARRAY', 'BEGIN', 'CONST', 'DIV', 'DO', 'DOWNTO', 'ELSE', 'END', 'FOR', 'FUNCTION', 'IF', 
@@ -59,7 +60,8 @@ def t_newline(t):
     t.lexer.lineno += len(t.value)
 
 def t_error(t):
-    print(f"Linha {t.lineno}: caractere ilegal '{t.value[0]}'")
+    t.lexer.errors.append(f"Linha {t.lineno}: caractere ilegal '{t.value[0]}'")
     t.lexer.skip(1)
 
-lexer = lex.lex(reflags=lex.re.IGNORECASE) #Pascal é case insensitive
\ No newline at end of file
+lexer = plycache.build_lexer(sys.modules[__name__], reflags=lex.re.IGNORECASE) #Pascal é case insensitive
+lexer.errors = []
@@ -0,0 +1,104 @@
+import re
+from functools import partial
+
+from analex import tokens, literals, reserved
+
+# Lexer escrito à mão para os tokens de analex.py, alternativa mais rápida ao
+# lexer PLY (parser.parse(..., fast_lexer=True) ou compilador.py --lexer-rapido).
+#
+# Uma só expressão regular sem IGNORECASE (as regras já aceitam maiúsculas e
+# minúsculas) reconhece também espaços, mudanças de linha e literais; o grupo
+# que casou (lastindex) diz o tipo. As palavras reservadas vêm de um dict em
+# vez da procura linear na lista 'reserved'.
+#
+# Produz os mesmos tokens, valores, linhas, posições e erros que analex.lexer
+# e tem a interface que o yacc usa (input, token, lineno, lexpos, lexdata).
+
+ID, REAL, INT, OP, COMMENT, LITERAL, NEWLINE, CHAR, STRING, ILLEGAL = range(1, 11)
+
+# Os grupos estão pela frequência dos tokens, com as restrições de ordem das
+# regras do PLY (REAL antes de INT, CHAR antes de STRING, '..' ':=' '(*'
+# antes dos literais). Os espaços antes de cada token entram no mesmo match e
+# o último grupo apanha qualquer outro carácter, para que finditer percorra o
+# texto sem saltos.
+SCANNER = re.compile(r'[ \t]*(?:' + '|'.join((
+    r'([A-Za-z][A-Za-z0-9]*)',
+    r'(\d+(?:\.\d+(?:[eE][+-]?\d+)?|[eE][+-]?\d+))',
+    r'(\d+)',
+    r'(<>|<=|>=|:=|\.\.|<|>)',
+    r'(\{[^}]*\}|\(\*[^*]*\*\))',
+    '([' + re.escape(''.join(literals)) + '])',
+    r'(\n+)',
+    r"('[^'\n]')",
+    r"('(?:[^'\n]|'')*')",
+    r'(.)',
+)) + ')')
+
+KEYWORDS = {word: word for word in reserved}
+OPERATORS = {'<>': 'NE', '<=': 'LE', '>=': 'GE', ':=': 'ASSIGN', '..': 'DOTDOT', '<': 'LT', '>': 'GT'}
+
+assert set(OPERATORS.values()) | set(KEYWORDS) <= set(tokens)
+
+
+class Token:
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    # igual ao LexToken do PLY, para as mensagens de erro sintático
+    def __str__(self):
+        return 'LexToken(%s,%r,%d,%d)' % (self.type, self.value, self.lineno, self.lexpos)
+
+    __repr__ = __str__
+
+
+class FastLexer:
+    def __init__(self):
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lineno = 1
+        self.errors = []
+        self.token = partial(next, iter(()), None)
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        # token() é o next() do gerador: sem chamada de método por token
+        self.token = partial(next, self._scan(data), None)
+
+    def _scan(self, data):
+        keywords = KEYWORDS
+        operators = OPERATORS
+        lineno = self.lineno
+        for m in SCANNER.finditer(data):
+            kind = m.lastindex
+            if kind is None:
+                continue           # espaços no fim do texto
+            start, self.lexpos = m.span(kind)
+            text = m[kind]
+            if kind == ID:
+                yield Token(keywords.get(text.upper(), 'ID'), text, lineno, start)
+            elif kind == LITERAL:
+                yield Token(text, text, lineno, start)
+            elif kind == NEWLINE:
+                lineno = self.lineno = lineno + len(text)
+            elif kind == INT:
+                yield Token('INT', int(text), lineno, start)
+            elif kind == OP:
+                yield Token(operators[text], text, lineno, start)
+            elif kind == REAL:
+                yield Token('REAL', float(text), lineno, start)
+            elif kind == STRING:
+                yield Token('STRING', text[1:-1].replace("''", "'"), lineno, start)
+            elif kind == CHAR:
+                yield Token('CHAR', text[1:-1], lineno, start)
+            elif kind == ILLEGAL:
+                self.errors.append(f"Linha {lineno}: caractere ilegal '{text}'")
+        self.lexpos = len(data) + 1   # como o PLY
+
+
+lexer = FastLexer()
@@ -0,0 +1,140 @@
+import io
+import re
+import sys
+from typing import Iterator, List, Tuple
+
+import analex
+
+# Análise léxica em streaming: lê o texto em blocos (de um ficheiro, de um
+# objeto ficheiro ou de uma string) e produz tuplos compactos
+#
+#   (tipo, valor, linha, posição)
+#
+# com os mesmos tipos, valores e linhas que o lexer PLY de analex.py, mas
+# sem guardar o texto inteiro nem criar um LexToken por token: a memória
+# usada não depende do tamanho do ficheiro.
+#
+# As expressões regulares vêm das regras de analex.py (mesma ordem que o PLY
+# usa: primeiro as funções pela ordem em que estão definidas, depois as
+# strings da mais longa para a mais curta).
+
+Token = Tuple[str, object, int, int]
+
+CHUNK_SIZE = 1 << 16
+
+FUNCTION_RULES = ('COMMENT', 'REAL', 'INT', 'CHAR', 'STRING', 'ID', 'newline')
+STRING_RULES = sorted(('GT', 'LT', 'NE', 'LE', 'GE', 'ASSIGN', 'DOTDOT'),
+                      key=lambda name: len(getattr(analex, 't_' + name)), reverse=True)
+
+
+def _master_regex():
+    parts = []
+    for name in FUNCTION_RULES:
+        parts.append(f"(?P<{name}>{getattr(analex, 't_' + name).__doc__})")
+    for name in STRING_RULES:
+        parts.append(f"(?P<{name}>{getattr(analex, 't_' + name)})")
+    return re.compile('|'.join(parts), re.IGNORECASE)
+
+
+MASTER = _master_regex()
+RESERVED = frozenset(analex.reserved)
+LITERALS = frozenset(analex.literals)
+IGNORE = analex.t_ignore
+# comentários e strings que podem continuar no bloco seguinte: abertura -> fecho
+OPENERS = {'{': '}', '(*': '*)', "'": '\n'}
+# um token que acabe a menos disto do fim do bloco pode ainda crescer
+# ('3' -> '3.2', '3.2' -> '3.2e+5', ':' -> ':=')
+LOOKAHEAD = 4
+
+
+class StreamLexer:
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.errors: List[str] = []
+        self.lineno = 1
+
+    def tokens(self, source) -> Iterator[Token]:
+        """source: texto ou objeto com read() (ficheiro aberto em modo texto)."""
+        if isinstance(source, str):
+            source = io.StringIO(source)
+        self.lineno = 1
+        self.errors = []
+        match = MASTER.match
+        reserved = RESERVED
+        literals = LITERALS
+        ignore = IGNORE
+        read = source.read
+        size = self.chunk_size
+
+        buf = ''
+        base = 0       # posição no texto do início de buf
+        eof = False
+        while True:
+            if not eof:
+                chunk = read(size)
+                if chunk:
+                    buf += chunk
+                else:
+                    eof = True
+            n = len(buf)
+            limit = n if eof else n - LOOKAHEAD
+            pos = 0
+            while pos < limit:
+                c = buf[pos]
+                if c in ignore:
+                    pos += 1
+                    continue
+                m = match(buf, pos)
+                if m is not None:
+                    end = m.end()
+                    if end > limit:
+                        break          # o token pode continuar no bloco seguinte
+                    kind = m.lastgroup
+                    text = m.group()
+                    if kind == 'newline':
+                        self.lineno += len(text)
+                    elif kind == 'COMMENT':
+                        pass
+                    elif kind == 'ID':
+                        upper = text.upper()
+                        yield (upper if upper in reserved else 'ID'), text, self.lineno, base + pos
+                    elif kind == 'INT':
+                        yield 'INT', int(text), self.lineno, base + pos
+                    elif kind == 'REAL':
+                        yield 'REAL', float(text), self.lineno, base + pos
+                    elif kind == 'STRING':
+                        yield 'STRING', text[1:-1].replace("''", "'"), self.lineno, base + pos
+                    elif kind == 'CHAR':
+                        yield 'CHAR', text[1:-1], self.lineno, base + pos
+                    else:
+                        yield kind, text, self.lineno, base + pos
+                    pos = end
+                    continue
+                if not eof:
+                    closer = OPENERS.get(buf[pos:pos + 2] if c == '(' else c)
+                    if closer and buf.find(closer, pos + 1) < 0:
+                        break          # comentário ou string por fechar
+                if c in literals:
+                    yield c, c, self.lineno, base + pos
+                else:
+                    self.errors.append(f"Linha {self.lineno}: caractere ilegal '{c}'")
+                pos += 1
+            if eof and pos >= n:
+                return
+            base += pos
+            buf = buf[pos:]
+
+
+def tokenize(source, chunk_size=CHUNK_SIZE) -> Iterator[Token]:
+    return StreamLexer(chunk_size).tokens(source)
+
+
+def tokenize_file(path, chunk_size=CHUNK_SIZE) -> Iterator[Token]:
+    with open(path, encoding='utf-8') as f:
+        yield from StreamLexer(chunk_size).tokens(f)
+
+
+if __name__ == '__main__':
+    # uso: python analex_stream.py programa.txt   (um token por linha)
+    for tok in tokenize_file(sys.argv[1]):
+        print(tok)
@@ -1,17 +1,24 @@
 class Node:
-    pass
+    # sem __dict__: os programas grandes têm centenas de milhares de nós.
+    # line/col (posição no texto fonte) são preenchidos pelo parser; os nós
+    # criados pelas otimizações podem não os ter (usar getattr).
+    __slots__ = ('line', 'col')
 
 #
 # Programa e bloco
 #
 
 class Program(Node):
+    __slots__ = ('name', 'params', 'block', 'analyzed')
+
     def __init__(self, name, params, block):
         self.name = name
         self.params = params or []
         self.block = block
 
 class Block(Node):
+    __slots__ = ('consts', 'procsfuncs', 'vars', 'compound')
+
     def __init__(self, consts, procsfuncs, vars, compound):
         self.consts = consts      # lista de ConstDecl
         self.procsfuncs = procsfuncs  # lista de Proc / Func
@@ -24,22 +31,30 @@ class Block(Node):
 #
 
 class ConstDecl(Node):
+    __slots__ = ('name', 'value')
+
     def __init__(self, name, value):
         self.name = name
         self.value = value  # Constant node
 
 class VarDecl(Node):
+    __slots__ = ('names', 'type')
+
     def __init__(self, names, type_):
         self.names = names      # lista de strings
         self.type = type_       # Type node
 
 class Proc(Node):
+    __slots__ = ('name', 'params', 'block', 'sym')
+
     def __init__(self, name, params, block):
         self.name = name
         self.params = params or []
         self.block = block
 
 class Func(Node):
+    __slots__ = ('name', 'params', 'rettype', 'block', 'sym')
+
     def __init__(self, name, params, rettype, block):
         self.name = name
         self.params = params or []
@@ -47,6 +62,8 @@ class Func(Node):
         self.block = block
 
 class Param(Node):
+    __slots__ = ('names', 'type', 'byref')
+
     def __init__(self, names, type_, byref=False):
         self.names = names
         self.type = type_
@@ -58,19 +75,27 @@ class Param(Node):
 #
 
 class Type(Node):
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name  # ID ou tipo novo
 
 class EnumeratedType(Node):
+    __slots__ = ('elems',)
+
     def __init__(self, elems):
         self.elems = elems  # lista de IDs
 
 class SubrangeType(Node):
+    __slots__ = ('low', 'high')
+
     def __init__(self, low, high):
         self.low = low      # Constant
         self.high = high
 
 class ArrayType(Node):
+    __slots__ = ('ordinals', 'elemtype')
+
     def __init__(self, ordinals, elemtype):
         self.ordinals = ordinals      # lista de ordinal_types
         self.elemtype = elemtype      # Type node
@@ -81,26 +106,36 @@ class ArrayType(Node):
 #
 
 class BinOp(Node):
+    __slots__ = ('op', 'left', 'right', 'etype')
+
     def __init__(self, op, left, right):
         self.op = op
         self.left = left
         self.right = right
 
 class UnOp(Node):
+    __slots__ = ('op', 'expr', 'etype')
+
     def __init__(self, op, expr):
         self.op = op
         self.expr = expr
 
 class Literal(Node):
+    __slots__ = ('value', 'etype')
+
     def __init__(self, value):
         self.value = value
 
 class VarAccess(Node):
+    __slots__ = ('name', 'suffixes', 'etype', 'sym')
+
     def __init__(self, name, suffixes):
         self.name = name
         self.suffixes = suffixes  # lista de expr-lists para índices
 
 class Call(Node):
+    __slots__ = ('name', 'args', 'etype', 'sym')
+
     def __init__(self, name, args):
         self.name = name
         self.args = args or []
@@ -111,26 +146,36 @@ class Call(Node):
 #
 
 class CompoundStatement(Node):
+    __slots__ = ('statements',)
+
     def __init__(self, statements):
         self.statements = statements or []
 
 class Assign(Node):
+    __slots__ = ('target', 'expr')
+
     def __init__(self, target, expr):
         self.target = target
         self.expr = expr
 
 class If(Node):
+    __slots__ = ('cond', 'thenstmt', 'elsestmt')
+
     def __init__(self, cond, thenstmt, elsestmt=None):
         self.cond = cond
         self.thenstmt = thenstmt
         self.elsestmt = elsestmt
 
 class While(Node):
+    __slots__ = ('cond', 'body')
+
     def __init__(self, cond, body):
         self.cond = cond
         self.body = body
 
 class For(Node):
+    __slots__ = ('var', 'start', 'end', 'body', 'downto')
+
     def __init__(self, var, start, end, body, downto=False):
         self.var = var
         self.start = start
@@ -139,10 +184,14 @@ class For(Node):
         self.downto = downto
 
 class Read(Node):
+    __slots__ = ('vars',)
+
     def __init__(self, vars):
         self.vars = vars
 
 class Write(Node):
+    __slots__ = ('params', 'newline')
+
     def __init__(self, params, newline=False):
         self.params = params
         self.newline = newline
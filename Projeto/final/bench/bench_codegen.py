@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ast1 import *
+from codegen_ewvm import generate_ewvm
+
+# Micro-benchmark do gerador de código: constrói diretamente a árvore de um
+# programa sintético com N instruções (sem passar pelo parser) e mede
+# generate_ewvm().
+#
+# uso: python bench/bench_codegen.py [N] [repetições]
+
+
+def var(name, *idx):
+    return VarAccess(name, [list(idx)] if idx else [])
+
+
+def synthetic_program(n):
+    decls = [
+        VarDecl(['i', 'j', 'x', 'y'], Type('integer')),
+        VarDecl(['r'], Type('real')),
+        VarDecl(['v'], ArrayType([SubrangeType(Literal(1), Literal(100))], Type('integer'))),
+    ]
+    stmts = []
+    k = 0
+    while len(stmts) < n:
+        k += 1
+        stmts.append(Assign(var('x'), BinOp('+', BinOp('*', var('y'), Literal(k % 7)), var('i'))))
+        stmts.append(Assign(var('v', BinOp('+', var('i'), Literal(1))), BinOp('-', var('x'), Literal(3))))
+        stmts.append(If(BinOp('<', var('x'), var('y')),
+                        Assign(var('y'), BinOp('DIV', var('x'), Literal(2))),
+                        Assign(var('r'), BinOp('/', var('r'), Literal(2.0)))))
+        stmts.append(While(BinOp('>', var('j'), Literal(0)),
+                           Assign(var('j'), BinOp('-', var('j'), Literal(1)))))
+        stmts.append(For('i', Literal(1), Literal(10),
+                         Assign(var('x'), BinOp('+', var('x'), var('v', var('i'))))))
+        stmts.append(Write([var('x'), Literal(' '), UnOp('-', var('r'))], newline=True))
+    block = Block([], [], decls, CompoundStatement(stmts[:n]))
+    return Program('Bench', [], block)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    reps = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    program = synthetic_program(n)
+    best = None
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        code = generate_ewvm(program)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    n_instr = code.count('\n') + 1
+    print(f"statements: {n}  instrucoes: {n_instr}  melhor tempo: {best:.3f} s  "
+          f"({n / best:,.0f} statements/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ast1 import BinOp, Literal, VarAccess
+from parser import parse
+
+# Teste de carga com expressões geradas de milhares de termos
+# (x * 1 + x * 2 + ... e a * b * c ...): mede o tempo de análise e confirma
+# que a árvore sai associativa à esquerda, com os termos pela ordem do texto,
+# sem RecursionError.
+#
+# uso: python bench/bench_expressoes.py [N ...]   (por omissão 10k 30k 100k)
+
+
+def program(expr):
+    return f"program Expr;\nvar x, y: integer;\nbegin\n  y := {expr}\nend.\n"
+
+
+def check_left_fold(expr, op, n, right_check):
+    # percorre a espinha esquerda sem recursão
+    count = 0
+    node = expr
+    while isinstance(node, BinOp) and node.op == op:
+        assert right_check(node.right, n - 1 - count), (count, node.right)
+        node = node.left
+        count += 1
+    assert count == n - 1, count
+    assert right_check(node, 0)
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 30_000, 100_000]
+    cases = [
+        ('+', lambda n: ' + '.join(f"x * {i % 9 + 1}" for i in range(n)),
+         lambda e, i: isinstance(e, BinOp) and e.op == '*' and e.right.value == i % 9 + 1),
+        ('*', lambda n: ' * '.join(str(i % 9 + 1) for i in range(n)),
+         lambda e, i: isinstance(e, Literal) and e.value == i % 9 + 1),
+        ('-', lambda n: ' - '.join('x' if i % 2 else '(y)' for i in range(n)),
+         lambda e, i: isinstance(e, VarAccess) and e.name == ('x' if i % 2 else 'y')),
+    ]
+    for n in sizes:
+        for op, make, right_check in cases:
+            source = program(make(n))
+            t0 = time.perf_counter()
+            ast, errors = parse(source)
+            dt = time.perf_counter() - t0
+            if ast is None:
+                print("erro:", errors[:3])
+                sys.exit(1)
+            check_left_fold(ast.block.compound.statements[0].expr, op, n, right_check)
+            print(f"'{op}' {n:>8,} termos  {dt:6.2f} s  {dt / n * 1e6:5.1f} µs/termo  ok")
+
+
+if __name__ == '__main__':
+    main()
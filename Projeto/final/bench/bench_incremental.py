@@ -0,0 +1,146 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ast1 import Node
+from compilador import compile, CompileOptions
+from compilador_incremental import IncrementalCompiler, scan_tokens
+
+# Latência de edições de um carácter num programa de ~20k linhas, como num
+# editor: recompilação incremental (compilador_incremental) contra
+# recompilação completa. Cada edição troca um dígito de uma constante
+# inteira numa instrução escolhida ao acaso (nos procedimentos ou no
+# programa principal); algumas inserem uma linha nova.
+#
+# Nas primeiras edições confirma que a AST incremental (incluindo linha e
+# coluna de cada nó) e o código gerado são iguais aos de uma compilação
+# completa do texto novo.
+#
+# uso: python bench/bench_incremental.py [linhas] [edições]
+
+
+def generate_program(lines):
+    out = ["program Grande;"]
+    p = 0
+    while len(out) < lines * 0.9:
+        out.append(f"procedure p{p}(a: integer; b: integer);")
+        out.append("var i, s: integer;")
+        out.append("begin")
+        out.append("  s := 0;")
+        for k in range(30):
+            if k % 3 == 0:
+                out.append(f"  s := s + a * {k + 1} - b div {k % 7 + 1};")
+            elif k % 3 == 1:
+                out.append(f"  if s > {k * 10} then s := s - {k}")
+                out.append(f"  else s := s + {k % 5};")
+            else:
+                out.append(f"  for i := 1 to {k % 9 + 1} do")
+                out.append(f"    v[i] := v[i] + s mod {k % 4 + 2};")
+        out.append("  g := g + s")
+        out.append("end;")
+        out.append("")
+        p += 1
+    out.append("var g, h: integer;")
+    out.append("    v: array[1..100] of integer;")
+    out.append("begin")
+    out.append("  g := 0;")
+    n = 0
+    while len(out) < lines - 1:
+        out.append(f"  p{n % p}({n % 50}, {n % 7 + 1});")
+        out.append(f"  h := h + g * {n % 11 + 1};")
+        n += 1
+    out.append("  writeln(g, h)")
+    out.append("end.")
+    return '\n'.join(out) + '\n'
+
+
+def int_positions(source):
+    return [start for kind, start, _ in scan_tokens(source) if kind == 'INT']
+
+
+def same_tree(a, b):
+    ignore = ('etype', 'sym', 'analyzed')
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        if isinstance(x, Node):
+            assert type(x) is type(y), (x, y)
+            for cls in type(x).__mro__:
+                for s in getattr(cls, '__slots__', ()):
+                    if s in ignore:
+                        continue
+                    vx, vy = getattr(x, s, None), getattr(y, s, None)
+                    if isinstance(vx, (Node, list, tuple)):
+                        stack.append((vx, vy))
+                    else:
+                        assert vx == vy, (type(x).__name__, s, vx, vy)
+        elif isinstance(x, (list, tuple)):
+            assert len(x) == len(y), (x, y)
+            stack.extend(zip(x, y))
+        else:
+            assert x == y, (x, y)
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    checked = 5
+    source = generate_program(lines)
+    options = CompileOptions(fast_lexer=True)
+    rnd = random.Random(1)
+
+    t0 = time.perf_counter()
+    ic = IncrementalCompiler(source)
+    first = ic.compile()
+    print(f"{source.count(chr(10)):,} linhas, {len(ic.decls)} procedimentos; "
+          f"compilação inicial {time.perf_counter() - t0:.2f} s")
+    assert first.ok, first.diagnostics[:3]
+
+    inc_times, full_times, phases = [], [], {}
+    kinds = {}
+    text = ''
+    for n in range(edits):
+        if n == 0 or text.startswith('\n'):
+            candidates = int_positions(ic.source)
+        pos = rnd.choice(candidates)
+        if n % 10 == 9:
+            # nova linha antes do operador: muda a linha de tudo o que vem depois
+            while ic.source[pos] != ' ':
+                pos -= 1
+            start, end, text = pos, pos + 1, '\n    '
+        else:
+            old = ic.source[pos]
+            start, end, text = pos, pos + 1, str((int(old) + 1) % 9 + 1)
+
+        t0 = time.perf_counter()
+        kind = ic.edit(start, end, text)
+        t1 = time.perf_counter()
+        result = ic.compile()
+        t2 = time.perf_counter()
+        kinds[kind] = kinds.get(kind, 0) + 1
+        inc_times.append(t2 - t0)
+        phases['reanálise'] = phases.get('reanálise', 0) + (t1 - t0)
+        for k, v in result.timings.items():
+            phases[k] = phases.get(k, 0) + v
+
+        t0 = time.perf_counter()
+        full = compile(ic.source, options=options)
+        full_times.append(time.perf_counter() - t0)
+        if n < checked:
+            same_tree(result.ast, full.ast)
+            assert result.code == full.code
+
+    inc = sorted(inc_times)[len(inc_times) // 2]
+    fullm = sorted(full_times)[len(full_times) // 2]
+    print(f"{edits} edições: {kinds}; as primeiras {checked} iguais à compilação completa")
+    print(f"mediana por edição: incremental {inc * 1000:7.1f} ms   completa {fullm * 1000:7.1f} ms   "
+          f"({fullm / inc:.1f}x)")
+    print("incremental por fase (média): " + ', '.join(
+        f"{k} {v / edits * 1000:.1f} ms" for k, v in phases.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import glob
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analex import lexer
+from analex_rapido import FastLexer
+from analex_stream import tokenize_file
+from bench_memoria import generate_source
+
+# Débito da análise léxica num programa Pascal gerado com vários MB (8 MB
+# por omissão): o lexer PLY e o lexer escrito à mão (analex_rapido) leem o
+# ficheiro inteiro para memória, o modo em streaming (analex_stream) lê-o em
+# blocos. Mostra tokens/s, MB/s e o pico de memória (tracemalloc, numa
+# segunda passagem) de cada um.
+#
+# Antes disso confirma que analex_rapido dá exatamente os mesmos tokens
+# (tipo, valor, linha, posição) e erros que o PLY nos exemplos da pasta e no
+# programa gerado.
+#
+# uso: python bench/bench_lexer.py [bytes]
+
+
+def each_token(lx, source):
+    lx.input(source)
+    lx.lineno = 1
+    lx.errors = []
+    token = lx.token
+    while True:
+        tok = token()
+        if tok is None:
+            return
+        yield tok.type, tok.value, tok.lineno, tok.lexpos
+
+
+def same_tokens(source):
+    fast = FastLexer()
+    for a, b in zip(each_token(lexer, source), each_token(fast, source)):
+        assert a == b, (a, b)
+    assert lexer.token() is None and fast.token() is None
+    assert lexer.errors == fast.errors, (lexer.errors, fast.errors)
+
+
+def count_tokens(lx, path):
+    with open(path, encoding='utf-8') as f:
+        lx.input(f.read())
+    lx.lineno = 1
+    lx.errors = []
+    count = 0
+    token = lx.token
+    while token():
+        count += 1
+    lx.input('')
+    return count
+
+
+def lex_stream(path):
+    count = 0
+    for _ in tokenize_file(path):
+        count += 1
+    return count
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 8 << 20
+    with tempfile.NamedTemporaryFile('w', suffix='.pas', delete=False, encoding='utf-8') as f:
+        f.write(generate_source(size))
+        path = f.name
+    here = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    try:
+        for sample in sorted(glob.glob(os.path.join(here, '*.txt'))) + [path]:
+            with open(sample, encoding='utf-8') as f:
+                same_tokens(f.read())
+        print("analex_rapido = PLY em todos os exemplos e no programa gerado")
+
+        mb = os.path.getsize(path) / 2**20
+        print(f"fonte: {mb:.1f} MB")
+        counts = set()
+        lexers = (('PLY', lambda p: count_tokens(lexer, p)),
+                  ('rápido', lambda p: count_tokens(FastLexer(), p)),
+                  ('streaming', lex_stream))
+        times = {}
+        for name, run in lexers:
+            t0 = time.perf_counter()
+            count = run(path)
+            dt = time.perf_counter() - t0
+            counts.add(count)
+            times[name] = dt
+            tracemalloc.start()
+            run(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<10} {count:>11,} tokens  {dt:6.2f} s  {count / dt / 1e6:5.2f} M tokens/s  "
+                  f"{mb / dt:5.1f} MB/s  pico {peak / 2**20:6.1f} MB")
+        assert len(counts) == 1, counts
+        print(f"rápido vs PLY: {times['PLY'] / times['rápido']:.1f}x")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from parser import parse
+
+# Escalabilidade do parser com blocos begin..end enormes e planos (código
+# gerado por ferramentas): o tempo por instrução deve manter-se constante.
+#
+# uso: python bench/bench_listas.py [N ...]   (por omissão 10k 30k 100k 300k)
+
+
+def flat_program(n):
+    names = ', '.join(f"v{i}" for i in range(50))
+    stmts = ';\n'.join(f"  x := x + {i % 10}" if i % 2 else f"  v{i % 50} := x"
+                       for i in range(n))
+    return f"program Listas;\nvar x, {names}: integer;\nbegin\n{stmts}\nend.\n"
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 30_000, 100_000, 300_000]
+    for n in sizes:
+        source = flat_program(n)
+        t0 = time.perf_counter()
+        ast, errors = parse(source)
+        dt = time.perf_counter() - t0
+        if ast is None:
+            print("erro:", errors[:3])
+            sys.exit(1)
+        assert len(ast.block.compound.statements) == n
+        print(f"{n:>9,} instruções  {dt:7.2f} s  {dt / n * 1e6:6.1f} µs/instrução")
+        del ast
+
+
+if __name__ == '__main__':
+    main()
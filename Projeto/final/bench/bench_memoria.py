@@ -0,0 +1,101 @@
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ast1 import Node
+from parser import parse
+
+# Memória ocupada pela AST: gera um programa Pascal com ~N bytes (1 MB por
+# omissão), analisa-o e mostra o número de nós, o pico de RSS do processo e
+# o que o tracemalloc vê durante a análise e depois dela (a AST retida).
+#
+# uso: python bench/bench_memoria.py [bytes]
+
+
+def generate_source(size):
+    head = ("program Memoria;\n"
+            "var i, j, k, x, y, z: integer;\n"
+            "    r: real;\n"
+            "    a: array[1..100] of integer;\n"
+            "begin\n")
+    body = []
+    n = len(head)
+    b = 0
+    while n < size:
+        b += 1
+        lines = [f"  if x < {b} then\n  begin\n"]
+        for s in range(40):
+            k = (b + s) % 7
+            if s % 4 == 0:
+                lines.append(f"    x := (x + {k}) * (y - z) div 2 + a[i + {k % 3}];\n")
+            elif s % 4 == 1:
+                lines.append(f"    a[j] := a[j + 1] - x * {k} + y mod 5;\n")
+            elif s % 4 == 2:
+                lines.append(f"    while y > {k} do y := y - 1;\n")
+            else:
+                lines.append(f"    writeln('x = ', x, ' r = ', r + {k}.5);\n")
+        lines.append("    z := z + 1\n  end;\n")
+        chunk = ''.join(lines)
+        body.append(chunk)
+        n += len(chunk)
+    return head + ''.join(body) + "  writeln(x)\nend.\n"
+
+
+def fields(node):
+    d = getattr(node, '__dict__', None)
+    if d is not None:
+        return list(d.values())
+    return [getattr(node, s) for cls in type(node).__mro__
+            for s in getattr(cls, '__slots__', ()) if hasattr(node, s)]
+
+
+def count_nodes(root):
+    count = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, Node):
+            count += 1
+            stack.extend(fields(obj))
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return count
+
+
+def rss_kb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * (os.sysconf('SC_PAGE_SIZE') // 1024)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 20
+    source = generate_source(size)
+    before = rss_kb()
+
+    t0 = time.perf_counter()
+    ast, errors = parse(source)
+    dt = time.perf_counter() - t0
+    if ast is None:
+        print("erro:", errors[:3])
+        sys.exit(1)
+    nodes = count_nodes(ast)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    del ast
+
+    tracemalloc.start()
+    ast, errors = parse(source)
+    retained, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"fonte: {len(source) / 1024:.0f} KB  nós: {nodes:,}  análise: {dt:.2f} s")
+    print(f"RSS antes: {before / 1024:.1f} MB  pico de RSS: {peak / 1024:.1f} MB")
+    print(f"tracemalloc: AST retida {retained / 2**20:.1f} MB ({retained / nodes:.0f} B/nó), "
+          f"pico durante a análise {traced_peak / 2**20:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
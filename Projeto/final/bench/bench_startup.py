@@ -0,0 +1,45 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Tempo de arranque do compilador (um processo por ficheiro, como nos jobs
+# em lote): com a cache de tabelas já preenchida e com a cache vazia, que
+# obriga o PLY a validar a gramática e a gerar as tabelas LALR.
+#
+# uso: python bench/bench_startup.py [programa.txt] [repetições]
+
+
+def run(source, cache_dir):
+    env = dict(os.environ, PLC_CACHE_DIR=cache_dir)
+    with open(source, 'rb') as f:
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(HERE, 'parser.py')], stdin=f, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return time.perf_counter() - t0
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(HERE, 'ex3.txt')
+    reps = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    warm = tempfile.mkdtemp()
+    try:
+        run(source, warm)
+        cold, cached = [], []
+        for _ in range(reps):
+            empty = tempfile.mkdtemp()
+            cold.append(run(source, empty))
+            shutil.rmtree(empty, ignore_errors=True)
+            cached.append(run(source, warm))
+    finally:
+        shutil.rmtree(warm, ignore_errors=True)
+    print(f"sem cache: {min(cold) * 1000:.1f} ms  com cache: {min(cached) * 1000:.1f} ms  "
+          f"(melhor de {reps})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+import compilador
+from compilador import compile, CompileOptions
+from estatisticas import CompileStats
+from vm_ewvm import VMError, run_ewvm
+from bench_incremental import generate_program
+from bench_memoria import generate_source
+
+# Suite de benchmarks: compila e executa os programas de bench/programas
+# (ciclos aninhados, arrays, ordenação, recursão, strings, procedimentos) e
+# dois programas gerados grandes (só compilados; 256 KB por omissão), sem e
+# com -O.
+#
+# Para cada programa e modo regista:
+#   compile_s      melhor tempo de compilação em --reps repetições
+#   phases         tempo por fase dessa compilação (estatisticas.py)
+#   peak_kb        pico de memória alocada durante a compilação (tracemalloc)
+#   instructions   instruções EWVM geradas (sem rótulos)
+#   steps, vm_s    instruções executadas e tempo na VM local (vm_ewvm)
+#   max_depth      profundidade máxima de chamadas (recursao.pas: sem -O cada
+#                  chamada recursiva ocupa um frame; com -O as finais são saltos)
+#   output_ok      a saída é igual a programa.out (None se não há .out)
+#   error          diagnósticos de compilação ou erro da VM
+#
+# programa.in, se existir, dá as linhas lidas pelo readln.
+# O resultado (JSON) guarda o commit, para comparar entre versões:
+#
+#   python bench/bench_suite.py --json antes.json
+#   ... alterações ...
+#   python bench/bench_suite.py --json depois.json --compare antes.json
+#
+# uso: python bench/bench_suite.py [--json F] [--compare F] [--reps N] [--max-steps N]
+#                                 [--tamanho BYTES] [nomes...]
+
+PROGRAMS = os.path.join(HERE, 'programas')
+MODES = (('O0', False), ('O1', True))
+MAX_STEPS = 50_000_000
+REPORT_VERSION = 1
+
+
+def workloads(size):
+    """(nome, fonte, linhas de entrada, saída esperada, executar?)"""
+    out = []
+    for name in sorted(os.listdir(PROGRAMS)):
+        base, ext = os.path.splitext(name)
+        if ext != '.pas':
+            continue
+        path = os.path.join(PROGRAMS, base)
+        with open(path + '.pas', encoding='utf-8') as f:
+            source = f.read()
+        lines = expected = None
+        if os.path.exists(path + '.in'):
+            with open(path + '.in', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        if os.path.exists(path + '.out'):
+            with open(path + '.out', encoding='utf-8') as f:
+                expected = f.read()
+        out.append((base, source, lines, expected, True))
+    out.append(('gerado_bloco', generate_source(size), None, None, False))
+    out.append(('gerado_procedimentos', generate_program(max(size // 40, 100)), None, None, False))
+    return out
+
+
+def measure_compile(source, optimize, reps):
+    options = CompileOptions(optimize=optimize)
+    best = None
+    for _ in range(reps):
+        stats = CompileStats()
+        t0 = time.perf_counter()
+        result = compile(source, options=options, stats=stats)
+        dt = time.perf_counter() - t0
+        if best is None or dt < best[0]:
+            best = (dt, stats, result)
+    tracemalloc.start()
+    try:
+        compile(source, options=options)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    dt, stats, result = best
+    phases = {k: round(v['wall'], 6) for k, v in stats.phases.items() if k != 'load'}
+    return result, {'compile_s': round(dt, 6), 'phases': phases, 'peak_kb': peak // 1024,
+                    'instructions': stats.counters.get('instructions'),
+                    'ast_nodes': stats.counters.get('ast_nodes')}
+
+
+def measure_run(code, lines, expected, max_steps):
+    entry = {}
+    feed = iter(lines or ())
+    written = []
+    try:
+        vm = run_ewvm(code, input_fn=lambda: next(feed, ''), output_fn=written.append,
+                      max_steps=max_steps)
+    except VMError as e:
+        entry['error'] = f"VM: {e}"
+        entry['output_ok'] = False if expected is not None else None
+        return entry
+    entry['steps'] = vm.steps
+    entry['vm_s'] = round(vm.elapsed, 6)
+    entry['max_depth'] = vm.max_depth
+    entry['output_ok'] = None if expected is None else ''.join(written) == expected
+    return entry
+
+
+def run_suite(names, reps, max_steps, size):
+    compilador.load()
+    results = {}
+    for name, source, lines, expected, execute in workloads(size):
+        if names and name not in names:
+            continue
+        results[name] = {}
+        for mode, optimize in MODES:
+            result, entry = measure_compile(source, optimize, reps)
+            if not result.ok:
+                entry['error'] = '; '.join(result.diagnostics[:3])
+            elif execute:
+                entry.update(measure_run(result.code, lines, expected, max_steps))
+            results[name][mode] = entry
+            print_row(name, mode, entry)
+    return results
+
+
+def commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_row(name, mode, e):
+    steps = f"{e['steps']:>12,}" if 'steps' in e else f"{'-':>12}"
+    ok = {True: 'ok', False: 'FALHA', None: '-'}[e.get('output_ok')]
+    print(f"{name:22} {mode}  compilação {e['compile_s'] * 1000:9.1f} ms  "
+          f"pico {e['peak_kb']:8,} KB  instr {e['instructions'] or 0:>9,}  "
+          f"executadas {steps}  prof. {e.get('max_depth', '-'):>6}  saída {ok:5}" + (f"  {e['error']}" if 'error' in e else ''))
+
+
+def compare(base, results):
+    print(f"\ncomparação com {base.get('commit')} (novo / antigo):")
+    for name, modes in results.items():
+        for mode, e in modes.items():
+            old = base['results'].get(name, {}).get(mode)
+            if old is None:
+                continue
+            cols = []
+            for key in ('compile_s', 'peak_kb', 'instructions', 'steps', 'vm_s', 'max_depth'):
+                a, b = e.get(key), old.get(key)
+                cols.append(f"{key} {a / b:6.2f}x" if a and b else f"{key} {'-':>7}")
+            print(f"{name:22} {mode}  " + '  '.join(cols))
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    out_path = base_path = None
+    reps, max_steps, size = 3, MAX_STEPS, 1 << 18
+    names = []
+    while args:
+        a = args.pop(0)
+        if a == '--json':
+            out_path = args.pop(0)
+        elif a == '--compare':
+            base_path = args.pop(0)
+        elif a == '--reps':
+            reps = int(args.pop(0))
+        elif a == '--max-steps':
+            max_steps = int(args.pop(0))
+        elif a == '--tamanho':
+            size = int(args.pop(0))
+        else:
+            names.append(a)
+
+    results = run_suite(names, reps, max_steps, size)
+    report = {'version': REPORT_VERSION, 'commit': commit(),
+              'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'python': platform.python_version(), 'reps': reps, 'results': results}
+    if out_path:
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+    if base_path:
+        with open(base_path, encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
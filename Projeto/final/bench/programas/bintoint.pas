@@ -0,0 +1,27 @@
+program BinToIntRepetido;
+
+function BinToInt(bin: string): integer;
+var
+  i, valor, potencia: integer;
+begin
+  valor := 0;
+  potencia := 1;
+  for i := length(bin) downto 1 do
+  begin
+    if bin[i] = '1' then
+      valor := valor + potencia;
+    potencia := potencia * 2;
+  end;
+  BinToInt := valor;
+end;
+
+var
+  bin: string;
+  k, total: integer;
+begin
+  readln(bin);
+  total := 0;
+  for k := 1 to 200 do
+    total := total + BinToInt(bin) mod k;
+  writeln(BinToInt(bin), ' ', total);
+end.
@@ -0,0 +1,14 @@
+program Ciclos;
+var i, j, k, s, n: integer;
+begin
+  n := 30;
+  s := 0;
+  for i := 1 to n do
+    for j := 1 to n do
+      for k := 1 to n do
+        if (i + j + k) mod 3 = 0 then
+          s := s + i * j - k
+        else
+          s := s - 1;
+  writeln(s);
+end.
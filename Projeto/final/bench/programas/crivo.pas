@@ -0,0 +1,31 @@
+program Crivo;
+var composto: array[2..5000] of integer;
+    i, j, n, total, maior: integer;
+begin
+  n := 5000;
+  for i := 2 to n do
+    composto[i] := 0;
+  i := 2;
+  while i * i <= n do
+  begin
+    if composto[i] = 0 then
+    begin
+      j := i * i;
+      while j <= n do
+      begin
+        composto[j] := 1;
+        j := j + i;
+      end;
+    end;
+    i := i + 1;
+  end;
+  total := 0;
+  maior := 0;
+  for i := 2 to n do
+    if composto[i] = 0 then
+    begin
+      total := total + 1;
+      maior := i;
+    end;
+  writeln(total, ' primos; o maior e ', maior);
+end.
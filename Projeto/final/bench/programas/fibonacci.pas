@@ -0,0 +1,15 @@
+program Fibonacci;
+
+function Fib(n: integer): integer;
+begin
+  if n < 2 then
+    Fib := n
+  else
+    Fib := Fib(n - 1) + Fib(n - 2);
+end;
+
+var n: integer;
+begin
+  n := 18;
+  writeln('fib(', n, ') = ', Fib(n));
+end.
@@ -0,0 +1,24 @@
+program Matriz;
+var a, b, c: array[1..16, 1..16] of integer;
+    i, j, k, n, s: integer;
+begin
+  n := 16;
+  for i := 1 to n do
+    for j := 1 to n do
+    begin
+      a[i, j] := i + j;
+      b[i, j] := i - j;
+    end;
+  for i := 1 to n do
+    for j := 1 to n do
+    begin
+      s := 0;
+      for k := 1 to n do
+        s := s + a[i, k] * b[k, j];
+      c[i, j] := s;
+    end;
+  s := 0;
+  for i := 1 to n do
+    s := s + c[i, i] - c[i, n + 1 - i];
+  writeln(c[1, 1], ' ', c[n, n], ' ', s);
+end.
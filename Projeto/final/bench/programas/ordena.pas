@@ -0,0 +1,23 @@
+program Ordena;
+var v: array[1..300] of integer;
+    i, j, n, t, x, trocas: integer;
+begin
+  n := 300;
+  x := 12345;
+  for i := 1 to n do
+  begin
+    x := (x * 1103 + 12345) mod 65536;
+    v[i] := x mod 1000;
+  end;
+  trocas := 0;
+  for i := n downto 2 do
+    for j := 1 to i - 1 do
+      if v[j] > v[j + 1] then
+      begin
+        t := v[j];
+        v[j] := v[j + 1];
+        v[j + 1] := t;
+        trocas := trocas + 1;
+      end;
+  writeln(v[1], ' ', v[n div 2], ' ', v[n], ' ', trocas);
+end.
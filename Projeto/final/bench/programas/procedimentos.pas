@@ -0,0 +1,31 @@
+program Procedimentos;
+
+procedure Acumula(a: integer; b: integer);
+var i, s: integer;
+begin
+  s := 0;
+  for i := 1 to b do
+    s := s + a * i - b;
+  g := g + s mod 97
+end;
+
+procedure Escala(k: integer);
+var i: integer;
+begin
+  for i := 1 to 50 do
+    v[i] := v[i] * k mod 1000 + i
+end;
+
+var g, n: integer;
+    v: array[1..50] of integer;
+begin
+  g := 0;
+  for n := 1 to 50 do
+    v[n] := n;
+  for n := 1 to 400 do
+  begin
+    Acumula(n, n mod 13 + 1);
+    if n mod 50 = 0 then Escala(n mod 7 + 2);
+  end;
+  writeln(g, ' ', v[1], ' ', v[50]);
+end.
@@ -0,0 +1,34 @@
+program Recursao;
+
+function Soma(n: integer; acc: integer): integer;
+begin
+  if n = 0 then
+    Soma := acc
+  else
+    Soma := Soma(n - 1, acc + n mod 1000)
+end;
+
+function Mdc(a: integer; b: integer): integer;
+begin
+  if b = 0 then Mdc := a
+  else Mdc := Mdc(b, a mod b)
+end;
+
+procedure Conta(n: integer; var total: integer);
+begin
+  if n > 0 then
+  begin
+    total := total + n mod 7;
+    Conta(n - 1, total)
+  end
+end;
+
+var t, i, g: integer;
+begin
+  t := 0;
+  Conta(20000, t);
+  g := 0;
+  for i := 1 to 300 do
+    g := g + Mdc(i * 7919, 104729 mod i + 1);
+  writeln(Soma(30000, 0), ' ', t, ' ', g);
+end.
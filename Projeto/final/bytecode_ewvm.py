@@ -0,0 +1,201 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import List, Dict
+
+from vm_ewvm import EWVMProgram, VMError, ARGKIND, OPNAMES, assemble, quote
+
+# Formato binário (pré-montado) para o código EWVM.
+#
+# Todas as secções são little-endian e alinhadas a 8 bytes; um ficheiro
+# mapeado em memória lê-se secção a secção com struct ('<'), sem tokenização
+# e com o mesmo resultado em qualquer máquina:
+#
+#   cabeçalho   MAGIC, versão, nº de instruções, reais, pares, rótulos,
+#               referências e strings
+#   código      2 palavras 'q' por instrução: (opcode, operando)
+#   reais       constantes de PUSHF ('d')
+#   pares       limites de CHECK (2 palavras 'q')
+#   rótulos     (índice do nome, instrução) em 2 palavras 'q'
+#   referências (instrução de salto, índice do nome) em 2 palavras 'q', só
+#               para que a desmontagem reponha o rótulo que foi escrito
+#   strings     u32 comprimento + utf-8 (PUSHS, ERR e nomes dos rótulos)
+#
+# O operando de cada instrução já vem resolvido: inteiro direto, índice da
+# instrução destino nos saltos, ou índice na respetiva tabela de constantes.
+
+MAGIC = b'EWVB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIIII')
+
+
+def _words(mv, off, n, fmt):
+    size = 8 * n
+    if off + size > len(mv):
+        raise VMError("Bytecode EWVM truncado")
+    return struct.unpack_from(f'<{n}{fmt}', mv, off), off + size
+
+
+def encode(program) -> bytes:
+    """Codifica texto EWVM, lista de linhas ou EWVMProgram (a do gerador vem
+    de vm_ewvm.assemble_instrs) no formato binário."""
+    if not isinstance(program, EWVMProgram):
+        program = assemble(program)
+
+    strings: List[str] = []
+    string_idx: Dict[str, int] = {}
+    floats = array('d')
+    pairs = array('q')
+    code = array('q')
+
+    def intern(s):
+        if s not in string_idx:
+            string_idx[s] = len(strings)
+            strings.append(s)
+        return string_idx[s]
+
+    for op, arg in program.code:
+        kind = ARGKIND.get(op)
+        if kind == 'f':
+            floats.append(arg)
+            arg = len(floats) - 1
+        elif kind == 's':
+            arg = intern(arg)
+        elif kind == 'c':
+            pairs.extend(arg)
+            arg = len(pairs) // 2 - 1
+        elif kind is None:
+            arg = 0
+        code.append(op)
+        code.append(arg)
+
+    labels = array('q')
+    for name, target in program.labels.items():
+        labels.append(intern(name))
+        labels.append(target)
+    refs = array('q')
+    for idx, name in program.refs.items():
+        refs.append(idx)
+        refs.append(intern(name))
+
+    parts = [HEADER.pack(MAGIC, VERSION, 0, len(program.code), len(floats),
+                         len(pairs) // 2, len(labels) // 2, len(refs) // 2, len(strings))]
+    for words, fmt in ((code, 'q'), (floats, 'd'), (pairs, 'q'), (labels, 'q'), (refs, 'q')):
+        parts.append(struct.pack(f'<{len(words)}{fmt}', *words))
+    for s in strings:
+        raw = s.encode('utf-8')
+        parts.append(struct.pack('<I', len(raw)))
+        parts.append(raw)
+    return b''.join(parts)
+
+
+def decode(data) -> EWVMProgram:
+    """Reconstrói a EWVMProgram a partir de bytes (ou de um mmap)."""
+    mv = memoryview(data)
+    try:
+        return _decode(mv)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise VMError("Bytecode EWVM truncado ou inválido")
+    finally:
+        mv.release()
+
+
+def _decode(mv) -> EWVMProgram:
+    if len(mv) < HEADER.size:
+        raise VMError("Bytecode EWVM truncado")
+    magic, version, _, n_code, n_floats, n_pairs, n_labels, n_refs, n_strings = HEADER.unpack_from(mv)
+    if magic != MAGIC:
+        raise VMError("Ficheiro não é bytecode EWVM")
+    if version != VERSION:
+        raise VMError(f"Versão de bytecode não suportada: {version}")
+
+    off = HEADER.size
+    words, off = _words(mv, off, 2 * n_code, 'q')
+    floats, off = _words(mv, off, n_floats, 'd')
+    pairs, off = _words(mv, off, 2 * n_pairs, 'q')
+    labels, off = _words(mv, off, 2 * n_labels, 'q')
+    refwords, off = _words(mv, off, 2 * n_refs, 'q')
+
+    strings: List[str] = []
+    for _ in range(n_strings):
+        (n,) = struct.unpack_from('<I', mv, off)
+        off += 4
+        if off + n > len(mv):
+            raise VMError("Bytecode EWVM truncado")
+        strings.append(bytes(mv[off:off + n]).decode('utf-8'))
+        off += n
+
+    code = []
+    for op, arg in zip(words[0::2], words[1::2]):
+        kind = ARGKIND.get(op)
+        if kind is None:
+            code.append((op, None))
+        elif kind == 'f':
+            code.append((op, floats[arg]))
+        elif kind == 's':
+            code.append((op, strings[arg]))
+        elif kind == 'c':
+            code.append((op, (pairs[2 * arg], pairs[2 * arg + 1])))
+        else:
+            code.append((op, arg))
+
+    names = {}
+    for i in range(n_labels):
+        names[strings[labels[2 * i]]] = labels[2 * i + 1]
+    refs = {}
+    for i in range(n_refs):
+        refs[refwords[2 * i]] = strings[refwords[2 * i + 1]]
+    return EWVMProgram(code, names, refs)
+
+
+def load(path) -> EWVMProgram:
+    """Carrega um ficheiro de bytecode via mmap, sem tokenizar texto."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return decode(mm)
+
+
+def to_text(program: EWVMProgram) -> str:
+    """Volta a produzir o texto EWVM (com os nomes de rótulo originais)."""
+    at: Dict[int, List[str]] = {}
+    for name, target in program.labels.items():
+        at.setdefault(target, []).append(name)
+    names_by_target = {t: names[0] for t, names in at.items()}
+
+    lines = []
+    for i, (op, arg) in enumerate(program.code):
+        for name in at.get(i, ()):
+            lines.append(f"{name}:")
+        kind = ARGKIND.get(op)
+        if kind is None:
+            lines.append(OPNAMES[op])
+        elif kind == 'f':
+            lines.append(f"{OPNAMES[op]} {arg!r}")
+        elif kind == 's':
+            lines.append(f"{OPNAMES[op]} {quote(arg)}")
+        elif kind == 'c':
+            lines.append(f"{OPNAMES[op]} {arg[0]},{arg[1]}")
+        elif kind == 'l':
+            name = program.refs.get(i) or names_by_target.get(arg, f'L{arg}')
+            lines.append(f"{OPNAMES[op]} {name}")
+        else:
+            lines.append(f"{OPNAMES[op]} {arg}")
+    for name in at.get(len(program.code), ()):
+        lines.append(f"{name}:")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    # uso: python bytecode_ewvm.py programa.ewvm programa.ewvb   (montar)
+    #      python bytecode_ewvm.py -d programa.ewvb              (desmontar)
+    if len(sys.argv) == 3 and sys.argv[1] == '-d':
+        print(to_text(load(sys.argv[2])))
+    elif len(sys.argv) == 3:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            data = encode(f.read().splitlines())
+        with open(sys.argv[2], 'wb') as f:
+            f.write(data)
+    else:
+        print("uso: python bytecode_ewvm.py entrada.ewvm saida.ewvb | -d entrada.ewvb", file=sys.stderr)
+        sys.exit(2)
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from typing import Dict, Optional
+
+# Cache em disco do código gerado, endereçada pelo conteúdo.
+#
+# A chave é o sha256 de: formato da cache, impressão digital do compilador
+# (conteúdo dos seus módulos .py), opções de compilação e texto fonte. Uma
+# entrada é o código EWVM (<chave>.code) e, opcionalmente, a AST em pickle
+# (<chave>.ast), em subdiretorias pelos 2 primeiros dígitos da chave.
+#
+# Este módulo não importa o parser: um acerto não chega a construir o lexer
+# nem as tabelas do yacc.
+#
+# Remoção LRU por tamanho: cada acerto atualiza o mtime da entrada e, quando
+# o total passa de max_bytes, apagam-se as entradas com mtime mais antigo até
+# o total descer a LOW_WATER * max_bytes. O total é contado pela instância
+# (um varrimento da diretoria no primeiro put, depois soma o que escreve):
+# só se volta a varrer quando passa do limite, e esse varrimento apanha
+# também o que outros processos lá escreveram.
+# Os contadores (acertos, falhas, remoções) acumulam-se em stats.json.
+
+CACHE_FORMAT = 1
+DEFAULT_DIR = os.environ.get('PLC_COMPILE_CACHE') or \
+    os.path.join(os.path.expanduser('~'), '.cache', 'plc2025')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+LOW_WATER = 0.9
+
+COMPILER_MODULES = ('analex', 'analex_rapido', 'ast1', 'parser', 'plycache', 'semantic',
+                    'optimize_ast', 'optimize_loops', 'codegen_ewvm', 'frame_ewvm', 'linker_ewvm',
+                    'peephole_ewvm', 'bytecode_ewvm', 'vm_ewvm', 'estatisticas', 'compilador')
+
+_fingerprint = None
+
+
+def compiler_fingerprint() -> str:
+    # muda sempre que algum módulo do compilador muda
+    global _fingerprint
+    if _fingerprint is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha256()
+        for name in COMPILER_MODULES:
+            with open(os.path.join(here, name + '.py'), 'rb') as f:
+                h.update(f.read())
+        _fingerprint = h.hexdigest()
+    return _fingerprint
+
+
+def options_key(options) -> str:
+    return repr(sorted(vars(options).items())) if options is not None else ''
+
+
+class CompileCache:
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, store_ast=False):
+        self.directory = directory or DEFAULT_DIR
+        self.max_bytes = max_bytes
+        self.store_ast = store_ast
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = None  # total em disco, conhecido depois do primeiro put
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source: str, options=None) -> str:
+        h = hashlib.sha256()
+        h.update(f"{CACHE_FORMAT}\0{compiler_fingerprint()}\0{options_key(options)}\0".encode())
+        h.update(source.encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key[:2], key + ext)
+
+    def get(self, source: str, options=None):
+        """Devolve (código, ast ou None) se a entrada existir, senão None."""
+        key = self.key(source, options)
+        path = self._path(key, '.code')
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        code = data if getattr(options, 'binary', False) else data.decode('utf-8')
+        ast = None
+        if self.store_ast:
+            try:
+                with open(self._path(key, '.ast'), 'rb') as f:
+                    ast = pickle.load(f)
+            except (OSError, pickle.PickleError, EOFError):
+                pass
+        return code, ast
+
+    def put(self, source: str, options, code, ast=None):
+        if self._bytes is None:
+            self._bytes = sum(e[1] for e in self.entries())
+        key = self.key(source, options)
+        data = code if isinstance(code, bytes) else code.encode('utf-8')
+        os.makedirs(os.path.dirname(self._path(key, '')), exist_ok=True)
+        if self.store_ast and ast is not None:
+            try:
+                self._bytes += self._write(self._path(key, '.ast'),
+                                           pickle.dumps(ast, pickle.HIGHEST_PROTOCOL))
+            except (pickle.PickleError, RecursionError):
+                pass
+        # o .code por último: é a sua existência que marca a entrada como válida
+        self._bytes += self._write(self._path(key, '.code'), data)
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def _write(self, path, data) -> int:
+        """Escreve path de forma atómica; devolve quanto o total cresceu."""
+        try:
+            old = os.path.getsize(path)
+        except OSError:
+            old = 0
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return len(data) - old
+
+    def entries(self):
+        # (mtime, tamanho, caminhos) por entrada
+        out = {}
+        for shard in os.listdir(self.directory):
+            d = os.path.join(self.directory, shard)
+            if not os.path.isdir(d):
+                continue
+            for name in os.listdir(d):
+                key, ext = os.path.splitext(name)
+                if ext not in ('.code', '.ast'):
+                    continue
+                try:
+                    st = os.stat(os.path.join(d, name))
+                except OSError:
+                    continue
+                e = out.setdefault(key, [0.0, 0, []])
+                if ext == '.code':
+                    e[0] = st.st_mtime
+                e[1] += st.st_size
+                e[2].append(os.path.join(d, name))
+        return out.values()
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda e: e[0])
+        total = sum(e[1] for e in entries)
+        target = self.max_bytes if total <= self.max_bytes else int(self.max_bytes * LOW_WATER)
+        for mtime, size, paths in entries:
+            if total <= target:
+                break
+            for p in paths:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+
+    def stats(self) -> Dict:
+        entries = list(self.entries())
+        saved = self._load_stats()
+        return {
+            'hits': saved.get('hits', 0) + self.hits,
+            'misses': saved.get('misses', 0) + self.misses,
+            'evictions': saved.get('evictions', 0) + self.evictions,
+            'entries': len(entries),
+            'bytes': sum(e[1] for e in entries),
+            'max_bytes': self.max_bytes,
+        }
+
+    def _load_stats(self) -> Dict:
+        try:
+            with open(os.path.join(self.directory, 'stats.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self):
+        """Soma os contadores desta sessão aos de stats.json."""
+        if not (self.hits or self.misses or self.evictions):
+            return
+        saved = self._load_stats()
+        for name in ('hits', 'misses', 'evictions'):
+            saved[name] = saved.get(name, 0) + getattr(self, name)
+        saved['updated'] = time.time()
+        self._write(os.path.join(self.directory, 'stats.json'),
+                    json.dumps(saved).encode('utf-8'))
+        self.hits = self.misses = self.evictions = 0
@@ -1,5 +1,53 @@
 from typing import List, Dict, Tuple, Optional
 from ast1 import *
+import bytecode_ewvm
+from vm_ewvm import Instr, format_instr, assemble_instrs
+from peephole_ewvm import Peephole, trunc_div
+from linker_ewvm import Fragment, link
+from frame_ewvm import plan_frame
+from estatisticas import phase_of, count_instructions
+from optimize_ast import assigned_vars, expr_key, ALL
+from semantic import analyze, SemanticError
+
+# Instruções de cada operador binário: (versão inteira, versão real)
+BINOPS = {
+    '+': (("ADD",), ("FADD",)),
+    '-': (("SUB",), ("FSUB",)),
+    '*': (("MUL",), ("FMUL",)),
+    '/': (("DIV",), ("FDIV",)),
+    'DIV': (("DIV",), ("DIV",)),
+    'MOD': (("MOD",), ("MOD",)),
+    '=': (("EQUAL",), ("EQUAL",)),
+    '<>': (("EQUAL", "NOT"), ("EQUAL", "NOT")),
+    '<': (("INF",), ("INF",)),
+    '<=': (("INFEQ",), ("INFEQ",)),
+    '>': (("SUP",), ("SUP",)),
+    '>=': (("SUPEQ",), ("SUPEQ",)),
+    'AND': (("AND",), ("AND",)),
+    'OR': (("OR",), ("OR",)),
+}
+
+class CodegenError(Exception):
+    """Programa aceite pela análise semântica que o gerador não consegue
+    traduzir (construção não suportada ou erro interno)."""
+
+
+# Descritor de um tipo array, calculado uma vez quando a variável é alocada:
+# o elemento a[i1, .., in] está em base + sum(ik * strides[k]) - bias.
+class ArrayLayout:
+    __slots__ = ('lows', 'highs', 'strides', 'size', 'bias')
+
+    def __init__(self, lows, highs, elem_size=1):
+        self.lows = lows
+        self.highs = highs
+        strides = []
+        prod = elem_size
+        for low, high in zip(reversed(lows), reversed(highs)):
+            strides.append(prod)
+            prod *= high - low + 1
+        self.strides = strides[::-1]
+        self.size = prod
+        self.bias = sum(low * stride for low, stride in zip(lows, self.strides))
 
 # Gera rótulos únicos
 class LabelGen:
@@ -11,560 +59,1133 @@ class LabelGen:
         return lbl
 
 class CodeGenerator:
-    def __init__(self):
-        self.code: List[str] = []
-        self.postamble: List[str] = []
+    def __init__(self, peephole: Optional[Peephole] = None, loop_opt=False, stats=None,
+                 checks=False, tail_calls=False):
+        self.code: List[Instr] = []
+        self.stats = stats   # estatisticas.CompileStats: fases codegen/link/peephole/output
         self.labelgen = LabelGen()
 
         self.globals: Dict[str, Dict] = {}
         self.current_locals: Dict[str, Dict] = {}
         self.local_frames: List[Dict[str, Dict]] = []
 
-        self.func_labels: Dict[str, str] = {}
+        # por declaração (Proc / Func): subprogramas encaixados em pais
+        # diferentes podem ter o mesmo nome
+        self.func_labels: Dict[object, str] = {}
+        self.levels: Dict[object, int] = {}         # nível de encaixe
 
         self.next_gp = 0
         self.next_local = 0
+        self.frame_next: List[int] = []
+
+        self.peephole = peephole
+        self.loop_opt = loop_opt
+        self.for_depth = 0
+        # acessos a arrays reduzidos a ponteiros: id(VarAccess) -> (slot, deslocamento)
+        self.reduced: Dict[int, Tuple[Tuple[str, int], int]] = {}
+
+        self.layouts: Dict[int, ArrayLayout] = {}   # id(ArrayType) -> descritor
+
+        self.frame_stats: List[Tuple[str, int, int]] = []   # (nome, slots, partilhados)
+
+        # chamadas recursivas em posição final -> saltos (-O)
+        self.tail_calls = tail_calls
+        self.tail = None            # (decl, rótulo, ids das chamadas) do subprograma atual
+        self.tail_pops: List[int] = []
+        self.tail_jumps = 0
 
-    
-    def emit(self, instr: str):
-        self.code.append(instr)
+        # --checks: CHECK nos índices que não se provam dentro dos limites
+        self.checks = checks
+        self.checks_emitted = 0
+        self.checks_elided = 0
+        # intervalo de valores das variáveis de controlo dos For em curso
+        self.ranges: Dict[str, Tuple[int, int]] = {}
 
-    def emit_post(self, instr: str):
-        self.postamble.append(instr)
+        # despacho pela classe do nó (em vez de comparar type(x).__name__)
+        self.stmt_dispatch = {
+            CompoundStatement: self.generate_compound,
+            Assign: self.generate_assign,
+            If: self.generate_if,
+            While: self.generate_while,
+            For: self.generate_for,
+            Read: self.generate_read,
+            Write: self.generate_write,
+            Call: self.generate_call_statement,
+        }
+        self.expr_dispatch = {
+            Literal: self.generate_literal,
+            VarAccess: self.generate_var,
+            BinOp: self.generate_binop,
+            UnOp: self.generate_unop,
+            Call: self.generate_call,
+        }
+        self.size_dispatch = {
+            Type: lambda t: 1,
+            SubrangeType: lambda t: 1,
+            EnumeratedType: lambda t: 1,
+            ArrayType: self.size_of_array,
+        }
+
+        # emit() é chamado para cada instrução: fica ligado diretamente ao append
+        self.emit = self.code.append
+
+    def begin_fragment(self):
+        # cada fragmento tem o seu código e os seus rótulos, a começar do zero
+        self.code = []
+        self.emit = self.code.append
+        self.labelgen = LabelGen()
+        self.labels: List[str] = []      # rótulos criados (locais ao fragmento)
+        self.calls = set()               # rótulos FUNC usados
 
     def new_label(self, base='L'):
-        return self.labelgen.new(base)
+        lbl = self.labelgen.new(base)
+        self.labels.append(lbl)
+        return lbl
 
     # alocação de memória para variáveis
     def size_of_type(self, type_node):
-        if type(type_node).__name__ == 'Type':
-            return 1
-        elif type(type_node).__name__ == 'ArrayType':
-            prod = 1
-            for ordinal in type_node.ordinals:
-                if type(ordinal).__name__ == 'SubrangeType':
-                    low = ordinal.low.value if isinstance(ordinal.low, Literal) else None
-                    high = ordinal.high.value if isinstance(ordinal.high, Literal) else None
-                    if low is None or high is None:
-                        raise NotImplementedError("Array com limites não-constantes não suportado (ainda).")
-                    prod *= (high - low + 1)
-                else:
-                    raise NotImplementedError("Array com ordinal não-subrange não suportado (ainda).")
-            elem_size = self.size_of_type(type_node.elemtype)
-            return prod * elem_size
-        elif type(type_node).__name__ == 'SubrangeType':
-            return 1
-        else:
-            return 1
+        handler = self.size_dispatch.get(type(type_node))
+        return handler(type_node) if handler else 1
+
+    def size_of_array(self, type_node: ArrayType):
+        return self.array_layout(type_node).size
+
+    def array_layout(self, type_node: ArrayType) -> ArrayLayout:
+        layout = self.layouts.get(id(type_node))
+        if layout is not None:
+            return layout
+        lows, highs = [], []
+        for ordinal in type_node.ordinals:
+            if isinstance(ordinal, SubrangeType):
+                low = ordinal.low.value if isinstance(ordinal.low, Literal) else None
+                high = ordinal.high.value if isinstance(ordinal.high, Literal) else None
+                if low is None or high is None:
+                    raise CodegenError("Array com limites não-constantes não suportado (ainda).")
+                lows.append(low)
+                highs.append(high)
+            else:
+                raise CodegenError("Array com ordinal não-subrange não suportado (ainda).")
+        layout = ArrayLayout(lows, highs, self.size_of_type(type_node.elemtype))
+        self.layouts[id(type_node)] = layout
+        return layout
+
+    def var_meta(self, idx, type_node, size):
+        meta = {'idx': idx, 'size': size, 'type': type_node}
+        if isinstance(type_node, ArrayType):
+            meta['layout'] = self.array_layout(type_node)
+        return meta
 
     def allocate_globals(self, var_decls: List[VarDecl]):
         for vdecl in var_decls:
             tnode = vdecl.type
             size_per_name = self.size_of_type(tnode)
             for name in vdecl.names:
-                if name in self.globals:
-                    raise Exception(f"Variável global repetida: {name}")
-                self.globals[name] = {'idx': self.next_gp, 'size': size_per_name, 'type': tnode}
+                key = name.upper()
+                if key in self.globals:
+                    raise CodegenError(f"Variável global repetida: {name}")
+                self.globals[key] = self.var_meta(self.next_gp, tnode, size_per_name)
                 self.next_gp += size_per_name
 
     # frames para funções
     def enter_frame(self):
+        self.frame_next.append(self.next_local)
         self.current_locals = {}
         self.local_frames.append(self.current_locals)
         self.next_local = 0
 
     def exit_frame(self):
+        # o frame de fora continua onde estava (um array ocupa vários slots,
+        # por isso não se pode contar pelo número de nomes)
         self.local_frames.pop()
         self.current_locals = self.local_frames[-1] if self.local_frames else {}
-        self.next_local = len(self.current_locals)
+        self.next_local = self.frame_next.pop()
 
-    def allocate_local(self, name, type_node=None, size=None):
+    def allocate_local(self, name, type_node=None, size=None, idx=None):
         sz = size if size is not None else (self.size_of_type(type_node) if type_node else 1)
-        idx = self.next_local
-        self.current_locals[name] = {'idx': idx, 'size': sz, 'type': type_node}
-        self.next_local += sz
+        if idx is None:
+            idx = self.next_local
+            self.next_local += sz
+        self.current_locals[name.upper()] = self.var_meta(idx, type_node, sz)
         return idx
 
-    def lookup_var(self, name) -> Tuple[str, int, Dict]:
-        if name in self.current_locals:
-            meta = self.current_locals[name]
-            return ('fp', meta['idx'], meta)
-        if name in self.globals:
-            meta = self.globals[name]
-            return ('gp', meta['idx'], meta)
-        self.globals[name] = {'idx': self.next_gp, 'size': 1, 'type': None}
-        self.next_gp += 1
-        return ('gp', self.globals[name]['idx'], self.globals[name])
+    # os nomes são guardados em maiúsculas: Pascal não distingue Soma de SOMA
+    def lookup_var(self, name) -> Tuple[object, int, Dict]:
+        # 'fp' (frame atual), 'gp' (global) ou, para uma variável de um
+        # subprograma envolvente, o número de níveis até ao frame dela
+        key = name.upper()
+        frames = self.local_frames
+        for hops in range(len(frames)):
+            meta = frames[-1 - hops].get(key)
+            if meta is not None:
+                return ('fp' if hops == 0 else hops), meta['idx'], meta
+        meta = self.globals.get(key)
+        if meta is None:
+            # a análise semântica já rejeitou as variáveis não declaradas
+            raise CodegenError(f"Erro interno: variável sem slot reservado: {name}")
+        return ('gp', meta['idx'], meta)
 
-    def infer_type(self, expr):
-        if expr is None:
-            return None
+    # slots auxiliares do gerador: globais no programa principal, locais nas funções
+    def hidden_slot(self, name) -> Tuple[str, int]:
+        key = name.upper()
+        if len(self.local_frames) == 0:
+            if key not in self.globals:
+                self.globals[key] = {'idx': self.next_gp, 'size': 1, 'type': None}
+                self.next_gp += 1
+            return ('gp', self.globals[key]['idx'])
+        if key not in self.current_locals:
+            self.allocate_local(name)
+        return ('fp', self.current_locals[key]['idx'])
 
-        # Literais
-        if isinstance(expr, Literal):
-            v = expr.value
-            if isinstance(v, bool):
-                return "int"
-            if isinstance(v, int):
-                return "int"
-            if isinstance(v, float):
-                return "float"
-            if isinstance(v, str):
-                return "string"
-            return None
+    # ---------------------------
+    # Acesso a variáveis
+    # ---------------------------
+    # Um frame de um subprograma encaixado guarda em fp - 1 o endereço do
+    # frame do subprograma onde foi declarado (static link); os frames de
+    # fora alcançam-se seguindo essa cadeia.
+    def emit_frame_address(self, hops):
+        self.emit(('PUSHL', -1))
+        for _ in range(hops - 1):
+            self.emit(('LOAD', -1))
 
-        # Acesso a variável
-        if isinstance(expr, VarAccess):
-            storage, idx, meta = self.lookup_var(expr.name)
-            t = meta.get('type')
-            if isinstance(t, Type):
-                name = t.name.upper()
-                if name in ("INTEGER", "INT"):
-                    return "int"
-                if name in ("REAL", "FLOAT"):
-                    return "float"
-                if name == "STRING":
-                    return "string"
-            return None
+    def emit_pointer(self, storage, idx):
+        # o endereço guardado num parâmetro var
+        if storage == 'fp':
+            self.emit(('PUSHL', idx))
+        else:
+            self.emit_frame_address(storage)
+            self.emit(('LOAD', idx))
 
-        # Operadores binários
-        if isinstance(expr, BinOp):
-            lt = self.infer_type(expr.left)
-            rt = self.infer_type(expr.right)
-            if expr.op in ('=', '<', '>', '<=', '>=', '<>'):
-                return "int"
-            # se qualquer lado for float -> float
-            if lt == "float" or rt == "float":
-                return "float"
-            # fallback inteiro
-            return "int"
+    def emit_load_var(self, name):
+        storage, idx, meta = self.lookup_var(name)
+        if meta.get('byref', False):
+            self.emit_pointer(storage, idx)
+            self.emit(('LOAD', 0))
+        elif storage == 'gp':
+            self.emit(('PUSHG', idx))
+        elif storage == 'fp':
+            self.emit(('PUSHL', idx))
+        else:
+            self.emit_frame_address(storage)
+            self.emit(('LOAD', idx))
 
-        if isinstance(expr, UnOp):
-            return self.infer_type(expr.expr)
+    def begin_store_var(self, name) -> Instr:
+        # emite o endereço (se for preciso) e devolve a instrução que guarda
+        # na variável o valor calculado a seguir
+        storage, idx, meta = self.lookup_var(name)
+        if meta.get('byref', False):
+            self.emit_pointer(storage, idx)
+            return ('STORE', 0)
+        if storage == 'gp':
+            return ('STOREG', idx)
+        if storage == 'fp':
+            return ('STOREL', idx)
+        self.emit_frame_address(storage)
+        return ('STORE', idx)
 
-        if isinstance(expr, Call):
-            return None
+    def emit_base(self, storage, idx, meta) -> int:
+        # endereço a que se soma o deslocamento de um elemento de array;
+        # devolve o deslocamento do início do array a partir dele
+        if meta.get('byref', False):
+            self.emit_pointer(storage, idx)
+            return 0
+        if storage == 'gp':
+            self.emit(('PUSHGP', None))
+        elif storage == 'fp':
+            self.emit(('PUSHFP', None))
+        else:
+            self.emit_frame_address(storage)
+        return idx
 
-        return None
+    def emit_var_address(self, arg):
+        # argumento de um parâmetro var: o endereço da variável ou do elemento
+        if not isinstance(arg, VarAccess):
+            raise CodegenError("Argumento var tem de ser uma variável")
+        if arg.suffixes:
+            self.generate_array_address(arg.name, self.array_indices(arg))
+            return
+        storage, idx, meta = self.lookup_var(arg.name)
+        if meta.get('byref', False):
+            self.emit_pointer(storage, idx)
+            return
+        self.emit(('PUSHI', self.emit_base(storage, idx, meta)))
+        self.emit(('PADD', None))
 
-    def generate_program(self, program: Program) -> str:
-        self.emit("START")
-        self.allocate_globals(program.block.vars)
-        for decl in program.block.procsfuncs:
-            if isinstance(decl, Proc) or isinstance(decl, Func):
-                self.func_labels[decl.name] = f"FUNC{decl.name}"
-        self.generate_block(program.block, is_main=True)
-        self.emit("STOP")
-        self.code += self.postamble
-        return "\n".join(self.code)
-
-    def generate_block(self, block: Block, is_main=False):
-        if not is_main:
-            self.enter_frame()
-            for vdecl in block.vars:
-                for name in vdecl.names:
-                    self.allocate_local(name, vdecl.type)
-        else:
-            pass
+    def emit_push_slot(self, slot):
+        storage, idx = slot
+        self.emit(('PUSHG' if storage == 'gp' else 'PUSHL', idx))
 
-        for decl in block.procsfuncs:
-            if isinstance(decl, Proc) or isinstance(decl, Func):
-                self.func_labels[decl.name] = f"FUNC{decl.name}"
+    def emit_store_slot(self, slot):
+        storage, idx = slot
+        self.emit(('STOREG' if storage == 'gp' else 'STOREL', idx))
+
+    def infer_type(self, expr):
+        # tipo anotado pela análise semântica (semantic.py)
+        return getattr(expr, 'etype', None)
+
+    def generate_program(self, program: Program, binary=False):
+        with phase_of(self.stats)('codegen'):
+            self.prepare(program)
+            fragments = [self.generate_main(program)]
+            fragments += [self.generate_fragment(decl) for decl in program.block.procsfuncs]
+        return self.finish(fragments, binary)
+
+    def prepare(self, program: Program):
+        """Analisa (se preciso) e reserva o que é comum a todos os fragmentos:
+        variáveis globais e rótulos FUNC."""
+        if not getattr(program, 'analyzed', False):
+            errors = analyze(program)
+            if errors:
+                raise SemanticError(errors)
+        self.allocate_globals(program.block.vars)
+        # nível de encaixe: 1 para os subprogramas do programa principal. Os
+        # de topo ficam com FUNC<nome>; os encaixados levam o caminho desde o
+        # topo (FUNC<pai>_<nome>)
+        taken = set()
+        queue = [(decl, 1, '') for decl in program.block.procsfuncs]
+        for decl, level, path in queue:
+            path += decl.name
+            label = f"FUNC{path}"
+            if label in taken:
+                label = f"{label}_{len(taken)}"
+            taken.add(label)
+            self.func_labels[decl] = label
+            self.levels[decl] = level
+            queue.extend((d, level + 1, path + '_') for d in decl.block.procsfuncs)
 
-        self.generate_statement(block.compound)
+    def finish(self, fragments: List[Fragment], binary=False):
+        phase = phase_of(self.stats)
+        with phase('link'):
+            code = link(fragments)
+        if self.peephole:
+            with phase('peephole'):
+                code = self.peephole.optimize(code)
+        self.code = code
+        if self.stats is not None:
+            ops = count_instructions(code)
+            self.stats.count('fragments', len(fragments))
+            self.stats.count('instructions', sum(ops.values()))
+            self.stats.count('labels', len(code) - sum(ops.values()))
+            self.stats.count('opcodes', ops)
+            if self.frame_stats:
+                self.stats.count('frames', {name: {'size': size, 'shared': shared}
+                                            for name, size, shared in self.frame_stats})
+            if self.tail_calls:
+                self.stats.count('tail_calls', self.tail_jumps)
+            if self.checks:
+                self.stats.count('bounds_checks', {'emitted': self.checks_emitted,
+                                                   'elided': self.checks_elided})
+        with phase('output'):
+            if binary:
+                # as instruções vão diretamente para o formato binário, sem
+                # passar por texto
+                return bytecode_ewvm.encode(assemble_instrs(code))
+            return "\n".join(map(format_instr, code))
 
-        for decl in block.procsfuncs:
-            if isinstance(decl, Proc):
-                self.generate_proc(decl)
-            elif isinstance(decl, Func):
-                self.generate_func(decl)
+    def generate_main(self, program: Program) -> Fragment:
+        self.begin_fragment()
+        self.emit(('START', None))
+        self.generate_statement(program.block.compound)
+        self.emit(('STOP', None))
+        # as globais (e as auxiliares do programa principal, já todas criadas)
+        # ficam na base da pilha, reservadas antes de START
+        if self.next_gp:
+            self.code.insert(0, ('PUSHN', self.next_gp))
+        return Fragment(None, self.code, (), self.labels, self.calls)
 
-        if not is_main:
-            self.exit_frame()
+    def generate_fragment(self, decl) -> Fragment:
+        """Fragmento de um subprograma de topo e dos que estão dentro dele."""
+        self.begin_fragment()
+        entries = []
+        self.generate_subprogram(decl, entries)
+        return Fragment(decl.name, self.code, entries, self.labels + entries, self.calls)
 
     # ----------------------------------------------------
     # procedures / functions
     # ----------------------------------------------------
-    def generate_proc(self, proc: Proc):
-        lbl = self.func_labels.get(proc.name, f"FUNC{proc.name}")
-        self.emit_post(f"{lbl}:")
-        self.enter_frame()
-        params = proc.params or []
-        for p in params:
-            for name in p.names:
-                self.allocate_local(name, p.type)
-                self.current_locals[name]['byref'] = getattr(p, 'byref', False)
-        for vdecl in proc.block.vars:
-            for name in vdecl.names:
-                self.allocate_local(name, vdecl.type)
-        for p in reversed(params):
-            for name in reversed(p.names):
-                meta = self.current_locals[name]
-                idx = meta['idx']
-                self.emit(f"STOREL {idx}")
-        self.generate_statement(proc.block.compound)
-        self.emit_post("RETURN")
-        self.exit_frame()
+    # Convenção de chamada: quem chama empilha o slot do resultado (funções),
+    # os argumentos (o endereço, num parâmetro var) e, num subprograma
+    # encaixado, o static link; depois do CALL retira tudo menos o resultado.
+    # O subprograma lê os argumentos onde estão, abaixo de fp:
+    #
+    #   fp - n - 2     resultado
+    #   fp - n - 1 ..  argumentos 1..n
+    #   fp - 1         static link (frame do subprograma que o declara)
+    #   fp + k         variáveis locais
+    def frame_below(self, decl) -> int:
+        nparams = sum(len(p.names) for p in decl.params or [])
+        return nparams + (1 if self.levels[decl] > 1 else 0)
 
-    def generate_func(self, func: Func):
-        lbl = self.func_labels.get(func.name, f"FUNC_{func.name}")
-        self.emit_post(f"{lbl}:")
+    def generate_subprogram(self, decl, entries):
+        entries.append(self.func_labels[decl])
+        self.emit((':', self.func_labels[decl]))
         self.enter_frame()
-        params = func.params or []
-        for p in params:
+        below = self.frame_below(decl)
+        k = -below
+        for p in decl.params or []:
+            byref = getattr(p, 'byref', False)
+            if not byref and self.size_of_type(p.type) != 1:
+                raise CodegenError("Array passado por valor não suportado (use var).")
             for name in p.names:
-                self.allocate_local(name, p.type)
-                self.current_locals[name]['byref'] = getattr(p, 'byref', False)
-        for vdecl in func.block.vars:
+                self.allocate_local(name, p.type, size=1, idx=k)
+                self.current_locals[name.upper()]['byref'] = byref
+                k += 1
+        if isinstance(decl, Func):
+            self.allocate_local(decl.name, decl.rettype, size=1, idx=-below - 1)
+        # slots com tempos de vida disjuntos são partilhados (frame_ewvm)
+        plan = plan_frame(decl, self.size_of_type)
+        for vdecl in decl.block.vars:
             for name in vdecl.names:
-                self.allocate_local(name, vdecl.type)
-        for p in reversed(params):
-            for name in reversed(p.names):
-                meta = self.current_locals[name]
-                self.emit(f"STOREL {meta['idx']}")
-        self.generate_statement(func.block.compound)
-        self.emit_post("RETURN")
+                self.allocate_local(name, vdecl.type, idx=plan.slots[name.upper()])
+        self.next_local = plan.size
+        tail = self.self_tail_calls(decl) if self.tail_calls else set()
+        if tail:
+            self.tail = (decl, self.new_label("tail"), tail)
+            self.emit((':', self.tail[1]))
+        # o frame inteiro é reservado com um só PUSHN, com o tamanho final
+        # (os slots escondidos do gerador só se conhecem depois do corpo)
+        reserve = len(self.code)
+        self.emit(('PUSHN', 0))
+        self.generate_statement(decl.block.compound)
+        self.emit(('RETURN', None))
+        self.tail = None
+        # os POP dos saltos finais libertam o mesmo frame
+        for k in reversed(self.tail_pops):
+            if self.next_local:
+                self.code[k] = ('POP', self.next_local)
+            else:
+                del self.code[k]
+        self.tail_pops = []
+        if self.next_local:
+            self.code[reserve] = ('PUSHN', self.next_local)
+        else:
+            del self.code[reserve]
+        if self.stats is not None:
+            self.frame_stats.append((decl.name, self.next_local, plan.shared))
+        # os encaixados são gerados com este frame ainda visível: é por ele
+        # que chegam às variáveis de fora
+        for d in decl.block.procsfuncs:
+            self.generate_subprogram(d, entries)
         self.exit_frame()
 
+    # Uma chamada recursiva a si próprio em posição final (P(...) como última
+    # instrução, ou F := F(...)) não precisa de um frame novo: os argumentos
+    # passam para os slots dos parâmetros e salta-se para o início, depois de
+    # libertar as variáveis locais (o PUSHN volta a pô-las a 0, como numa
+    # chamada, e os slots partilhados não trazem valores da volta anterior).
+    def is_self_call(self, expr, decl):
+        if not isinstance(expr, Call):
+            return False
+        return getattr(getattr(expr, 'sym', None), 'decl', None) is decl
+
+    def keeps_frame_free(self, call, decl):
+        # um argumento var com o endereço de uma variável deste frame ficaria
+        # a apontar para um slot que o salto volta a zerar ou reescreve; só
+        # passam globais, variáveis de fora e parâmetros var (o endereço
+        # que já traziam)
+        byref = [getattr(p, 'byref', False) for p in decl.params or [] for _ in p.names]
+        for arg, ref in zip(call.args, byref):
+            if ref and isinstance(arg, VarAccess):
+                storage, idx, meta = self.lookup_var(arg.name)
+                if storage == 'fp' and not meta.get('byref', False):
+                    return False
+        return True
+
+    def self_tail_calls(self, decl):
+        out = set()
+        for stmt in tail_statements(decl.block.compound):
+            if isinstance(stmt, Call) and isinstance(decl, Proc) and self.is_self_call(stmt, decl):
+                call = stmt
+            elif isinstance(stmt, Assign) and isinstance(decl, Func) \
+                    and not stmt.target.suffixes \
+                    and stmt.target.name.upper() == decl.name.upper() \
+                    and self.is_self_call(stmt.expr, decl):
+                call = stmt.expr
+            else:
+                continue
+            if self.keeps_frame_free(call, decl):
+                out.add(id(stmt))
+        return out
+
+    def generate_tail_call(self, call: Call):
+        decl, label, _ = self.tail
+        params = [(name, getattr(p, 'byref', False)) for p in decl.params or [] for name in p.names]
+        changed = []
+        for (name, byref), arg in zip(params, call.args):
+            if isinstance(arg, VarAccess) and not arg.suffixes and arg.name.upper() == name.upper():
+                continue    # o argumento é o próprio parâmetro
+            if byref:
+                self.emit_var_address(arg)
+            else:
+                self.generate_expr(arg)
+            changed.append(name)
+        # todos os argumentos são calculados antes de mudar os parâmetros
+        for name in reversed(changed):
+            self.emit(('STOREL', self.current_locals[name.upper()]['idx']))
+        if isinstance(decl, Func):
+            # uma chamada começa com o resultado a 0 (o PUSHI 0 de quem chama)
+            self.emit(('PUSHI', 0))
+            self.emit(('STOREL', self.current_locals[decl.name.upper()]['idx']))
+        self.tail_pops.append(len(self.code))
+        self.emit(('POP', 0))
+        self.emit(('JUMP', label))
+        self.tail_jumps += 1
+
     # ---------------------
     # Statements
     # ---------------------
     def generate_statement(self, stmt):
-        if stmt is None:
+        try:
+            handler = self.stmt_dispatch[type(stmt)]
+        except KeyError:
+            if stmt is None:
+                return
+            raise CodegenError(f"Statement não suportado: {type(stmt).__name__}")
+        handler(stmt)
+
+    def generate_compound(self, stmt: CompoundStatement):
+        gen = self.generate_statement
+        for s in stmt.statements:
+            gen(s)
+
+    def generate_assign(self, stmt: Assign):
+        target = stmt.target
+        if not isinstance(target, VarAccess):
+            raise CodegenError("Assign target inesperado")
+        if target.suffixes:
+            self.generate_store_to_array(target, stmt.expr)
             return
-        t = type(stmt).__name__
-        if t == "CompoundStatement":
-            for s in stmt.statements:
-                self.generate_statement(s)
-        elif t == "Assign":
-            self.generate_expr(stmt.expr)
-            target = stmt.target
-            if not isinstance(target, VarAccess):
-                raise Exception("Assign target inesperado")
-            if target.suffixes:
-                self.generate_store_to_array(target)
-            else:
-                storage, idx, meta = self.lookup_var(target.name)
-                if meta.get('byref', False):
-                    self.emit(f"PUSHL {idx}")
-                    self.emit("STOREN")
-                else:
-                    if storage == 'gp':
-                        self.emit(f"STOREG {idx}")
-                    else:
-                        self.emit(f"STOREL {idx}")
-        elif t == "If":
-            else_lbl = self.new_label("else")
-            end_lbl = self.new_label("ifend")
-            self.generate_expr(stmt.cond)
-            self.emit(f"JZ {else_lbl}")
-            self.generate_statement(stmt.thenstmt)
-            self.emit(f"JUMP {end_lbl}")
-            self.emit(f"{else_lbl}:")
-            if stmt.elsestmt:
-                self.generate_statement(stmt.elsestmt)
-            self.emit(f"{end_lbl}:")
-        elif t == "While":
-            start = self.new_label("whilestart")
-            end = self.new_label("whileend")
-            self.emit(f"{start}:")
-            self.generate_expr(stmt.cond)
-            self.emit(f"JZ {end}")
-            self.generate_statement(stmt.body)
-            self.emit(f"JUMP {start}")
-            self.emit(f"{end}:")
-        elif t == "For":
-            varname = stmt.var
-            self.generate_expr(stmt.start)
-            storage, idx, meta = self.lookup_var(varname)
-            if storage == 'gp':
-                self.emit(f"STOREG {idx}")
-            else:
-                self.emit(f"STOREL {idx}")
-            start_lbl = self.new_label("forstart")
-            end_lbl = self.new_label("forend")
-            self.emit(f"{start_lbl}:")
-            if storage == 'gp':
-                self.emit(f"PUSHG {idx}")
-            else:
-                self.emit(f"PUSHL {idx}")
-            self.generate_expr(stmt.end)
-            if stmt.downto:
-                self.emit("SUPEQ")
-            else:
-                self.emit("INFEQ")
-            self.emit(f"JZ {end_lbl}")
-            self.generate_statement(stmt.body)
-            if storage == 'gp':
-                self.emit(f"PUSHG {idx}")
-            else:
-                self.emit(f"PUSHL {idx}")
-            self.emit("PUSHI 1")
-            if stmt.downto:
-                self.emit("SUB")
+        if self.tail is not None and id(stmt) in self.tail[2]:
+            self.generate_tail_call(stmt.expr)
+            return
+        store = self.begin_store_var(target.name)
+        self.generate_expr(stmt.expr)
+        if self.checks and target.name.startswith('__inv'):
+            # as invariantes de optimize_loops só são atribuídas aqui, antes
+            # do ciclo: o intervalo do valor serve para provar os índices
+            rng = self.value_range(stmt.expr)
+            if rng is not None:
+                self.ranges[target.name.upper()] = rng
+        self.emit(store)
+
+    def generate_if(self, stmt: If):
+        else_lbl = self.new_label("else")
+        end_lbl = self.new_label("ifend")
+        self.generate_expr(stmt.cond)
+        self.emit(('JZ', else_lbl))
+        self.generate_statement(stmt.thenstmt)
+        self.emit(('JUMP', end_lbl))
+        self.emit((':', else_lbl))
+        if stmt.elsestmt:
+            self.generate_statement(stmt.elsestmt)
+        self.emit((':', end_lbl))
+
+    def generate_while(self, stmt: While):
+        start = self.new_label("whilestart")
+        end = self.new_label("whileend")
+        self.emit((':', start))
+        self.generate_expr(stmt.cond)
+        self.emit(('JZ', end))
+        self.generate_statement(stmt.body)
+        self.emit(('JUMP', start))
+        self.emit((':', end))
+
+    def assigned_in(self, stmt):
+        # uma escrita num parâmetro var pode mudar qualquer variável
+        names = assigned_vars(stmt)
+        if names is not ALL and any(self.lookup_var(n)[2].get('byref', False) for n in names):
+            return ALL
+        return names
+
+    def generate_for(self, stmt: For):
+        varname = stmt.var
+        store = self.begin_store_var(varname)
+        self.generate_expr(stmt.start)
+        self.emit(store)
+        # o limite é avaliado uma só vez, como em Pascal; se não for um
+        # literal ou uma variável que o corpo não altera, fica num slot escondido
+        self.for_depth += 1
+        end_expr = stmt.end
+        body_assigns = None
+        if self.loop_opt or self.checks or isinstance(end_expr, VarAccess):
+            body_assigns = self.assigned_in(stmt.body)
+        simple_end = isinstance(end_expr, Literal) or (
+            isinstance(end_expr, VarAccess) and not end_expr.suffixes
+            and body_assigns is not ALL and end_expr.name.upper() not in body_assigns
+            and not self.lookup_var(end_expr.name)[2].get('byref', False))
+        if not simple_end:
+            self.generate_expr(end_expr)
+            end_slot = self.hidden_slot(f"__forend{self.for_depth}")
+            self.emit_store_slot(end_slot)
+        var_key = varname.upper()
+        outer_range = self.ranges.pop(var_key, None)
+        if self.checks and body_assigns is not ALL and var_key not in body_assigns:
+            rng = self.loop_range(stmt)
+            if rng is not None:
+                self.ranges[var_key] = rng
+        pointers = self.plan_pointers(stmt, body_assigns) if self.loop_opt else []
+        for ptr in pointers:
+            self.generate_array_address(ptr['name'], ptr['indices'])
+            self.emit_store_slot(ptr['slot'])
+            for node, off in ptr['accesses']:
+                self.reduced[id(node)] = (ptr['slot'], off)
+        start_lbl = self.new_label("forstart")
+        end_lbl = self.new_label("forend")
+        self.emit((':', start_lbl))
+        self.emit_load_var(varname)
+        if simple_end:
+            self.generate_expr(end_expr)
+        else:
+            self.emit_push_slot(end_slot)
+        if stmt.downto:
+            self.emit(('SUPEQ', None))
+        else:
+            self.emit(('INFEQ', None))
+        self.emit(('JZ', end_lbl))
+        self.generate_statement(stmt.body)
+        for ptr in pointers:
+            self.emit_push_slot(ptr['slot'])
+            self.emit(('PUSHI', -ptr['stride'] if stmt.downto else ptr['stride']))
+            self.emit(('PADD', None))
+            self.emit_store_slot(ptr['slot'])
+            for node, off in ptr['accesses']:
+                del self.reduced[id(node)]
+        store = self.begin_store_var(varname)
+        self.emit_load_var(varname)
+        self.emit(('PUSHI', 1))
+        if stmt.downto:
+            self.emit(('SUB', None))
+        else:
+            self.emit(('ADD', None))
+        self.emit(store)
+        self.emit(('JUMP', start_lbl))
+        self.emit((':', end_lbl))
+        self.for_depth -= 1
+        self.ranges.pop(var_key, None)
+        if outer_range is not None:
+            self.ranges[var_key] = outer_range
+
+    def generate_read(self, stmt: Read):
+        for v in stmt.vars:
+            if v.suffixes:
+                self.generate_store_to_array(v)
+                continue
+            store = self.begin_store_var(v.name)
+            self.generate_input(v)
+            self.emit(store)
+
+    def generate_input(self, v: VarAccess):
+        # lê uma linha e converte-a para o tipo de v
+        self.emit(('READ', None))
+        vtype = self.infer_type(v)
+        if vtype == 'REAL':
+            self.emit(('ATOI', None))
+            self.emit(('ITOF', None))
+        elif vtype == 'CHAR':
+            self.emit(('CHRCODE', None))
+        elif vtype != 'STRING':
+            self.emit(('ATOI', None))
+
+    def generate_write(self, stmt: Write):
+        for wp in stmt.params:
+            width = None; prec = None
+            expr = None
+            if isinstance(wp, tuple):
+                if len(wp) == 2:
+                    expr, width = wp
+                elif len(wp) == 3:
+                    expr, width, prec = wp
             else:
-                self.emit("ADD")
-            if storage == 'gp':
-                self.emit(f"STOREG {idx}")
+                expr = wp
+            self.generate_expr(expr)
+            itype = self.infer_type(expr)
+            if itype == 'REAL':
+                self.emit(('WRITEF', None))
+            elif itype == 'STRING':
+                self.emit(('WRITES', None))
+            elif itype == 'CHAR':
+                self.emit(('WRITECHR', None))
             else:
-                self.emit(f"STOREL {idx}")
-            self.emit(f"JUMP {start_lbl}")
-            self.emit(f"{end_lbl}:")
-        elif t == "Read":
-            for v in stmt.vars:
-                self.emit("READ")
-                storage, idx, meta = self.lookup_var(v.name)
-                tdecl = meta.get('type')
-                if v.suffixes and isinstance(tdecl, ArrayType):
-                    tdecl = tdecl.elemtype
-                if tdecl and hasattr(tdecl, 'name') and tdecl.name.upper() in ('REAL', 'FLOAT'):
-                    self.emit("ATOI")
-                    self.emit("ITOF")
-                else:
-                    self.emit("ATOI")
-                if v.suffixes:
-                    self.generate_store_to_array(v)
-                else:
-                    if storage == 'gp':
-                        self.emit(f"STOREG {idx}")
-                    else:
-                        self.emit(f"STOREL {idx}")
-        elif t == "Write":
-            for wp in stmt.params:
-                width = None; prec = None
-                expr = None
-                if isinstance(wp, tuple):
-                    if len(wp) == 2:
-                        expr, width = wp
-                    elif len(wp) == 3:
-                        expr, width, prec = wp
-                else:
-                    expr = wp
-                self.generate_expr(expr)
-                itype = self.infer_type(expr)
-                if itype == "float":
-                    self.emit("WRITEF")
-                elif itype == "string":
-                    self.emit("WRITES")
-                else:
-                    self.emit("WRITEI")
-            if stmt.newline:
-                self.emit("WRITELN")
-        else:
-            raise NotImplementedError(f"Statement não suportado: {t}")
+                self.emit(('WRITEI', None))
+        if stmt.newline:
+            self.emit(('WRITELN', None))
 
     # ---------------------
     # Expressões
     # ---------------------
     def generate_expr(self, expr):
-        if expr is None:
-            return
-        t = type(expr).__name__
-        if t == "Literal":
-            v = expr.value
-            if isinstance(v, bool):
-                self.emit(f"PUSHI {1 if v else 0}")
-            elif isinstance(v, int):
-                self.emit(f"PUSHI {v}")
-            elif isinstance(v, float):
-                self.emit(f"PUSHF {v}")
-            elif isinstance(v, str):
-                if v.upper() == 'TRUE':
-                    self.emit("PUSHI 1")
-                elif v.upper() == 'FALSE':
-                    self.emit("PUSHI 0")
-                else:
-                    s = v.replace('"', '\\"')
-                    self.emit(f'PUSHS "{s}"')
+        try:
+            handler = self.expr_dispatch[type(expr)]
+        except KeyError:
+            if expr is None:
+                return
+            raise CodegenError(f"Expr tipo não suportado: {type(expr).__name__}")
+        handler(expr)
+
+    def generate_literal(self, expr: Literal):
+        v = expr.value
+        if isinstance(v, bool):
+            self.emit(('PUSHI', 1 if v else 0))
+        elif isinstance(v, int):
+            self.emit(('PUSHI', v))
+        elif isinstance(v, float):
+            self.emit(('PUSHF', v))
+        elif isinstance(v, str):
+            if v.upper() == 'TRUE':
+                self.emit(('PUSHI', 1))
+            elif v.upper() == 'FALSE':
+                self.emit(('PUSHI', 0))
+            elif self.infer_type(expr) == 'CHAR':
+                # um CHAR é guardado como o código do carácter
+                self.emit(('PUSHI', ord(v)))
             else:
-                raise NotImplementedError("Literal tipo não suportado.")
-        elif t == "VarAccess":
-            if expr.suffixes:
-                self.generate_load_from_array(expr)
+                self.emit(('PUSHS', v))
+        else:
+            raise CodegenError("Literal tipo não suportado.")
+
+    def generate_var(self, expr: VarAccess):
+        if expr.suffixes:
+            sym = getattr(expr, 'sym', None)
+            if sym is not None and sym.etype == 'STRING':
+                self.generate_string_index(expr)
             else:
-                storage, idx, meta = self.lookup_var(expr.name)
-                if meta.get('byref', False):
-                    self.emit(f"PUSHL {idx}")
-                    self.emit("LOADN")
-                else:
-                    if storage == 'gp':
-                        self.emit(f"PUSHG {idx}")
-                    else:
-                        self.emit(f"PUSHL {idx}")
-        elif t == "BinOp":
-            self.generate_expr(expr.left)
-            self.generate_expr(expr.right)
-            op = expr.op
-            ltype = self.infer_type(expr.left) or "int"
-            rtype = self.infer_type(expr.right) or "int"
-            use_float = (ltype == "float" or rtype == "float")
+                self.generate_load_from_array(expr)
+        elif getattr(expr, 'sym', None) is not None and expr.sym.kind == 'func':
+            # função sem parâmetros usada como valor (a AST não passou por
+            # optimize_ast, que já a troca por uma Call)
+            call = Call(expr.name, [])
+            call.sym = expr.sym
+            self.generate_call(call)
+        else:
+            self.emit_load_var(expr.name)
+
+    def generate_binop(self, expr: BinOp):
+        dispatch = self.expr_dispatch
+        dispatch[type(expr.left)](expr.left)
+        dispatch[type(expr.right)](expr.right)
+        op = expr.op
+        instrs = BINOPS.get(op) or BINOPS.get(op.upper())
+        if instrs is None:
+            raise CodegenError(f"Operador binário não suportado: {op}")
+        if op == '+' and self.infer_type(expr) == 'STRING':
+            self.emit(('CONCAT', None))
+            return
+        # '/' é sempre divisão real
+        use_float = op == '/' or self.infer_type(expr.left) == 'REAL' or self.infer_type(expr.right) == 'REAL'
+        for instr in instrs[1 if use_float else 0]:
+            self.emit((instr, None))
+
+    def generate_unop(self, expr: UnOp):
+        op = expr.op
+        if op == '+' or op == '-':
             if op == '+':
-                self.emit("FADD" if use_float else "ADD")
-            elif op == '-':
-                self.emit("FSUB" if use_float else "SUB")
-            elif op == '*':
-                self.emit("FMUL" if use_float else "MUL")
-            elif op == '/':
-                if use_float:
-                    self.emit("FDIV")
-                else:
-                    self.emit("DIV")
-            elif op.upper() == 'DIV':
-                self.emit("DIV")
-            elif op.upper() == 'MOD':
-                self.emit("MOD")
-            elif op == '=':
-                self.emit("EQUAL")
-            elif op == '<':
-                self.emit("INF")
-            elif op == '<=':
-                self.emit("INFEQ")
-            elif op == '>':
-                self.emit("SUP")
-            elif op == '>=':
-                self.emit("SUPEQ")
-            elif op.upper() == 'AND':
-                self.emit("AND")
-            elif op.upper() == 'OR':
-                self.emit("OR")
+                self.generate_expr(expr.expr)
             else:
-                raise NotImplementedError(f"Operador binário não suportado: {op}")
-        elif t == "UnOp":
-            op = expr.op
-            if op == '+' or op == '-':
-                if op == '+':
-                    self.generate_expr(expr.expr)
-                else:
-                    self.emit("PUSHI 0")
-                    self.generate_expr(expr.expr)
-                    self.emit("SUB")
-            elif op.upper() == 'NOT':
+                self.emit(('PUSHI', 0))
                 self.generate_expr(expr.expr)
-                self.emit("NOT")
+                self.emit(('SUB', None))
+        elif op.upper() == 'NOT':
+            self.generate_expr(expr.expr)
+            self.emit(('NOT', None))
+        else:
+            raise CodegenError(f"UnOp não suportado: {op}")
+
+    def generate_call(self, expr: Call):
+        sym = getattr(expr, 'sym', None)
+        if sym is not None and sym.kind == 'builtin':
+            self.generate_builtin(expr)
+            return
+        # a declaração vem do símbolo da análise semântica, não do nome (que
+        # pode ser de um subprograma encaixado que esconde outro)
+        decl = getattr(sym, 'decl', None)
+        if decl is None:
+            raise CodegenError(f"Subprograma desconhecido: {expr.name}")
+        func_label = self.func_labels[decl]
+        self.calls.add(func_label)
+        if isinstance(decl, Func):
+            self.emit(('PUSHI', 0))
+        byref = [getattr(p, 'byref', False) for p in decl.params or [] for _ in p.names]
+        for arg, ref in zip(expr.args, byref):
+            if ref:
+                self.emit_var_address(arg)
             else:
-                raise NotImplementedError(f"UnOp não suportado: {op}")
-        elif t == "Call":
-            func_label = self.func_labels.get(expr.name, f"FUNC_{expr.name}")
-            for arg in expr.args:
                 self.generate_expr(arg)
-            self.emit(f"PUSHA {func_label}")
-            self.emit("CALL")
+        level = self.levels[decl]
+        if level > 1:
+            hops = len(self.local_frames) - (level - 1)
+            if hops == 0:
+                self.emit(('PUSHFP', None))
+            else:
+                self.emit_frame_address(hops)
+        self.emit(('PUSHA', func_label))
+        self.emit(('CALL', None))
+        below = len(expr.args) + (1 if level > 1 else 0)
+        if below:
+            # o RETURN só liberta o frame: os argumentos saem aqui
+            self.emit(('POP', below))
+
+    def generate_call_statement(self, stmt: Call):
+        if self.tail is not None and id(stmt) in self.tail[2]:
+            self.generate_tail_call(stmt)
+            return
+        self.generate_call(stmt)
+        sym = getattr(stmt, 'sym', None)
+        if sym is not None and sym.kind == 'func':
+            self.emit(('POP', 1))     # resultado não usado
+
+    def generate_builtin(self, expr: Call):
+        name = expr.name.upper()
+        if name == 'LENGTH':
+            self.generate_expr(expr.args[0])
+            self.emit(('STRLEN', None))
         else:
-            raise NotImplementedError(f"Expr tipo não suportado: {t}")
+            raise CodegenError(f"Função pré-definida não suportada: {expr.name}")
+
+    def generate_string_index(self, varaccess: VarAccess):
+        # s[i] (1-based) -> código do carácter
+        self.generate_var(VarAccess(varaccess.name, []))
+        self.generate_expr(self.array_indices(varaccess)[0])
+        self.emit(('PUSHI', 1))
+        self.emit(('SUB', None))
+        self.emit(('CHARAT', None))
 
     # ---------------------------
     # Arrays
     # ---------------------------
-    def generate_load_from_array(self, varaccess: VarAccess):
-        storage, base_idx, meta = self.lookup_var(varaccess.name)
-        arr_type = meta.get('type')
-        if not arr_type or type(arr_type).__name__ != 'ArrayType':
-            raise Exception("Acesso a array mas o tipo não é ArrayType conhecido.")
+    def array_indices(self, varaccess: VarAccess):
+        # a[i, j] e a[i][j] são o mesmo acesso
+        return [e for expr_list in varaccess.suffixes for e in expr_list]
 
-        if storage == 'gp':
-            self.emit("PUSHGP")
-            self.emit(f"PUSHI {base_idx}")
-            self.emit("PADD")
-        else:
-            self.emit("PUSHFP")
-            self.emit(f"PUSHI {base_idx}")
-            self.emit("PADD")
-
-        dims = arr_type.ordinals
-        sizes = []
-        for ordinal in dims:
-            low = ordinal.low.value
-            high = ordinal.high.value
-            sizes.append(high - low + 1)
-
-        n_dims = len(sizes)
-        self.emit("PUSHI 0")
-        for i in range(n_dims):
-            expr_list = varaccess.suffixes[i]
-            idx_expr = expr_list[0]
-            self.generate_expr(idx_expr)
-            low_i = dims[i].low.value
-            if low_i != 0:
-                self.emit(f"PUSHI {low_i}")
-                self.emit("SUB")
-            prod = 1
-            for j in range(i+1, n_dims):
-                prod *= sizes[j]
-            if prod != 1:
-                self.emit(f"PUSHI {prod}")
-                self.emit("MUL")
-            self.emit("ADD")
-
-        self.emit("LOADN")
-
-    def generate_store_to_array(self, varaccess: VarAccess):
-        storage, base_idx, meta = self.lookup_var(varaccess.name)
-        arr_type = meta.get('type')
-        if not arr_type or type(arr_type).__name__ != 'ArrayType':
-            raise Exception("Atribuição a array mas o tipo não é ArrayType conhecido.")
-
-        tmp_name = "__tmp_store"
-        is_global_scope = len(self.local_frames) == 0
-        tmp_idx = 0
-
-        if is_global_scope:
-            if tmp_name in self.globals:
-                tmp_idx = self.globals[tmp_name]['idx']
-            else:
-                tmp_idx = self.next_gp
-                self.globals[tmp_name] = {'idx': tmp_idx, 'size': 1, 'type': None}
-                self.next_gp += 1
-            self.emit(f"STOREG {tmp_idx}")
-        else:
-            if tmp_name in self.current_locals:
-                tmp_idx = self.current_locals[tmp_name]['idx']
-            else:
-                tmp_idx = self.allocate_local(tmp_name)
-            self.emit(f"STOREL {tmp_idx}")
+    def array_meta(self, name):
+        storage, base_idx, meta = self.lookup_var(name)
+        if meta.get('layout') is None:
+            raise CodegenError(f"Acesso a array mas o tipo de {name} não é ArrayType conhecido.")
+        return storage, base_idx, meta
 
-        if storage == 'gp':
-            self.emit("PUSHGP")
-            self.emit(f"PUSHI {base_idx}")
-            self.emit("PADD")
+    def constant_element(self, storage, base_idx, meta, indices):
+        # slot absoluto do elemento quando os índices são literais dentro dos
+        # limites (senão None); só para arrays do frame atual ou globais
+        if storage not in ('gp', 'fp') or meta.get('byref', False):
+            return None
+        layout = meta['layout']
+        idx = base_idx - layout.bias
+        for e, low, high, stride in zip(indices, layout.lows, layout.highs, layout.strides):
+            if not (isinstance(e, Literal) and type(e.value) is int and low <= e.value <= high):
+                return None
+            idx += e.value * stride
+        return (storage, idx)
+
+    def generate_array_offset(self, base_idx, layout, indices):
+        # deslocamento do elemento a partir de gp/fp: base + sum(ik * stride) - bias,
+        # com as constantes dos índices (i + c, c) somadas numa só
+        const = base_idx - layout.bias
+        first = True
+        for e, stride, low, high in zip(indices, layout.strides, layout.lows, layout.highs):
+            e, c = index_terms(e)
+            const += c * stride
+            if e is None:
+                if self.checks:
+                    self.check_constant_index(c, low, high)
+                continue
+            self.generate_expr(e)
+            if self.checks:
+                self.check_index(e, low - c, high - c)
+            if stride != 1:
+                self.emit(('PUSHI', stride))
+                self.emit(('MUL', None))
+            if not first:
+                self.emit(('ADD', None))
+            first = False
+        if first:
+            self.emit(('PUSHI', const))
+        elif const:
+            self.emit(('PUSHI', const))
+            self.emit(('ADD', None))
+
+    # ---------------------------
+    # Verificação de limites (--checks)
+    # ---------------------------
+    def check_index(self, expr, low, high):
+        # expr (já na pilha) tem de estar em [low, high]: num índice i + c os
+        # limites vêm já deslocados de c, para não ter de somar c antes do CHECK
+        rng = self.value_range(expr)
+        if rng is not None and low <= rng[0] and rng[1] <= high:
+            self.checks_elided += 1
         else:
-            self.emit("PUSHFP")
-            self.emit(f"PUSHI {base_idx}")
-            self.emit("PADD")
-
-        dims = arr_type.ordinals
-        sizes = []
-        for ordinal in dims:
-            low = ordinal.low.value
-            high = ordinal.high.value
-            sizes.append(high - low + 1)
-
-        n_dims = len(sizes)
-        self.emit("PUSHI 0")
-        for i in range(n_dims):
-            expr_list = varaccess.suffixes[i]
-            idx_expr = expr_list[0]
-            self.generate_expr(idx_expr)
-            low_i = dims[i].low.value
-            if low_i != 0:
-                self.emit(f"PUSHI {low_i}")
-                self.emit("SUB")
-            prod = 1
-            for j in range(i+1, n_dims):
-                prod *= sizes[j]
-            if prod != 1:
-                self.emit(f"PUSHI {prod}")
-                self.emit("MUL")
-            self.emit("ADD")
-
-        if is_global_scope:
-            self.emit(f"PUSHG {tmp_idx}")
+            self.emit(('CHECK', (low, high)))
+            self.checks_emitted += 1
+
+    def check_constant_index(self, value, low, high):
+        if low <= value <= high:
+            self.checks_elided += 1
         else:
-            self.emit(f"PUSHL {tmp_idx}")
+            self.emit(('ERR', f"Índice {value} fora de [{low}, {high}]"))
+            self.checks_emitted += 1
+
+    def value_range(self, expr) -> Optional[Tuple[int, int]]:
+        # intervalo que contém sempre o valor de expr (ou None): literais,
+        # variáveis de For com limites conhecidos e + - * div mod entre eles
+        if isinstance(expr, Literal):
+            v = expr.value
+            return (v, v) if type(v) is int else None
+        if isinstance(expr, VarAccess):
+            return None if expr.suffixes else self.ranges.get(expr.name.upper())
+        if isinstance(expr, UnOp):
+            r = self.value_range(expr.expr) if expr.op == '-' else None
+            return (-r[1], -r[0]) if r else None
+        if not isinstance(expr, BinOp):
+            return None
+        op = expr.op.upper()
+        l = self.value_range(expr.left)
+        r = self.value_range(expr.right)
+        if op == 'MOD' and r is not None and r[0] == r[1] and r[0] > 0:
+            # o resto tem o sinal do dividendo
+            k = r[0] - 1
+            if l is None:
+                return (-k, k)
+            return (max(min(l[0], 0), -k), min(max(l[1], 0), k))
+        if l is None or r is None:
+            return None
+        if op == '+':
+            return (l[0] + r[0], l[1] + r[1])
+        if op == '-':
+            return (l[0] - r[1], l[1] - r[0])
+        if op == '*':
+            products = [a * b for a in l for b in r]
+            return (min(products), max(products))
+        if op == 'DIV' and r[0] == r[1] and r[0] > 0:
+            k = r[0]
+            return (trunc_div(l[0], k), trunc_div(l[1], k))
+        return None
+
+    def in_bounds(self, indices, layout):
+        for e, low, high in zip(indices, layout.lows, layout.highs):
+            rng = self.value_range(e)
+            if rng is None or rng[0] < low or rng[1] > high:
+                return False
+        return True
+
+    def loop_range(self, stmt: For) -> Optional[Tuple[int, int]]:
+        # dentro do corpo, a variável de controlo está entre o início e o
+        # limite (o corpo só corre quando o teste do ciclo passa)
+        start = self.value_range(stmt.start)
+        end = self.value_range(stmt.end)
+        if start is None or end is None:
+            return None
+        if stmt.downto:
+            return (end[0], start[1])
+        return (start[0], end[1])
+
+    def generate_array_address(self, name, indices):
+        storage, base_idx, meta = self.array_meta(name)
+        base_idx = self.emit_base(storage, base_idx, meta)
+        self.generate_array_offset(base_idx, meta['layout'], indices)
+        self.emit(('PADD', None))
+
+    def generate_load_from_array(self, varaccess: VarAccess):
+        reduced = self.reduced.get(id(varaccess))
+        if reduced is not None:
+            slot, off = reduced
+            self.emit_push_slot(slot)
+            self.emit(('LOAD', off))
+            return
+
+        storage, base_idx, meta = self.array_meta(varaccess.name)
+        indices = self.array_indices(varaccess)
+        slot = self.constant_element(storage, base_idx, meta, indices)
+        if slot is not None:
+            self.emit_push_slot(slot)
+            return
+        base_idx = self.emit_base(storage, base_idx, meta)
+        self.generate_array_offset(base_idx, meta['layout'], indices)
+        self.emit(('LOADN', None))
+
+    def generate_store_to_array(self, varaccess: VarAccess, expr=None):
+        # guarda expr (sem expr, o valor lido por readln) em varaccess; o
+        # endereço fica na pilha antes do valor, por isso não é preciso
+        # guardar o valor num slot temporário
+        value = self.generate_input if expr is None else self.generate_expr
+        source = varaccess if expr is None else expr
+        reduced = self.reduced.get(id(varaccess))
+        if reduced is not None:
+            slot, off = reduced
+            self.emit_push_slot(slot)
+            value(source)
+            self.emit(('STORE', off))
+            return
+
+        storage, base_idx, meta = self.array_meta(varaccess.name)
+        indices = self.array_indices(varaccess)
+        slot = self.constant_element(storage, base_idx, meta, indices)
+        if slot is not None:
+            value(source)
+            self.emit_store_slot(slot)
+            return
+        base_idx = self.emit_base(storage, base_idx, meta)
+        self.generate_array_offset(base_idx, meta['layout'], indices)
+        value(source)
+        self.emit(('STOREN', None))
+
+    # ---------------------------
+    # Ciclos: redução de força
+    # ---------------------------
+    def plan_pointers(self, stmt: For, body_assigns):
+        # acessos a[.., i+c, ..] no corpo de um For passam a usar um ponteiro
+        # que avança 'stride' posições por iteração (LOAD/STORE com deslocamento)
+        var = stmt.var.upper()
+        if body_assigns is ALL or var in body_assigns:
+            return []
+        groups = {}
+        for node in array_accesses(stmt.body):
+            if id(node) in self.reduced:
+                continue
+            storage, base_idx, meta = self.lookup_var(node.name)
+            layout = meta.get('layout')
+            if layout is None:
+                continue
+            strides = layout.strides
+            indices = self.array_indices(node)
+            if len(indices) != len(strides):
+                continue
+            if self.checks and not self.in_bounds(indices, layout):
+                continue    # o acesso com CHECK fica fora do ponteiro
+            offsets = [linear_offset(e, var) for e in indices]
+            linear = [d for d, c in enumerate(offsets) if c is not None]
+            if len(linear) != 1:
+                continue
+            d = linear[0]
+            others = [e for k, e in enumerate(indices) if k != d]
+            if not all(self.is_invariant(e, var, body_assigns) for e in others):
+                continue
+            key = (node.name, d, tuple(expr_key(e) for e in others))
+            if key not in groups:
+                init = list(indices)
+                init[d] = VarAccess(stmt.var, [])
+                groups[key] = {'name': node.name, 'indices': init, 'stride': strides[d],
+                               'dims': len(strides), 'accesses': []}
+            groups[key]['accesses'].append((node, offsets[d] * strides[d]))
+
+        pointers = []
+        for g in groups.values():
+            # avançar o ponteiro custa 4 instruções por iteração
+            if len(g['accesses']) < 2 and g['dims'] < 2:
+                continue
+            g['slot'] = self.hidden_slot(f"__ptr{self.for_depth}_{len(pointers)}")
+            pointers.append(g)
+            if self.checks:
+                self.checks_elided += len(g['accesses']) * g['dims']
+        return pointers
+
+    def is_invariant(self, expr, var, body_assigns):
+        if isinstance(expr, Literal):
+            return True
+        if isinstance(expr, VarAccess):
+            if expr.suffixes or expr.name.upper() == var or expr.name.upper() in body_assigns:
+                return False
+            storage, idx, meta = self.lookup_var(expr.name)
+            return not meta.get('byref', False)
+        if isinstance(expr, BinOp):
+            return self.is_invariant(expr.left, var, body_assigns) and \
+                self.is_invariant(expr.right, var, body_assigns)
+        if isinstance(expr, UnOp):
+            return self.is_invariant(expr.expr, var, body_assigns)
+        return False
+
+
+def index_terms(expr):
+    # e + c, e - c, c + e -> (e, c); um literal c -> (None, c); senão (expr, 0)
+    if isinstance(expr, Literal) and type(expr.value) is int:
+        return None, expr.value
+    if isinstance(expr, BinOp) and expr.op in ('+', '-'):
+        l, r = expr.left, expr.right
+        if isinstance(r, Literal) and type(r.value) is int:
+            return l, r.value if expr.op == '+' else -r.value
+        if expr.op == '+' and isinstance(l, Literal) and type(l.value) is int:
+            return r, l.value
+    return expr, 0
+
+
+def linear_offset(expr, var):
+    # i -> 0, i + c -> c, c + i -> c, i - c -> -c ; senão None
+    if isinstance(expr, VarAccess):
+        return 0 if not expr.suffixes and expr.name.upper() == var else None
+    if isinstance(expr, BinOp) and expr.op in ('+', '-'):
+        l, r = expr.left, expr.right
+        if isinstance(r, Literal) and type(r.value) is int and linear_offset(l, var) == 0:
+            return r.value if expr.op == '+' else -r.value
+        if expr.op == '+' and isinstance(l, Literal) and type(l.value) is int and linear_offset(r, var) == 0:
+            return l.value
+    return None
+
+
+def tail_statements(stmt):
+    """Instruções de stmt depois das quais o subprograma termina."""
+    if isinstance(stmt, CompoundStatement):
+        return tail_statements(stmt.statements[-1]) if stmt.statements else []
+    if isinstance(stmt, If):
+        return tail_statements(stmt.thenstmt) + tail_statements(stmt.elsestmt)
+    return [stmt] if stmt is not None else []
+
+
+def array_accesses(stmt):
+    # todos os VarAccess com índices dentro de stmt
+    out = []
+
+    def expr(e):
+        if isinstance(e, VarAccess):
+            if e.suffixes:
+                out.append(e)
+            for lst in e.suffixes:
+                for x in lst:
+                    expr(x)
+        elif isinstance(e, BinOp):
+            expr(e.left)
+            expr(e.right)
+        elif isinstance(e, UnOp):
+            expr(e.expr)
+        elif isinstance(e, Call):
+            for a in e.args:
+                expr(a)
+        elif isinstance(e, tuple):
+            for x in e:
+                expr(x)
+
+    def walk(s):
+        if isinstance(s, CompoundStatement):
+            for x in s.statements:
+                walk(x)
+        elif isinstance(s, Assign):
+            expr(s.target)
+            expr(s.expr)
+        elif isinstance(s, If):
+            expr(s.cond)
+            walk(s.thenstmt)
+            walk(s.elsestmt)
+        elif isinstance(s, While):
+            expr(s.cond)
+            walk(s.body)
+        elif isinstance(s, For):
+            expr(s.start)
+            expr(s.end)
+            walk(s.body)
+        elif isinstance(s, Read):
+            for v in s.vars:
+                expr(v)
+        elif isinstance(s, Write):
+            for wp in s.params:
+                expr(wp)
+        elif isinstance(s, Call):
+            for a in s.args:
+                expr(a)
 
-        self.emit("STOREN")
+    walk(stmt)
+    return out
 
 
 # função de interface
-def generate_ewvm(ast_root: Program) -> str:
-    gen = CodeGenerator()
-    return gen.generate_program(ast_root)
+def generate_ewvm(ast_root: Program, binary=False, peephole=None, loop_opt=False, stats=None,
+                  checks=False, tail_calls=False):
+    if peephole is True:
+        peephole = Peephole()
+    gen = CodeGenerator(peephole=peephole or None, loop_opt=loop_opt, stats=stats, checks=checks,
+                        tail_calls=tail_calls)
+    return gen.generate_program(ast_root, binary=binary)
@@ -0,0 +1,264 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from cache_compilacao import CompileCache
+from estatisticas import CompileStats, phase_of, count_nodes, count_tokens, profiling, tracing_memory
+
+# Interface do compilador para uso a partir de outro código Python:
+#
+#   from compilador import compile, CompileOptions
+#   r = compile(fonte, options=CompileOptions(optimize=True))
+#   r.ok, r.code, r.diagnostics, r.timings
+#
+# O lexer e o parser são construídos uma vez, na primeira compilação (ou em
+# load()), e reutilizados em todas as chamadas seguintes. Com uma
+# CompileCache, um acerto devolve o código guardado sem chegar a construí-los.
+#
+# Com stats=CompileStats() (--stats / --profile na linha de comandos) cada
+# fase regista tempo real, tempo de CPU e contadores (ver estatisticas.py);
+# o relatório JSON vai para o stderr ou para o ficheiro indicado.
+
+
+DEEP_STACK = 512 * 1024 * 1024  # pilha da thread usada para ASTs muito profundas
+DEEP_RECURSION = 1_000_000      # limite de recursão que ainda cabe nessa pilha
+
+# o limite de recursão e o tamanho da pilha das threads novas são globais ao
+# processo: com duas compilações profundas em simultâneo, uma repunha o limite
+# a meio da outra
+_deep_lock = threading.Lock()
+
+
+class CompileOptions:
+    def __init__(self, optimize=False, binary=False, fast_lexer=False, checks=False):
+        self.optimize = optimize      # -O: otimização da AST, dos ciclos, chamadas finais e peephole
+        self.binary = binary          # devolve bytecode (bytes) em vez de texto EWVM
+        self.fast_lexer = fast_lexer  # --lexer-rapido: analex_rapido em vez do lexer PLY
+        self.checks = checks          # --checks: verificação dos índices dos arrays (CHECK)
+
+
+class CompileResult:
+    def __init__(self):
+        self.ast = None
+        self.code = None
+        self.diagnostics: List[str] = []
+        self.timings: Dict[str, float] = {}   # segundos por fase
+        self.cached = False
+
+    @property
+    def ok(self):
+        return self.code is not None
+
+
+def load():
+    """Importa (e constrói) o lexer, o parser e o resto do compilador. O
+    último elemento são as exceções com que o gerador e o ligador recusam
+    um programa."""
+    from parser import parse
+    from codegen_ewvm import generate_ewvm, CodegenError
+    from linker_ewvm import LinkError
+    from optimize_ast import optimize
+    from optimize_loops import optimize_loops
+    from semantic import analyze
+    return parse, optimize, optimize_loops, analyze, generate_ewvm, (CodegenError, LinkError)
+
+
+def compile(source: str, *, options: Optional[CompileOptions] = None,
+            cache: Optional[CompileCache] = None,
+            stats: Optional[CompileStats] = None) -> CompileResult:
+    options = options or CompileOptions()
+    if stats is not None:
+        stats.count('source_bytes', len(source.encode('utf-8')))
+        stats.count('source_lines', source.count('\n') + 1)
+    if cache is not None:
+        t0 = time.perf_counter()
+        with phase_of(stats)('cache'):
+            hit = cache.get(source, options)
+        if hit is not None:
+            result = CompileResult()
+            result.code, result.ast = hit
+            result.cached = True
+            result.timings['cache'] = time.perf_counter() - t0
+            return result
+    try:
+        result = _compile(source, options, stats)
+    except RecursionError:
+        if stats is not None:
+            stats.phases.clear()     # conta só a compilação que chegou ao fim
+            stats.count('deep_stack', True)
+        result = _compile_deep(source, options, stats)
+    if stats is not None:
+        stats.count('diagnostics', len(result.diagnostics))
+    if cache is not None and result.ok:
+        cache.put(source, options, result.code, result.ast)
+    return result
+
+
+def _compile(source, options, stats=None):
+    phase = phase_of(stats)
+    with phase('load'):
+        parse, optimize, optimize_loops, analyze, generate_ewvm, codegen_errors = load()
+    result = CompileResult()
+    timings = result.timings
+
+    if stats is not None:
+        # o PLY lê os tokens à medida que analisa: para saber quanto custa
+        # o lexer sozinho faz-se uma passagem à parte (a fase 'parse' continua
+        # a incluir o lexer)
+        with phase('lex'):
+            stats.count('tokens', count_tokens(source, options.fast_lexer))
+
+    t0 = time.perf_counter()
+    with phase('parse'):
+        ast, errors = parse(source, fast_lexer=options.fast_lexer)
+    t1 = time.perf_counter()
+    timings['parse'] = t1 - t0
+    result.diagnostics.extend(errors)
+    if ast is None:
+        return result
+
+    if stats is not None:
+        stats.count('ast_nodes_parsed', sum(count_nodes(ast).values()))
+
+    level = 1 if options.optimize else 0
+    with phase('optimize'):
+        ast = optimize(ast, level=level)
+        if options.optimize:
+            ast = optimize_loops(ast)
+    t2 = time.perf_counter()
+    timings['optimize'] = t2 - t1
+    result.ast = ast
+    if stats is not None:
+        nodes = count_nodes(ast)
+        stats.count('ast_nodes', sum(nodes.values()))
+        stats.count('ast_node_types', nodes)
+
+    with phase('semantic'):
+        errors = analyze(ast)
+    t3 = time.perf_counter()
+    timings['semantic'] = t3 - t2
+    if errors:
+        result.diagnostics.extend(f"Erro semântico: {e}" for e in errors)
+        return result
+
+    try:
+        result.code = generate_ewvm(ast, binary=options.binary, peephole=options.optimize,
+                                    loop_opt=options.optimize, stats=stats, checks=options.checks,
+                                    tail_calls=options.optimize)
+    except codegen_errors as e:
+        result.diagnostics.append(f"Erro na geração de código: {e}")
+    timings['codegen'] = time.perf_counter() - t3
+    return result
+
+
+def _compile_deep(source, options, stats=None):
+    # O parser já não recorre nas expressões, mas as fases seguintes percorrem
+    # a AST recursivamente: uma expressão gerada com dezenas de milhares de
+    # termos excede o limite do Python. Nesse caso repete-se a compilação numa
+    # thread com uma pilha grande e um limite de recursão à medida do texto,
+    # uma de cada vez.
+    out = []
+
+    def run():
+        try:
+            out.append(_compile(source, options, stats))
+        except BaseException as e:
+            out.append(e)
+
+    with _deep_lock:
+        old_limit = sys.getrecursionlimit()
+        old_stack = threading.stack_size()
+        sys.setrecursionlimit(max(old_limit, min(4 * len(source) + 10_000, DEEP_RECURSION)))
+        try:
+            threading.stack_size(DEEP_STACK)
+            t = threading.Thread(target=run)
+            t.start()
+            t.join()
+        finally:
+            threading.stack_size(old_stack)
+            sys.setrecursionlimit(old_limit)
+    if isinstance(out[0], BaseException):
+        raise out[0]
+    return out[0]
+
+
+def main(argv=None):
+    # uso: python compilador.py [-O] [--checks] [--lexer-rapido] [--cache DIR] [--cache-stats]
+    #                           [--stats [F.json]] [--profile [F.prof]] [programa.txt]
+    #      (sem ficheiro lê do stdin; --cache sem DIR usa PLC_COMPILE_CACHE ou ~/.cache/plc2025)
+    #      --stats escreve o relatório JSON no stderr (ou em F.json); --profile junta-lhe
+    #      o pico de memória de cada fase e as funções mais pesadas do cProfile
+    args = list(sys.argv[1:] if argv is None else argv)
+    options = CompileOptions()
+    cache_dir = None
+    use_cache = show_stats = False
+    stats = stats_out = profile_out = None
+    profile = False
+    files = []
+    while args:
+        a = args.pop(0)
+        if a == '-O':
+            options.optimize = True
+        elif a == '--lexer-rapido':
+            options.fast_lexer = True
+        elif a == '--checks':
+            options.checks = True
+        elif a == '--cache':
+            use_cache = True
+            if args and not args[0].startswith('-') and os.path.isdir(args[0]):
+                cache_dir = args.pop(0)
+        elif a == '--cache-stats':
+            show_stats = True
+        elif a == '--stats':
+            stats = stats or CompileStats()
+            if args and args[0].endswith('.json'):
+                stats_out = args.pop(0)
+        elif a == '--profile':
+            profile = True
+            if args and args[0].endswith('.prof'):
+                profile_out = args.pop(0)
+        else:
+            files.append(a)
+
+    cache = CompileCache(cache_dir) if use_cache or show_stats else None
+    if show_stats and not files:
+        print(json.dumps(cache.stats(), indent=2))
+        return
+    if files:
+        with open(files[0], encoding='utf-8') as f:
+            source = f.read()
+    else:
+        source = sys.stdin.read()
+
+    if profile:
+        stats = CompileStats(memory=True)
+        with tracing_memory(), profiling(stats, dump=profile_out):
+            result = compile(source, options=options, cache=cache if use_cache else None,
+                             stats=stats)
+    else:
+        result = compile(source, options=options, cache=cache if use_cache else None,
+                         stats=stats)
+    if cache is not None:
+        cache.flush()
+    if result.ast is not None or result.cached:
+        print("Analise sintatica concluida com sucesso.")
+    for d in result.diagnostics:
+        print(d)
+    if show_stats:
+        print(json.dumps(cache.stats(), indent=2), file=sys.stderr)
+    if stats is not None:
+        if stats_out:
+            with open(stats_out, 'w', encoding='utf-8') as f:
+                f.write(stats.to_json() + '\n')
+        else:
+            print(stats.to_json(), file=sys.stderr)
+    if not result.ok:
+        sys.exit(1)
+    print(result.code)
+
+
+if __name__ == '__main__':
+    main()
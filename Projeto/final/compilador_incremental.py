@@ -0,0 +1,390 @@
+import bisect
+import re
+import time
+from typing import List, Optional, Tuple
+
+import compilador
+from analex_rapido import FastLexer
+from ast1 import Func, Node
+from codegen_ewvm import CodeGenerator
+from compilador import CompileResult
+from optimize_ast import optimize_unit
+
+# Recompilação incremental para o editor: depois de cada alteração ao texto
+# (posição inicial, posição final, texto novo) volta a analisar só o bocado
+# afetado e reutiliza o resto da AST.
+#
+#   ic = IncrementalCompiler(fonte)
+#   ic.edit(120, 121, '7')    # -> 'statement' / 'procedure' / 'full'
+#   r = ic.compile()          # CompileResult, como compilador.compile()
+#
+# Unidades reanalisáveis, da mais pequena para a maior:
+#   - uma instrução da lista do corpo de um procedimento/função de topo;
+#   - uma declaração de procedimento/função de topo (cabeçalho ';' bloco ';');
+#   - uma instrução da lista do programa principal.
+# Uma alteração que fique dentro de uma unidade (nos extremos só se ao lado
+# houver um espaço ou ';', para que não se juntem tokens com o texto vizinho)
+# reanalisa só essa unidade, embrulhada num programa mínimo com as mesmas
+# linha e coluna.
+# Se o bocado não der exatamente uma unidade sem erros, ou a alteração cair
+# fora de qualquer unidade (cabeçalho, CONST, VAR), analisa-se tudo de novo.
+#
+# O resultado é o do compilador sem -O. A otimização de nível 0 (substituir
+# as constantes) corre só sobre a unidade nova; as de nível 1 propagam
+# valores entre instruções e não são incrementais. A análise semântica
+# percorre ainda o programa todo; o código é gerado por fragmentos
+# (linker_ewvm) e só se geram de novo os das unidades alteradas: o do
+# programa principal ou o do subprograma de topo. Se mudar a assinatura de
+# um subprograma (nome, parâmetros, tipo do resultado), geram-se todos.
+
+Span = Tuple[int, int]
+
+
+class DeclUnit:
+    __slots__ = ('start', 'end', 'stmts')
+
+    def __init__(self, start, end, stmts):
+        self.start = start
+        self.end = end
+        self.stmts: List[Optional[Span]] = stmts   # instruções do corpo
+
+
+# ----------------------------------------------------------------------
+# Estrutura do texto: onde começa e acaba cada unidade
+# ----------------------------------------------------------------------
+
+def scan_tokens(text, offset=0):
+    """(tipo, início, fim) de cada token de text, com as posições somadas a offset."""
+    lx = FastLexer()
+    lx.input(text)
+    token = lx.token
+    out = []
+    while True:
+        tok = token()
+        if tok is None:
+            return out
+        out.append((tok.type, tok.lexpos + offset, lx.lexpos + offset))
+
+
+def scan_compound(toks, i):
+    """toks[i] é BEGIN; devolve (spans das instruções, índice depois do END)."""
+    stmts = []
+    depth = 1
+    i += 1
+    first = i
+    while i < len(toks):
+        kind = toks[i][0]
+        if kind == 'BEGIN':
+            depth += 1
+        elif kind == 'END':
+            depth -= 1
+            if depth == 0:
+                stmts.append((toks[first][1], toks[i - 1][2]) if first < i else None)
+                return stmts, i + 1
+        elif kind == ';' and depth == 1:
+            stmts.append((toks[first][1], toks[i - 1][2]) if first < i else None)
+            first = i + 1
+        i += 1
+    raise ValueError("BEGIN sem END")
+
+
+def scan_block(toks, i):
+    """Devolve (declarações de topo do bloco, spans das instruções, índice depois do END)."""
+    decls = []
+    while i < len(toks):
+        kind = toks[i][0]
+        if kind in ('PROCEDURE', 'FUNCTION'):
+            decl, i = scan_decl(toks, i)
+            decls.append(decl)
+        elif kind == 'BEGIN':
+            stmts, i = scan_compound(toks, i)
+            return decls, stmts, i
+        else:
+            i += 1    # CONST / VAR
+    raise ValueError("bloco sem BEGIN")
+
+
+def scan_decl(toks, i):
+    start = toks[i][1]
+    depth = 0
+    while toks[i][0] != ';' or depth:
+        if toks[i][0] == '(':
+            depth += 1
+        elif toks[i][0] == ')':
+            depth -= 1
+        i += 1
+    _, stmts, i = scan_block(toks, i + 1)
+    if toks[i][0] != ';':
+        raise ValueError("declaração sem ';'")
+    return DeclUnit(start, toks[i][2], stmts), i + 1
+
+
+def scan_program(text):
+    toks = scan_tokens(text)
+    i = 0
+    while toks[i][0] != ';':
+        i += 1
+    decls, stmts, _ = scan_block(toks, i + 1)
+    return decls, stmts
+
+
+def signature(decl):
+    # o que os outros fragmentos usam de um subprograma (e dos que tem dentro:
+    # os resultados das funções ocupam globais)
+    params = tuple((n.upper(), p.type.name.upper(), p.byref) for p in decl.params for n in p.names)
+    rettype = decl.rettype.name.upper() if isinstance(decl, Func) else None
+    return decl.name, params, rettype, tuple(signature(d) for d in decl.block.procsfuncs)
+
+
+# ----------------------------------------------------------------------
+# Posições das subárvores reutilizadas
+# ----------------------------------------------------------------------
+
+def node_fields(node):
+    return [getattr(node, s) for cls in type(node).__mro__
+            for s in getattr(cls, '__slots__', ()) if hasattr(node, s)]
+
+
+def shift_positions(root, line, col, lines_delta, col_delta):
+    """Ajusta a posição dos nós de root a partir de (line, col) exclusive:
+    os da mesma linha mudam de linha e de coluna, os seguintes só de linha."""
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, Node):
+            l = getattr(obj, 'line', None)
+            if l is not None and l >= line:
+                if l > line:
+                    obj.line = l + lines_delta
+                elif obj.col >= col:
+                    obj.line = l + lines_delta
+                    obj.col += col_delta
+            stack.extend(node_fields(obj))
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+
+
+SEPARATORS = ' \t\n;'
+
+# resto de linha sem nós da AST depois de uma unidade
+TRAILING_NOISE = re.compile(r'[\s;]*(?:end\b[\s;.]*)*', re.IGNORECASE)
+
+
+class IncrementalCompiler:
+    def __init__(self, source: str, fast_lexer=True):
+        self.fast_lexer = fast_lexer
+        self.source = source
+        self.ast = None
+        self.errors: List[str] = []
+        self.decls: List[DeclUnit] = []
+        self.stmts: List[Optional[Span]] = []
+        self.reparsed = 0   # unidades reanalisadas sem analisar tudo
+        self.full_parses = 0
+        # fragmentos do último código gerado (None: gerar tudo) e os que mudaram
+        self.fragments = None
+        self.dirty = set()  # 'main' ou o índice do subprograma de topo
+        self.full_parse()
+
+    # ---------------------
+    # Análise completa
+    # ---------------------
+    def full_parse(self):
+        parse, optimize = compilador.load()[:2]
+        self.full_parses += 1
+        self.fragments = None
+        self.ast, self.errors = parse(self.source, fast_lexer=self.fast_lexer)
+        self.decls, self.stmts = [], []
+        if self.ast is None:
+            return
+        optimize(self.ast, level=0)
+        try:
+            decls, stmts = scan_program(self.source)
+        except (ValueError, IndexError):
+            return
+        block = self.ast.block
+        # só se ativa o modo incremental se a estrutura bater com a AST
+        if len(decls) == len(block.procsfuncs) and len(stmts) == len(block.compound.statements) \
+                and all(len(d.stmts) == len(p.block.compound.statements)
+                        for d, p in zip(decls, block.procsfuncs)):
+            self.decls, self.stmts = decls, stmts
+
+    # ---------------------
+    # Alterações
+    # ---------------------
+    def edit(self, start: int, end: int, text: str) -> str:
+        """Substitui source[start:end] por text; devolve o que foi reanalisado."""
+        old = self.source
+        self.source = old[:start] + text + old[end:]
+        delta = len(text) - (end - start)
+        if self.ast is not None:
+            kind = self.reparse_unit(start, end, text, delta, old)
+            if kind is not None:
+                self.reparsed += 1
+                return kind
+        self.full_parse()
+        return 'full'
+
+    def find_unit(self, start, end, new_end):
+        source = self.source
+
+        def inside(span):
+            # a alteração pode chegar aos extremos da unidade se o texto ao
+            # lado for um separador (senão podia juntar-se a um token vizinho)
+            if span is None or not (span[0] <= start and end <= span[1]):
+                return False
+            if start == span[0] and start > 0 and source[start - 1] not in SEPARATORS:
+                return False
+            if end == span[1] and new_end < len(source) and source[new_end] not in SEPARATORS:
+                return False
+            return True
+
+        d = bisect.bisect_right([u.start for u in self.decls], start) - 1
+        if d >= 0 and inside((self.decls[d].start, self.decls[d].end)):
+            decl = self.decls[d]
+            for j, span in enumerate(decl.stmts):
+                if inside(span):
+                    return 'body', d, j
+            return 'decl', d, None
+        for j, span in enumerate(self.stmts):
+            if inside(span):
+                return 'main', None, j
+        return None
+
+    def reparse_unit(self, start, end, text, delta, old) -> Optional[str]:
+        unit = self.find_unit(start, end, start + len(text))
+        if unit is None:
+            return None
+        where, d, j = unit
+        if where == 'decl':
+            span = (self.decls[d].start, self.decls[d].end)
+        elif where == 'body':
+            span = self.decls[d].stmts[j]
+        else:
+            span = self.stmts[j]
+        new_span = (span[0], span[1] + delta)
+        fragment = self.source[new_span[0]:new_span[1]]
+        node, inner = self.parse_fragment(fragment, new_span[0], decl=(where == 'decl'))
+        if node is None:
+            return None
+
+        # as subárvores que ficam depois da unidade podem ter mudado de linha
+        # (ou de coluna, se estiverem na mesma linha em que a unidade acaba)
+        lines_delta = text.count('\n') - old.count('\n', start, end)
+        eol = old.find('\n', span[1])
+        rest = old[span[1]:eol if eol >= 0 else len(old)]
+        if lines_delta or not TRAILING_NOISE.fullmatch(rest):
+            end_line = old.count('\n', 0, span[1]) + 1
+            end_col = span[1] - old.rfind('\n', 0, span[1])
+            new_col = new_span[1] - self.source.rfind('\n', 0, new_span[1])
+            shift_positions(self.ast, end_line, end_col, lines_delta, new_col - end_col)
+
+        self.shift_spans(span[1], delta)
+        block = self.ast.block
+        if where == 'decl':
+            if signature(block.procsfuncs[d]) != signature(node):
+                self.fragments = None
+            block.procsfuncs[d] = optimize_unit(self.ast, node)
+            self.decls[d] = inner
+            self.dirty.add(d)
+        elif where == 'body':
+            owner = block.procsfuncs[d]
+            owner.block.compound.statements[j] = optimize_unit(self.ast, node, owner)
+            self.dirty.add(d)
+        else:
+            block.compound.statements[j] = optimize_unit(self.ast, node)
+            self.dirty.add('main')
+        return 'procedure' if where == 'decl' else 'statement'
+
+    def shift_spans(self, old_end, delta):
+        """Depois de uma alteração dentro de [.., old_end): desloca o que vem a seguir."""
+        def moved(span):
+            if span is None:
+                return None
+            s, e = span
+            return (s + delta if s >= old_end else s, e + delta if e >= old_end else e)
+
+        if not delta:
+            return
+        for u in self.decls:
+            if u.end >= old_end:
+                if u.start >= old_end:
+                    u.start += delta
+                u.end += delta
+                u.stmts = [moved(s) for s in u.stmts]
+        self.stmts = [moved(s) for s in self.stmts]
+
+    def parse_fragment(self, fragment, pos, decl=False):
+        """Analisa uma unidade isolada, na mesma linha e coluna que ocupa no texto."""
+        parse = compilador.load()[0]
+        line_start = self.source.rfind('\n', 0, pos) + 1
+        line = self.source.count('\n', 0, pos) + 1
+        if line == 1:
+            return None, None
+        pad = '\n' * (line - 1) + ' ' * (pos - line_start)
+        if decl:
+            wrapper = "program P;" + pad + fragment + "\nbegin end."
+        else:
+            wrapper = "program P;begin" + pad + fragment + "\nend."
+        ast, errors = parse(wrapper, fast_lexer=self.fast_lexer)
+        if ast is None or errors:
+            return None, None
+        block = ast.block
+        if decl:
+            if len(block.procsfuncs) != 1 or block.consts or block.vars:
+                return None, None
+            try:
+                toks = scan_tokens(fragment, pos)
+                inner, _ = scan_decl(toks, 0)
+            except (ValueError, IndexError):
+                return None, None
+            if len(inner.stmts) != len(block.procsfuncs[0].block.compound.statements):
+                return None, None
+            return block.procsfuncs[0], inner
+        statements = block.compound.statements
+        if len(statements) != 1 or statements[0] is None:
+            return None, None
+        return statements[0], None
+
+    # ---------------------
+    # Resto do compilador
+    # ---------------------
+    def compile(self) -> CompileResult:
+        loaded = compilador.load()
+        analyze, codegen_errors = loaded[3], loaded[-1]
+        result = CompileResult()
+        result.diagnostics.extend(self.errors)
+        if self.ast is None:
+            return result
+        timings = result.timings
+        t1 = time.perf_counter()
+        ast = result.ast = self.ast
+        errors = analyze(ast)
+        t2 = time.perf_counter()
+        timings['semantic'] = t2 - t1
+        if errors:
+            result.diagnostics.extend(f"Erro semântico: {e}" for e in errors)
+            return result
+        try:
+            result.code = self.generate(ast)
+        except codegen_errors as e:
+            result.diagnostics.append(f"Erro na geração de código: {e}")
+        timings['codegen'] = time.perf_counter() - t2
+        return result
+
+    def generate(self, ast) -> str:
+        gen = CodeGenerator()
+        gen.prepare(ast)
+        decls = ast.block.procsfuncs
+        fragments = self.fragments
+        if fragments is None:
+            fragments = [gen.generate_main(ast)] + [gen.generate_fragment(d) for d in decls]
+        else:
+            fragments = list(fragments)
+            if 'main' in self.dirty:
+                fragments[0] = gen.generate_main(ast)
+            for d in self.dirty - {'main'}:
+                fragments[d + 1] = gen.generate_fragment(decls[d])
+        code = gen.finish(fragments)
+        self.fragments = fragments
+        self.dirty = set()
+        return code
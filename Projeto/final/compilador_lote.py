@@ -0,0 +1,160 @@
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+import compilador
+from compilador import compile, CompileOptions
+from cache_compilacao import CompileCache
+
+# Compilação em lote: compila muitos ficheiros Pascal em paralelo e escreve
+# o código EWVM ao lado de cada um (ex1.txt -> ex1.ewvm).
+#
+# Cada processo do pool constrói o parser ao arrancar (initializer) e
+# reutiliza-o para todos os ficheiros que lhe calham. Com --cache os
+# ficheiros que não mudaram vêm da cache de compilação.
+#
+# uso: python compilador_lote.py [-O] [-j N] [--cache DIR] [--json resumo.json]
+#                                ficheiros|globs|diretorias...
+
+EXTENSIONS = ('.txt', '.pas')
+
+
+def expand(patterns) -> List[str]:
+    files = []
+    for pat in patterns:
+        if os.path.isdir(pat):
+            found = sorted(os.path.join(pat, f) for f in os.listdir(pat)
+                           if f.endswith(EXTENSIONS))
+        elif glob.has_magic(pat):
+            found = sorted(glob.glob(pat, recursive=True))
+        else:
+            found = [pat]
+        files.extend(found)
+    return files
+
+
+def output_path(path):
+    return os.path.splitext(path)[0] + '.ewvm'
+
+
+_caches: Dict[str, CompileCache] = {}
+
+
+def _warm():
+    compilador.load()
+
+
+def compile_file(path, optimize=False, cache_dir=None) -> Dict:
+    entry = {'file': path, 'ok': False, 'output': None, 'diagnostics': [], 'timings': {},
+             'cached': False, 'evictions': 0}
+    t0 = time.perf_counter()
+    try:
+        cache = None
+        if cache_dir is not None:
+            cache = _caches.get(cache_dir)
+            if cache is None:
+                cache = _caches[cache_dir] = CompileCache(cache_dir)
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        evictions = cache.evictions if cache is not None else 0
+        result = compile(source, options=CompileOptions(optimize=optimize), cache=cache)
+        if cache is not None:
+            entry['evictions'] = cache.evictions - evictions
+        entry['diagnostics'] = result.diagnostics
+        entry['timings'] = result.timings
+        entry['cached'] = result.cached
+        if result.ok:
+            out = output_path(path)
+            with open(out, 'w', encoding='utf-8') as f:
+                f.write(result.code)
+            entry['ok'] = True
+            entry['output'] = out
+    except Exception as e:
+        entry['diagnostics'].append(f"{type(e).__name__}: {e}")
+    entry['elapsed'] = time.perf_counter() - t0
+    return entry
+
+
+def compile_many(files, optimize=False, workers=None, cache_dir: Optional[str] = None) -> Dict:
+    workers = workers or os.cpu_count() or 1
+    func = partial(compile_file, optimize=optimize, cache_dir=cache_dir)
+    t0 = time.perf_counter()
+    if workers == 1 or len(files) < 2:
+        entries = [func(f) for f in files]
+    else:
+        # blocos de ficheiros por tarefa: com milhares de ficheiros pequenos o
+        # custo de enviar cada um para o pool seria maior que compilá-lo
+        chunksize = max(1, len(files) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm) as pool:
+            entries = list(pool.map(func, files, chunksize=chunksize))
+    wall = time.perf_counter() - t0
+    failed = [e['file'] for e in entries if not e['ok']]
+    hits = sum(1 for e in entries if e['cached'])
+    evictions = sum(e['evictions'] for e in entries)
+    if cache_dir is not None:
+        # os contadores de cada processo perdem-se com o pool: contam-se aqui,
+        # a partir do que cada ficheiro devolveu
+        cache = CompileCache(cache_dir)
+        cache.hits = hits
+        cache.misses = len(entries) - hits
+        cache.evictions = evictions
+        cache.flush()
+    return {
+        'files': entries,
+        'total': len(entries),
+        'ok': len(entries) - len(failed),
+        'failed': failed,
+        'cache_hits': hits,
+        'cache_evictions': evictions,
+        'workers': workers,
+        'wall_time': wall,
+        'cpu_time': sum(e['elapsed'] for e in entries),
+    }
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    optimize = False
+    workers = None
+    json_path = None
+    cache_dir = None
+    patterns = []
+    while args:
+        a = args.pop(0)
+        if a == '-O':
+            optimize = True
+        elif a == '-j':
+            workers = int(args.pop(0))
+        elif a == '--cache':
+            cache_dir = args.pop(0)
+        elif a == '--json':
+            json_path = args.pop(0)
+        else:
+            patterns.append(a)
+    files = expand(patterns)
+    if not files:
+        print("uso: python compilador_lote.py [-O] [-j N] [--cache DIR] [--json resumo.json] ficheiros...",
+              file=sys.stderr)
+        sys.exit(2)
+
+    summary = compile_many(files, optimize=optimize, workers=workers, cache_dir=cache_dir)
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"{summary['ok']}/{summary['total']} compilados em {summary['wall_time']:.3f} s "
+              f"({summary['workers']} processos, {summary['cache_hits']} da cache)")
+        for path in summary['failed']:
+            print(f"falhou: {path}")
+    else:
+        print(text)
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
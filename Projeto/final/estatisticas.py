@@ -0,0 +1,165 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+from ast1 import Node
+
+# Instrumentação do compilador (compilador.py --stats / --profile).
+#
+#   stats = CompileStats(memory=True)
+#   compile(fonte, options=..., stats=stats)
+#   stats.report()   # dict pronto para JSON
+#
+# Cada fase regista o tempo real (perf_counter) e de CPU (process_time) e,
+# com memory=True, o pico de memória alocada durante a fase (tracemalloc).
+# As fases não se encaixam umas nas outras: o pico de cada uma é medido a
+# partir do seu início. Os contadores (tokens, nós da AST, instruções, ...)
+# são preenchidos pelo compilador à medida que as fases terminam.
+#
+# O relatório tem uma chave 'version' para quem o lê na build farm poder
+# detetar mudanças de formato.
+
+REPORT_VERSION = 1
+
+# fases medidas numa passagem à parte, já incluídas noutra fase: não entram
+# no total
+EXTRA_PHASES = ('lex',)
+
+
+class CompileStats:
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, object] = {}
+        self.profile: Optional[List[Dict]] = None
+
+    @contextmanager
+    def phase(self, name):
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, {'wall': 0.0, 'cpu': 0.0})
+            entry['wall'] += time.perf_counter() - w0
+            entry['cpu'] += time.process_time() - c0
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                entry['peak_kb'] = max(entry.get('peak_kb', 0), peak // 1024)
+
+    def count(self, name, value):
+        self.counters[name] = value
+
+    def report(self) -> Dict:
+        total = {k: sum(p[k] for name, p in self.phases.items() if name not in EXTRA_PHASES)
+                 for k in ('wall', 'cpu')}
+        out = {'version': REPORT_VERSION, 'phases': self.phases, 'total': total,
+               'counters': self.counters}
+        if self.profile is not None:
+            out['profile'] = self.profile
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), indent=2, ensure_ascii=False)
+
+
+def phase_of(stats: Optional[CompileStats]):
+    """stats.phase, ou um contexto vazio quando não há estatísticas."""
+    return stats.phase if stats is not None else _no_phase
+
+
+def _no_phase(name):
+    return nullcontext()
+
+
+@contextmanager
+def tracing_memory(enabled=True):
+    """Liga o tracemalloc durante o bloco (se não estava já ligado)."""
+    start = enabled and not tracemalloc.is_tracing()
+    if start:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if start:
+            tracemalloc.stop()
+
+
+@contextmanager
+def profiling(stats: CompileStats, top=25, dump: Optional[str] = None):
+    """Corre o bloco com o cProfile e guarda em stats.profile as 'top' funções
+    com mais tempo acumulado (e o perfil completo em 'dump', se indicado)."""
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        if dump:
+            prof.dump_stats(dump)
+        ps = pstats.Stats(prof, stream=io.StringIO())
+        ps.sort_stats('cumulative')
+        rows = []
+        for func in ps.fcn_list[:top]:
+            cc, nc, tt, ct, _ = ps.stats[func]
+            filename, line, name = func
+            rows.append({'function': f"{filename}:{line}({name})", 'ncalls': nc,
+                         'tottime': round(tt, 6), 'cumtime': round(ct, 6)})
+        stats.profile = rows
+
+
+def count_nodes(root) -> Dict[str, int]:
+    """Número de nós da AST por classe."""
+    counts: Dict[str, int] = {}
+    stack = [root]
+    seen = set()
+    while stack:
+        x = stack.pop()
+        if isinstance(x, Node):
+            if id(x) in seen:
+                continue
+            seen.add(id(x))
+            name = type(x).__name__
+            counts[name] = counts.get(name, 0) + 1
+            for cls in type(x).__mro__:
+                for s in getattr(cls, '__slots__', ()):
+                    if s not in ('sym', 'etype'):
+                        v = getattr(x, s, None)
+                        if isinstance(v, (Node, list, tuple)):
+                            stack.append(v)
+        elif isinstance(x, (list, tuple)):
+            stack.extend(x)
+    return dict(sorted(counts.items()))
+
+
+def count_instructions(code: List[tuple]) -> Dict[str, int]:
+    """Número de instruções EWVM por opcode (sem contar os rótulos)."""
+    counts: Dict[str, int] = {}
+    for op, _ in code:
+        if op != ':':
+            counts[op] = counts.get(op, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def count_tokens(source: str, fast_lexer=False) -> int:
+    if fast_lexer:
+        from analex_rapido import FastLexer
+        lx = FastLexer()
+    else:
+        from analex import lexer
+        lx = lexer.clone()
+        lx.lineno = 1
+        lx.errors = []
+    lx.input(source)
+    n = 0
+    while lx.token():
+        n += 1
+    return n
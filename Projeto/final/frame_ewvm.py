@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from ast1 import *
+
+# Atribuição dos slots das variáveis locais de um procedimento/função
+# (fp + k; os parâmetros ficam abaixo de fp, onde quem chama os deixou).
+#
+# Em vez de um slot por variável, as variáveis escalares cujos tempos de
+# vida não se sobrepõem partilham o mesmo slot (como registos). O tempo de
+# vida de uma variável é o intervalo entre a primeira e a última referência
+# na ordem do texto, alargado até ao fim de cada ciclo que a usa (o valor
+# pode passar de uma iteração para a seguinte).
+#
+# Só partilha slot uma variável cuja primeira referência é uma escrita que
+# domina todas as outras (uma atribuição, readln ou For numa sequência de
+# instruções, com as restantes referências depois dela na mesma sequência):
+# assim nunca se lê o que outra variável lá deixou, e o programa vê os
+# mesmos valores iniciais (0 do PUSHN) que veria com slots próprios. As
+# outras variáveis, os arrays e as variáveis usadas por subprogramas
+# encaixados vivem desde a entrada.
+
+ENTRY = -1
+
+
+class Ref:
+    __slots__ = ('pos', 'write', 'path', 'loops')
+
+    def __init__(self, pos, write, path, loops):
+        self.pos = pos
+        self.write = write      # escrita que não lê a variável
+        self.path = path        # ((sequência, índice), ...) até à instrução
+        self.loops = loops      # ciclos que contêm a referência
+
+
+class FramePlan:
+    def __init__(self, slots: Dict[str, int], size: int, shared: int):
+        self.slots = slots      # nome (maiúsculas) -> índice no frame
+        self.size = size        # slots reservados pelo plano
+        self.shared = shared    # variáveis que ficaram num slot já usado
+
+
+class _Scanner:
+    # percorre as instruções pela ordem em que o código é gerado e guarda as
+    # referências às variáveis de 'names' (a todas, se names for None)
+    def __init__(self, names: Optional[Set[str]] = None):
+        self.names = names
+        self.refs: Dict[str, List[Ref]] = {}
+        self.loop_end: Dict[int, int] = {}
+        self.pos = 0
+        self.path: Tuple = ()
+        self.loops: Tuple = ()
+
+    def ref(self, name, write=False):
+        key = name.upper()
+        if self.names is None or key in self.names:
+            self.pos += 1
+            self.refs.setdefault(key, []).append(Ref(self.pos, write, self.path, self.loops))
+
+    def expr(self, e):
+        if isinstance(e, VarAccess):
+            for lst in e.suffixes:
+                for x in lst:
+                    self.expr(x)
+            self.ref(e.name)
+        elif isinstance(e, BinOp):
+            self.expr(e.left)
+            self.expr(e.right)
+        elif isinstance(e, UnOp):
+            self.expr(e.expr)
+        elif isinstance(e, Call):
+            for a in e.args:
+                self.expr(a)
+        elif isinstance(e, tuple):
+            for x in e:
+                self.expr(x)
+
+    def target(self, v: VarAccess):
+        # a[i] := ... lê os índices e altera só parte de a
+        if v.suffixes:
+            self.expr(v)
+        else:
+            self.ref(v.name, write=True)
+
+    def seq(self, key, stmts):
+        outer = self.path
+        for k, s in enumerate(stmts):
+            self.path = outer + ((key, k),)
+            self.stmt(s)
+        self.path = outer
+
+    def body(self, key, s):
+        if isinstance(s, CompoundStatement):
+            self.seq(id(s), s.statements)
+        elif s is not None:
+            self.seq(key, [s])
+
+    def enter_loop(self, node):
+        self.loops = self.loops + (id(node),)
+
+    def exit_loop(self, node):
+        self.pos += 1
+        self.loop_end[id(node)] = self.pos
+        self.loops = self.loops[:-1]
+
+    def stmt(self, s):
+        if isinstance(s, CompoundStatement):
+            self.seq(id(s), s.statements)
+        elif isinstance(s, Assign):
+            self.expr(s.expr)
+            self.target(s.target)
+        elif isinstance(s, If):
+            self.expr(s.cond)
+            self.body((id(s), 'then'), s.thenstmt)
+            self.body((id(s), 'else'), s.elsestmt)
+        elif isinstance(s, While):
+            self.enter_loop(s)
+            self.expr(s.cond)
+            self.body(id(s), s.body)
+            self.exit_loop(s)
+        elif isinstance(s, For):
+            self.expr(s.start)
+            self.ref(s.var, write=True)
+            self.enter_loop(s)
+            # um limite que é só uma variável volta a ser lido em cada teste
+            self.expr(s.end)
+            self.ref(s.var)         # teste
+            self.body(id(s), s.body)
+            self.ref(s.var)         # incremento
+            self.exit_loop(s)
+        elif isinstance(s, Read):
+            for v in s.vars:
+                self.target(v)
+        elif isinstance(s, Write):
+            for p in s.params:
+                self.expr(p)
+        elif isinstance(s, Call):
+            # um argumento pode ser passado por referência: conta como leitura
+            for a in s.args:
+                self.expr(a)
+
+
+def names_used(block: Block) -> Set[str]:
+    """Nomes (maiúsculas) referidos nos subprogramas encaixados em block."""
+    used: Set[str] = set()
+    for decl in block.procsfuncs:
+        sc = _Scanner()
+        sc.stmt(decl.block.compound)
+        used |= sc.refs.keys()
+        used |= names_used(decl.block)
+    return used
+
+
+def live_range(refs: List[Ref], loop_end: Dict[int, int]) -> Tuple[int, int]:
+    first = refs[0]
+    start = ENTRY
+    if first.write:
+        *prefix, (seq, k) = first.path
+        prefix = tuple(prefix)
+        n = len(prefix)
+        if all(len(r.path) > n and r.path[:n] == prefix and r.path[n][0] == seq
+               and r.path[n][1] >= k for r in refs):
+            start = first.pos
+    end = refs[-1].pos
+    inside = set(first.loops) if start != ENTRY else set()
+    for r in refs:
+        for loop in r.loops:
+            if loop not in inside:
+                end = max(end, loop_end[loop])
+    return start, end
+
+
+def plan_frame(decl, size_of) -> FramePlan:
+    """Slots das variáveis locais de decl. size_of(tipo) dá o número de
+    slots de um tipo."""
+    block = decl.block
+    nested = names_used(block)
+    fixed: List[Tuple[str, int]] = []
+    candidates: List[str] = []
+    for vdecl in block.vars:
+        size = size_of(vdecl.type)
+        for name in vdecl.names:
+            key = name.upper()
+            if size == 1 and key not in nested:
+                candidates.append(key)
+            else:
+                fixed.append((key, size))
+
+    slots: Dict[str, int] = {}
+    size = 0
+    for key, n in fixed:
+        slots[key] = size
+        size += n
+
+    sc = _Scanner(set(candidates))
+    sc.stmt(block.compound)
+    ranges = []
+    for key in candidates:
+        refs = sc.refs.get(key)
+        if refs:
+            ranges.append((*live_range(refs, sc.loop_end), key))
+        else:
+            ranges.append((ENTRY, ENTRY, key))   # nunca usada: um slot próprio
+
+    # linear scan: cada slot fica livre depois da última referência de quem
+    # o ocupa
+    free: List[int] = []
+    busy: List[Tuple[int, int]] = []   # (fim, slot)
+    shared = 0
+    for start, end, key in sorted(ranges):
+        if start != ENTRY:
+            free += [slot for e, slot in busy if e < start]
+            busy = [(e, slot) for e, slot in busy if e >= start]
+        if free and start != ENTRY:
+            slot = free.pop()
+            shared += 1
+        else:
+            slot = size
+            size += 1
+        slots[key] = slot
+        busy.append((end, slot))
+    return FramePlan(slots, size, shared)
@@ -0,0 +1,79 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from vm_ewvm import Instr
+
+# Fragmentos de código EWVM e o ligador que os junta num programa.
+#
+# O gerador de código produz um fragmento para o programa principal e um
+# para cada procedimento/função de topo (com os subprogramas encaixados
+# nele). Cada fragmento numera os seus rótulos a partir de zero, como se
+# estivesse sozinho; só os rótulos de entrada (FUNC<nome>) são visíveis de
+# fora. Ao ligar, os rótulos locais do fragmento k > 0 ganham o prefixo
+# F<k> e cada PUSHA FUNC<nome> tem de corresponder a um rótulo de entrada
+# de algum fragmento.
+#
+# Assim um fragmento não depende do código dos outros: quando só um
+# subprograma muda, gera-se só o fragmento dele e volta-se a ligar.
+
+# as instruções são as do gerador (vm_ewvm.Instr): (OP, operando) ou (':', rótulo)
+LABEL_OPS = ('JUMP', 'JZ', 'PUSHA')
+
+
+class LinkError(Exception):
+    pass
+
+
+class Fragment:
+    __slots__ = ('name', 'code', 'exports', 'imports', 'locals', '_relocated')
+
+    def __init__(self, name, code: List[Instr], exports: Iterable[str] = (),
+                 labels: Optional[Iterable[str]] = None, imports: Optional[Iterable[str]] = None):
+        """labels/imports: rótulos definidos e usados em code, se quem o gerou
+        já os souber (senão procuram-se no código)."""
+        self.name = name            # nome do subprograma (None no programa principal)
+        self.code = code
+        self.exports: FrozenSet[str] = frozenset(exports)
+        if labels is None:
+            labels = {arg for op, arg in code if op == ':'}
+        if imports is None:
+            imports = {arg for op, arg in code if op in LABEL_OPS}
+        defined = set(labels)
+        missing = self.exports - defined
+        if missing:
+            raise LinkError(f"Rótulo de entrada sem definição: {', '.join(sorted(missing))}")
+        self.locals: FrozenSet[str] = frozenset(defined - self.exports)
+        self.imports: FrozenSet[str] = frozenset(set(imports) - defined)
+        self._relocated: Dict[str, List[Instr]] = {}
+
+    def relocated(self, prefix: str) -> List[Instr]:
+        """O código com os rótulos locais prefixados (guardado por prefixo)."""
+        out = self._relocated.get(prefix)
+        if out is not None:
+            return out
+        local = self.locals
+        out = []
+        for ins in self.code:
+            op, arg = ins
+            if (op == ':' or op in LABEL_OPS) and arg in local:
+                ins = (op, prefix + arg)
+            out.append(ins)
+        self._relocated = {prefix: out}
+        return out
+
+
+def link(fragments: List[Fragment]) -> List[Instr]:
+    """Junta os fragmentos (o primeiro é o programa principal) e confirma
+    que todos os rótulos FUNC usados estão definidos."""
+    owner: Dict[str, Fragment] = {}
+    for frag in fragments:
+        for label in frag.exports:
+            if label in owner:
+                raise LinkError(f"Rótulo {label} definido em dois fragmentos")
+            owner[label] = frag
+    code: List[Instr] = []
+    for k, frag in enumerate(fragments):
+        missing = frag.imports - owner.keys()
+        if missing:
+            raise LinkError(f"Rótulo não definido: {', '.join(sorted(missing))}")
+        code.extend(frag.relocated(f"F{k}") if k else frag.code)
+    return code
@@ -0,0 +1,509 @@
+from typing import Dict, Optional
+from ast1 import *
+
+# Otimizações sobre a árvore (entre o parser e generate_ewvm):
+#   nível 0 - substitui as constantes declaradas em CONST (o gerador não as trata);
+#   nível 1 - dobra BinOp/UnOp com operandos literais, propaga valores
+#             constantes de variáveis escalares ao longo de código linear e
+#             elimina ramos de If/While com condição constante.
+
+SCALARS = ('INTEGER', 'REAL', 'BOOLEAN', 'CHAR', 'STRING')
+
+# marcador de "todas as variáveis" (p.ex. quando há uma chamada)
+ALL = None
+
+
+def is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def trunc_div(a, b):
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def fold_binop(op, a, b):
+    """Devolve (True, valor) se a operação puder ser calculada já."""
+    op = op.upper()
+    if op in ('=', '<>', '<', '<=', '>', '>='):
+        comparable = (is_number(a) and is_number(b)) or type(a) == type(b)
+        if not comparable:
+            return False, None
+        return True, {'=': a == b, '<>': a != b, '<': a < b,
+                      '<=': a <= b, '>': a > b, '>=': a >= b}[op]
+    if isinstance(a, bool) and isinstance(b, bool):
+        if op == 'AND':
+            return True, a and b
+        if op == 'OR':
+            return True, a or b
+        return False, None
+    if not (is_number(a) and is_number(b)):
+        return False, None
+    both_int = isinstance(a, int) and isinstance(b, int)
+    if op == '+':
+        return True, a + b
+    if op == '-':
+        return True, a - b
+    if op == '*':
+        return True, a * b
+    if op == '/' and b != 0:
+        return True, a / b
+    if op == 'DIV' and both_int and b != 0:
+        return True, trunc_div(a, b)
+    if op == 'MOD' and both_int and b != 0:
+        return True, a - b * trunc_div(a, b)
+    return False, None
+
+
+def has_call(expr) -> bool:
+    if isinstance(expr, Call):
+        return True
+    if isinstance(expr, BinOp):
+        return has_call(expr.left) or has_call(expr.right)
+    if isinstance(expr, UnOp):
+        return has_call(expr.expr)
+    if isinstance(expr, VarAccess):
+        return any(has_call(e) for lst in expr.suffixes for e in lst)
+    if isinstance(expr, tuple):
+        return any(has_call(e) for e in expr)
+    return False
+
+
+def expr_key(expr):
+    # chave estrutural de uma expressão (para comparar / agrupar subexpressões)
+    if isinstance(expr, Literal):
+        return ('L', type(expr.value).__name__, expr.value)
+    if isinstance(expr, VarAccess):
+        return ('V', expr.name.upper(), tuple(expr_key(e) for lst in expr.suffixes for e in lst))
+    if isinstance(expr, BinOp):
+        return ('B', expr.op.upper(), expr_key(expr.left), expr_key(expr.right))
+    if isinstance(expr, UnOp):
+        return ('U', expr.op.upper(), expr_key(expr.expr))
+    if isinstance(expr, Call):
+        return ('C', expr.name.upper(), tuple(expr_key(a) for a in expr.args))
+    return ('?', id(expr))
+
+
+def assigned_vars(stmt):
+    """Conjunto (em maiúsculas) das variáveis escalares que stmt pode alterar,
+    ou ALL se houver chamadas (que podem mexer em qualquer global)."""
+    out = set()
+
+    def expr_calls(*exprs):
+        return any(has_call(e) for e in exprs)
+
+    def walk(s):
+        if s is None:
+            return True
+        if isinstance(s, CompoundStatement):
+            return all(walk(x) for x in s.statements)
+        if isinstance(s, Assign):
+            out.add(s.target.name.upper())
+            return not expr_calls(s.expr, s.target)
+        if isinstance(s, If):
+            return (not expr_calls(s.cond)) and walk(s.thenstmt) and walk(s.elsestmt)
+        if isinstance(s, While):
+            return (not expr_calls(s.cond)) and walk(s.body)
+        if isinstance(s, For):
+            out.add(s.var.upper())
+            return (not expr_calls(s.start, s.end)) and walk(s.body)
+        if isinstance(s, Read):
+            out.update(v.name.upper() for v in s.vars)
+            return not expr_calls(*s.vars)
+        if isinstance(s, Write):
+            return not expr_calls(*s.params)
+        return False  # Call ou desconhecido
+
+    return out if walk(stmt) else ALL
+
+
+def bare_calls(stmt, scope):
+    """Troca, nas expressões de stmt, o nome de uma função sem parâmetros
+    (x := Sete) por uma chamada: as passagens seguintes tratam-na como as
+    outras chamadas (efeitos laterais, código gerado)."""
+    def expr(e):
+        if isinstance(e, VarAccess):
+            e.suffixes = [[expr(x) for x in lst] for lst in e.suffixes]
+            entry = scope.lookup(e.name) if not e.suffixes else None
+            if entry is not None and entry[0] == 'sub' and isinstance(entry[1], Func):
+                call = Call(e.name, [])
+                for slot in ('line', 'col'):
+                    if hasattr(e, slot):
+                        setattr(call, slot, getattr(e, slot))
+                return call
+        elif isinstance(e, BinOp):
+            e.left = expr(e.left)
+            e.right = expr(e.right)
+        elif isinstance(e, UnOp):
+            e.expr = expr(e.expr)
+        elif isinstance(e, Call):
+            e.args = [expr(a) for a in e.args]
+        elif isinstance(e, tuple):
+            return tuple(expr(x) for x in e)
+        return e
+
+    def target(v):
+        # o destino de F := ... é o resultado, não uma chamada
+        v.suffixes = [[expr(x) for x in lst] for lst in v.suffixes]
+
+    def walk(s):
+        if isinstance(s, CompoundStatement):
+            for x in s.statements:
+                walk(x)
+        elif isinstance(s, Assign):
+            target(s.target)
+            s.expr = expr(s.expr)
+        elif isinstance(s, If):
+            s.cond = expr(s.cond)
+            walk(s.thenstmt)
+            walk(s.elsestmt)
+        elif isinstance(s, While):
+            s.cond = expr(s.cond)
+            walk(s.body)
+        elif isinstance(s, For):
+            s.start = expr(s.start)
+            s.end = expr(s.end)
+            walk(s.body)
+        elif isinstance(s, Read):
+            for v in s.vars:
+                target(v)
+        elif isinstance(s, Write):
+            s.params = [expr(wp) for wp in s.params]
+        elif isinstance(s, Call):
+            s.args = [expr(a) for a in s.args]
+
+    walk(stmt)
+
+
+def kill(env, names):
+    if names is ALL:
+        return {}
+    return {k: v for k, v in env.items() if k not in names}
+
+
+class Scope:
+    def __init__(self, parent=None):
+        self.parent = parent
+        # nome (maiúsculas) -> ('const', Literal) | ('var', tipo escalar ou None)
+        self.names: Dict[str, tuple] = {}
+
+    def lookup(self, name):
+        s = self
+        key = name.upper()
+        while s is not None:
+            if key in s.names:
+                return s.names[key]
+            s = s.parent
+        return None
+
+
+class ASTOptimizer:
+    def __init__(self, level=1):
+        self.level = level
+        self.folded = 0        # nós dobrados
+        self.propagated = 0    # leituras substituídas por constantes
+        self.eliminated = 0    # ramos / ciclos eliminados
+
+    # ---------------------
+    # Blocos e declarações
+    # ---------------------
+    def optimize_program(self, program: Program) -> Program:
+        self.optimize_block(program.block, Scope(), [])
+        return program
+
+    def optimize_block(self, block: Block, parent: Scope, params, func_name=None):
+        scope, byref = self.declare_block(block, parent, params)
+        for decl in block.procsfuncs:
+            self.optimize_decl(decl, scope)
+
+        self.scope = scope
+        self.byref = byref
+        self.func_name = func_name
+        bare_calls(block.compound, scope)
+        block.compound = self.stmt(block.compound, {})
+
+    def optimize_decl(self, decl, scope: Scope):
+        if isinstance(decl, Func):
+            self.optimize_block(decl.block, scope, decl.params, decl.name.upper())
+        else:
+            self.optimize_block(decl.block, scope, decl.params)
+
+    def declare_block(self, block: Block, parent: Scope, params):
+        scope = Scope(parent)
+        for c in block.consts:
+            value = self.expr(c.value, scope, {})
+            if isinstance(value, Literal):
+                c.value = value
+                scope.names[c.name.upper()] = ('const', value)
+        for decl in block.procsfuncs:
+            scope.names[decl.name.upper()] = ('sub', decl)
+        byref = set()
+        for p in params:
+            for name in p.names:
+                scope.names[name.upper()] = ('var', self.scalar_type(p.type))
+                if p.byref:
+                    byref.add(name.upper())
+        for vdecl in block.vars:
+            self.resolve_type(vdecl.type, scope)
+            for name in vdecl.names:
+                scope.names[name.upper()] = ('var', self.scalar_type(vdecl.type))
+        return scope, byref
+
+    def optimize_unit(self, program: Program, node, owner=None):
+        """Otimiza só node: uma declaração de topo do programa, ou uma
+        instrução do corpo do programa (owner None) ou da declaração owner."""
+        scope, byref = self.declare_block(program.block, Scope(), [])
+        if isinstance(node, (Proc, Func)):
+            self.optimize_decl(node, scope)
+            return node
+        self.func_name = None
+        if owner is not None:
+            scope, byref = self.declare_block(owner.block, scope, owner.params)
+            if isinstance(owner, Func):
+                self.func_name = owner.name.upper()
+        self.scope = scope
+        self.byref = byref
+        bare_calls(node, scope)
+        return self.stmt(node, {})
+
+    def resolve_type(self, tnode, scope):
+        # limites de arrays / subranges escritos com constantes
+        if isinstance(tnode, SubrangeType):
+            tnode.low = self.expr(tnode.low, scope, {})
+            tnode.high = self.expr(tnode.high, scope, {})
+        elif isinstance(tnode, ArrayType):
+            for o in tnode.ordinals:
+                self.resolve_type(o, scope)
+            self.resolve_type(tnode.elemtype, scope)
+
+    @staticmethod
+    def scalar_type(tnode):
+        if isinstance(tnode, Type) and tnode.name.upper() in SCALARS:
+            return tnode.name.upper()
+        return None
+
+    # ---------------------
+    # Statements
+    # ---------------------
+    def stmt(self, stmt, env):
+        """Otimiza stmt; env (nome -> Literal) é atualizado no próprio dict."""
+        if stmt is None:
+            return None
+        if isinstance(stmt, CompoundStatement):
+            stmt.statements = [self.stmt(s, env) for s in stmt.statements]
+            return stmt
+        if isinstance(stmt, Assign):
+            target = stmt.target
+            calls = has_call(stmt.expr) or has_call(target)
+            e = {} if calls else env
+            target.suffixes = [[self.expr(x, self.scope, e) for x in lst] for lst in target.suffixes]
+            stmt.expr = self.expr(stmt.expr, self.scope, e)
+            key = target.name.upper()
+            if calls or key in self.byref:
+                env.clear()
+            elif not target.suffixes:
+                value = self.known_value(key, stmt.expr)
+                if value is not None:
+                    stmt.expr = value
+                if value is not None:
+                    env[key] = value
+                else:
+                    env.pop(key, None)
+            return stmt
+        if isinstance(stmt, If):
+            calls = has_call(stmt.cond)
+            stmt.cond = self.expr(stmt.cond, self.scope, {} if calls else env)
+            if calls:
+                env.clear()
+            if self.level >= 1 and isinstance(stmt.cond, Literal):
+                self.eliminated += 1
+                branch = stmt.thenstmt if stmt.cond.value else stmt.elsestmt
+                return self.stmt(branch, env)
+            env_else = dict(env)
+            stmt.thenstmt = self.stmt(stmt.thenstmt, env)
+            stmt.elsestmt = self.stmt(stmt.elsestmt, env_else)
+            for k in list(env):
+                a, b = env[k].value, env_else.get(k, Literal(None)).value
+                if type(a) is not type(b) or a != b:
+                    del env[k]
+            return stmt
+        if isinstance(stmt, While):
+            inner = kill(env, self.assigned(stmt))
+            stmt.cond = self.expr(stmt.cond, self.scope, {} if has_call(stmt.cond) else inner)
+            if self.level >= 1 and isinstance(stmt.cond, Literal) and not stmt.cond.value:
+                self.eliminated += 1
+                return None
+            stmt.body = self.stmt(stmt.body, dict(inner))
+            self.replace(env, inner)
+            return stmt
+        if isinstance(stmt, For):
+            calls = has_call(stmt.start) or has_call(stmt.end)
+            stmt.start = self.expr(stmt.start, self.scope, {} if calls else env)
+            inner = kill(env, self.assigned(stmt))
+            stmt.end = self.expr(stmt.end, self.scope, {} if calls else inner)
+            stmt.body = self.stmt(stmt.body, dict(inner))
+            self.replace(env, inner)
+            return stmt
+        if isinstance(stmt, Read):
+            for v in stmt.vars:
+                v.suffixes = [[self.expr(x, self.scope, env) for x in lst] for lst in v.suffixes]
+            self.replace(env, kill(env, self.assigned(stmt)))
+            return stmt
+        if isinstance(stmt, Write):
+            calls = any(has_call(wp) for wp in stmt.params)
+            e = {} if calls else env
+            params = []
+            for wp in stmt.params:
+                if isinstance(wp, tuple):
+                    params.append(tuple(self.expr(x, self.scope, e) for x in wp))
+                else:
+                    params.append(self.expr(wp, self.scope, e))
+            stmt.params = params
+            if calls:
+                env.clear()
+            return stmt
+        if isinstance(stmt, Call):
+            calls = any(has_call(a) for a in stmt.args)
+            stmt.args = self.args(stmt, self.scope, {} if calls else env)
+            env.clear()
+            return stmt
+        return stmt
+
+    def args(self, call: Call, scope, env):
+        # um argumento de um parâmetro var é passado por endereço: tem de
+        # continuar a ser a variável (só os índices se otimizam)
+        entry = scope.lookup(call.name)
+        byref = []
+        if entry is not None and entry[0] == 'sub':
+            byref = [p.byref for p in entry[1].params or [] for _ in p.names]
+        out = []
+        for k, a in enumerate(call.args):
+            if k < len(byref) and byref[k] and isinstance(a, VarAccess):
+                a.suffixes = [[self.expr(x, scope, env) for x in lst] for lst in a.suffixes]
+                out.append(a)
+            else:
+                out.append(self.expr(a, scope, env))
+        return out
+
+    def assigned(self, stmt):
+        # escrever num parâmetro var pode mudar a variável para onde ele
+        # aponta (uma global ou de um subprograma de fora): esquece tudo
+        names = assigned_vars(stmt)
+        if names is not ALL and names & self.byref:
+            return ALL
+        return names
+
+    @staticmethod
+    def replace(env, new):
+        env.clear()
+        env.update(new)
+
+    def known_value(self, key, expr) -> Optional[Literal]:
+        # só se propagam literais compatíveis com o tipo declarado da variável
+        if self.level < 1 or not isinstance(expr, Literal) or key == self.func_name:
+            return None
+        entry = self.scope.lookup(key)
+        if entry is None or entry[0] != 'var':
+            return None
+        v = expr.value
+        t = entry[1]
+        if t == 'INTEGER' and is_number(v) and isinstance(v, int):
+            return expr
+        if t == 'REAL' and is_number(v):
+            return Literal(float(v))
+        if t == 'BOOLEAN' and isinstance(v, bool):
+            return expr
+        if t == 'CHAR' and isinstance(v, str) and len(v) == 1:
+            return expr
+        if t == 'STRING' and isinstance(v, str):
+            return expr
+        return None
+
+    # ---------------------
+    # Expressões
+    # ---------------------
+    def expr(self, expr, scope, env):
+        if isinstance(expr, Literal):
+            # o parser guarda TRUE/FALSE como o texto do token
+            v = expr.value
+            if self.level >= 1 and isinstance(v, str) and v.upper() in ('TRUE', 'FALSE'):
+                return Literal(v.upper() == 'TRUE')
+            return expr
+        if isinstance(expr, VarAccess):
+            if expr.suffixes:
+                expr.suffixes = [[self.expr(x, scope, env) for x in lst] for lst in expr.suffixes]
+                return expr
+            key = expr.name.upper()
+            entry = scope.lookup(key)
+            if entry is not None and entry[0] == 'const':
+                return Literal(entry[1].value)
+            if key in env:
+                self.propagated += 1
+                return Literal(env[key].value)
+            return expr
+        if isinstance(expr, Call):
+            expr.args = self.args(expr, scope, env)
+            return expr
+        if isinstance(expr, UnOp):
+            expr.expr = self.expr(expr.expr, scope, env)
+            if self.level < 1:
+                return expr
+            inner = expr.expr
+            op = expr.op.upper()
+            if op == '+':
+                return inner
+            if isinstance(inner, Literal):
+                if op == '-' and is_number(inner.value):
+                    self.folded += 1
+                    return Literal(-inner.value)
+                if op == 'NOT' and isinstance(inner.value, bool):
+                    self.folded += 1
+                    return Literal(not inner.value)
+            if op == '-' and isinstance(inner, UnOp) and inner.op == '-':
+                return inner.expr
+            return expr
+        if isinstance(expr, BinOp):
+            expr.left = self.expr(expr.left, scope, env)
+            expr.right = self.expr(expr.right, scope, env)
+            if self.level < 1:
+                return expr
+            left, right = expr.left, expr.right
+            if isinstance(left, Literal) and isinstance(right, Literal):
+                ok, value = fold_binop(expr.op, left.value, right.value)
+                if ok:
+                    self.folded += 1
+                    return Literal(value)
+            return self.simplify(expr)
+        return expr
+
+    def simplify(self, expr: BinOp):
+        # identidades com literais inteiros (não mudam o tipo do resultado)
+        op = expr.op.upper()
+        left, right = expr.left, expr.right
+
+        def int_lit(node, v):
+            return isinstance(node, Literal) and is_number(node.value) \
+                and isinstance(node.value, int) and node.value == v
+
+        if op == '+' and int_lit(right, 0):
+            return left
+        if op == '+' and int_lit(left, 0):
+            return right
+        if op == '-' and int_lit(right, 0):
+            return left
+        if op == '*' and int_lit(right, 1):
+            return left
+        if op == '*' and int_lit(left, 1):
+            return right
+        if op == 'DIV' and int_lit(right, 1):
+            return left
+        return expr
+
+
+# função de interface
+def optimize(ast_root: Program, level=1) -> Program:
+    return ASTOptimizer(level).optimize_program(ast_root)
+
+
+def optimize_unit(ast_root: Program, node, owner=None, level=0):
+    return ASTOptimizer(level).optimize_unit(ast_root, node, owner)
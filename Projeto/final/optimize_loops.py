@@ -0,0 +1,194 @@
+from typing import Dict, List
+from ast1 import *
+from optimize_ast import assigned_vars, expr_key, ALL
+
+# Movimentação de código invariante nos ciclos While/For: as subexpressões
+# cujo valor não muda dentro do ciclo são calculadas uma vez antes dele, para
+# uma variável escondida __invN declarada no próprio bloco.
+#
+# Só se movem expressões sem efeitos laterais e que não podem falhar (DIV,
+# MOD e '/' apenas por um literal diferente de zero), porque passam a ser
+# avaliadas mesmo que o ciclo não execute nenhuma vez.
+
+HOISTABLE = ('INTEGER', 'REAL', 'BOOLEAN')
+RELATIONAL = ('=', '<>', '<', '<=', '>', '>=')
+
+
+class LoopOptimizer:
+    def __init__(self):
+        self.counter = 0
+        self.hoisted = 0   # subexpressões movidas para fora de ciclos
+
+    def optimize_program(self, program: Program) -> Program:
+        self.optimize_block(program.block, {}, [])
+        return program
+
+    def optimize_block(self, block: Block, outer: Dict[str, str], params, func_name=None):
+        types = dict(outer)
+        byref = set()
+        for p in params:
+            for name in p.names:
+                types[name.upper()] = self.type_name(p.type)
+                if p.byref:
+                    byref.add(name.upper())
+        for vdecl in block.vars:
+            for name in vdecl.names:
+                types[name.upper()] = self.type_name(vdecl.type)
+
+        for decl in block.procsfuncs:
+            fname = decl.name.upper() if isinstance(decl, Func) else None
+            self.optimize_block(decl.block, types, decl.params, fname)
+
+        self.types = types
+        self.byref = byref
+        self.func_name = func_name
+        self.decls = block.vars
+        block.compound = self.stmt(block.compound)
+
+    @staticmethod
+    def type_name(tnode):
+        return tnode.name.upper() if isinstance(tnode, Type) else None
+
+    # ---------------------
+    # Statements
+    # ---------------------
+    def stmt(self, stmt):
+        if isinstance(stmt, CompoundStatement):
+            stmt.statements = [self.stmt(s) for s in stmt.statements]
+        elif isinstance(stmt, If):
+            stmt.thenstmt = self.stmt(stmt.thenstmt)
+            stmt.elsestmt = self.stmt(stmt.elsestmt)
+        elif isinstance(stmt, (While, For)):
+            # ciclos interiores primeiro: o que estes movem ainda pode sair do exterior
+            stmt.body = self.stmt(stmt.body)
+            return self.hoist(stmt)
+        return stmt
+
+    def hoist(self, loop):
+        assigned = assigned_vars(loop)
+        # com chamadas ou escritas em parâmetros VAR não se sabe o que muda
+        if assigned is ALL or assigned & self.byref:
+            return loop
+        self.assigned = assigned
+        self.found: Dict[tuple, str] = {}
+        self.pre: List[Assign] = []
+        if isinstance(loop, While):
+            loop.cond = self.rewrite(loop.cond)
+        self.rewrite_stmt(loop.body)
+        if not self.pre:
+            return loop
+        return CompoundStatement(self.pre + [loop])
+
+    def rewrite_stmt(self, stmt):
+        if isinstance(stmt, CompoundStatement):
+            for s in stmt.statements:
+                self.rewrite_stmt(s)
+        elif isinstance(stmt, Assign):
+            self.rewrite_suffixes(stmt.target)
+            stmt.expr = self.rewrite(stmt.expr)
+        elif isinstance(stmt, If):
+            stmt.cond = self.rewrite(stmt.cond)
+            self.rewrite_stmt(stmt.thenstmt)
+            self.rewrite_stmt(stmt.elsestmt)
+        elif isinstance(stmt, While):
+            stmt.cond = self.rewrite(stmt.cond)
+            self.rewrite_stmt(stmt.body)
+        elif isinstance(stmt, For):
+            stmt.start = self.rewrite(stmt.start)
+            stmt.end = self.rewrite(stmt.end)
+            self.rewrite_stmt(stmt.body)
+        elif isinstance(stmt, Read):
+            for v in stmt.vars:
+                self.rewrite_suffixes(v)
+        elif isinstance(stmt, Write):
+            params = []
+            for wp in stmt.params:
+                if isinstance(wp, tuple):
+                    params.append(tuple(self.rewrite(x) for x in wp))
+                else:
+                    params.append(self.rewrite(wp))
+            stmt.params = params
+
+    def rewrite_suffixes(self, varaccess):
+        varaccess.suffixes = [[self.rewrite(x) for x in lst] for lst in varaccess.suffixes]
+
+    # ---------------------
+    # Expressões
+    # ---------------------
+    def rewrite(self, expr):
+        if isinstance(expr, (BinOp, UnOp)) and self.invariant(expr):
+            tname = self.expr_type(expr)
+            if tname in HOISTABLE:
+                return self.temp_for(expr, tname)
+        if isinstance(expr, BinOp):
+            expr.left = self.rewrite(expr.left)
+            expr.right = self.rewrite(expr.right)
+        elif isinstance(expr, UnOp):
+            expr.expr = self.rewrite(expr.expr)
+        elif isinstance(expr, VarAccess):
+            self.rewrite_suffixes(expr)
+        return expr
+
+    def temp_for(self, expr, tname):
+        key = expr_key(expr)
+        name = self.found.get(key)
+        if name is None:
+            name = f"__inv{self.counter}"
+            self.counter += 1
+            self.found[key] = name
+            self.types[name.upper()] = tname
+            self.decls.append(VarDecl([name], Type(tname.lower())))
+            self.pre.append(Assign(VarAccess(name, []), expr))
+            self.hoisted += 1
+        return VarAccess(name, [])
+
+    def invariant(self, expr) -> bool:
+        if isinstance(expr, Literal):
+            return True
+        if isinstance(expr, VarAccess):
+            key = expr.name.upper()
+            return (not expr.suffixes and key not in self.assigned and key not in self.byref
+                    and key != self.func_name and self.types.get(key) in HOISTABLE)
+        if isinstance(expr, BinOp):
+            if expr.op.upper() in ('DIV', 'MOD', '/'):
+                r = expr.right
+                if not (isinstance(r, Literal) and isinstance(r.value, (int, float))
+                        and not isinstance(r.value, bool) and r.value != 0):
+                    return False
+            return self.invariant(expr.left) and self.invariant(expr.right)
+        if isinstance(expr, UnOp):
+            return self.invariant(expr.expr)
+        return False
+
+    def expr_type(self, expr):
+        if isinstance(expr, Literal):
+            v = expr.value
+            if isinstance(v, bool):
+                return 'BOOLEAN'
+            if isinstance(v, int):
+                return 'INTEGER'
+            if isinstance(v, float):
+                return 'REAL'
+            return None
+        if isinstance(expr, VarAccess):
+            return self.types.get(expr.name.upper())
+        if isinstance(expr, UnOp):
+            return self.expr_type(expr.expr)
+        if isinstance(expr, BinOp):
+            op = expr.op.upper()
+            lt, rt = self.expr_type(expr.left), self.expr_type(expr.right)
+            if lt is None or rt is None:
+                return None
+            if op in RELATIONAL:
+                return 'BOOLEAN'
+            if op in ('AND', 'OR'):
+                return 'BOOLEAN' if lt == rt == 'BOOLEAN' else 'INTEGER'
+            if op == '/' or 'REAL' in (lt, rt):
+                return 'REAL'
+            return 'INTEGER'
+        return None
+
+
+# função de interface
+def optimize_loops(ast_root: Program) -> Program:
+    return LoopOptimizer().optimize_program(ast_root)
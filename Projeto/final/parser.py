@@ -1,8 +1,23 @@
 import ply.yacc as yacc
 import sys
-from analex import tokens, literals
+import plycache
+from analex import tokens, literals, lexer
 from ast1 import *
-from codegen_ewvm import generate_ewvm
+
+def at(node, p, i):
+    # posição (linha, coluna) do símbolo i da produção
+    lexpos = p.lexpos(i)
+    node.line = p.lineno(i)
+    node.col = lexpos - p.lexer.lexdata.rfind('\n', 0, lexpos)
+    return node
+
+
+def keep_position(p):
+    # operadores e sinais são não-terminais: passa-se a posição do token para
+    # cima, para que a regra que cria o BinOp/UnOp a possa usar
+    p.set_lineno(0, p.lineno(1))
+    p.set_lexpos(0, p.lexpos(1))
+
 
 precedence = (
     ('left', 'OR'),
@@ -21,7 +36,7 @@ def p_program(p):
     program : program_heading ';' block '.'
     """
     name, params = p[1]
-    p[0] = Program(name, params, p[3])
+    p[0] = at(Program(name, params, p[3]), p, 1)
 
 def p_program_heading(p):
     """
@@ -32,6 +47,7 @@ def p_program_heading(p):
         p[0] = (p[2], p[4])
     else:
         p[0] = (p[2], [])
+    keep_position(p)
 
 
 #
@@ -64,13 +80,14 @@ def p_const_list(p):
     if len(p) == 3:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_const_def(p):
     """
     const_def : ID '=' constant
     """
-    p[0] = ConstDecl(p[1], p[3])
+    p[0] = at(ConstDecl(p[1], p[3]), p, 1)
 
 def p_constant(p):
     """
@@ -94,6 +111,7 @@ def p_constant(p):
         p[0] = VarAccess(p[1], [])
     else:
         p[0] = Literal(p[1])
+    at(p[0], p, 1)
 
 def p_sign(p):
     """
@@ -101,6 +119,7 @@ def p_sign(p):
          | '-'
     """
     p[0] = p[1]
+    keep_position(p)
 
 
 #
@@ -122,7 +141,8 @@ def p_var_list(p):
     if len(p) == 3:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_var_dec(p):
     """
@@ -133,9 +153,13 @@ def p_var_dec(p):
 def p_id_list(p):
     """
     id_list : ID
-            | ID ',' id_list
+            | id_list ',' ID
     """
-    p[0] = [p[1]] if len(p) == 2 else [p[1]] + p[3]
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 #
@@ -191,7 +215,11 @@ def p_ordinal_type_list(p):
     ordinal_type_list : ordinal_type
                       | ordinal_type_list ',' ordinal_type
     """
-    p[0] = [p[1]] if len(p) == 2 else p[1] + [p[3]]
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 #
@@ -207,21 +235,22 @@ def p_procfunc_part(p):
     if len(p) == 1:
         p[0] = []
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_proc_dec(p):
     """
     proc_dec : proc_heading ';' block ';'
     """
     name, params = p[1]
-    p[0] = Proc(name, params, p[3])
+    p[0] = at(Proc(name, params, p[3]), p, 1)
 
 def p_func_dec(p):
     """
     func_dec : func_heading ';' block ';'
     """
     name, params, rettype = p[1]
-    p[0] = Func(name, params, rettype, p[3])
+    p[0] = at(Func(name, params, rettype, p[3]), p, 1)
 
 def p_proc_heading(p):
     """
@@ -232,6 +261,7 @@ def p_proc_heading(p):
         p[0] = (p[2], [])
     else:
         p[0] = (p[2], p[4])
+    keep_position(p)
 
 def p_func_heading(p):
     """
@@ -242,6 +272,7 @@ def p_func_heading(p):
         p[0] = (p[2], [], Type(p[4]))
     else:
         p[0] = (p[2], p[4], Type(p[7]))
+    keep_position(p)
 
 def p_param_list(p):
     """
@@ -251,7 +282,8 @@ def p_param_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_param(p):
     """
@@ -273,7 +305,7 @@ def p_var_access(p):
     """
     var_access : ID var_suffix
     """
-    p[0] = VarAccess(p[1], p[2])
+    p[0] = at(VarAccess(p[1], p[2]), p, 1)
 
 def p_var_suffix(p):
     """
@@ -281,9 +313,9 @@ def p_var_suffix(p):
                | '[' expr_list ']' var_suffix
     """
     if len(p) == 1:
-        p[0] = []
+        p[0] = ()  # partilhado por todos os acessos sem índices
     else:
-        p[0] = [p[2]] + p[4]
+        p[0] = [p[2], *p[4]]
 
 
 #
@@ -295,7 +327,11 @@ def p_expr_list(p):
     expr_list : expr
               | expr_list ',' expr
     """
-    p[0] = [p[1]] if len(p) == 2 else p[1] + [p[3]]
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_expr(p):
     """
@@ -305,65 +341,31 @@ def p_expr(p):
     if len(p) == 2:
         p[0] = p[1]
     else:
-        p[0] = BinOp(p[2], p[1], p[3])
+        p[0] = at(BinOp(p[2], p[1], p[3]), p, 2)
 
 def p_simple_expr(p):
     """
-    simple_expr : term term_sequence
-                | sign term term_sequence
+    simple_expr : term
+                | sign term
+                | simple_expr add_op term
     """
-    if len(p) == 3:
-        expr = p[1]
-        seq = p[2]
-        p[0] = expr if not seq else seq[0](expr)
+    # recursiva à esquerda: a + b + c fica ((a + b) + c) sem recursão extra
+    if len(p) == 2:
+        p[0] = p[1]
+    elif len(p) == 3:
+        p[0] = at(UnOp(p[1], p[2]), p, 1)
     else:
-        expr = UnOp(p[1], p[2])
-        seq = p[3]
-        p[0] = expr if not seq else seq[0](expr)
+        p[0] = at(BinOp(p[2], p[1], p[3]), p, 2)
 
 def p_term(p):
     """
-    term : factor factor_sequence
-    """
-    base = p[1]
-    seq = p[2]
-    p[0] = base if not seq else seq[0](base)
-
-def p_term_sequence(p):
-    """
-    term_sequence :
-                  | add_op term term_sequence
-    """
-    if len(p) == 1:
-        p[0] = []
-    else:
-        op = p[1]
-        right = p[2]
-        rest = p[3]
-
-        def builder(left):
-            expr = BinOp(op, left, right)
-            return expr if not rest else rest[0](expr)
-
-        p[0] = [builder]
-
-def p_factor_sequence(p):
-    """
-    factor_sequence :
-                    | mul_op factor factor_sequence
+    term : factor
+         | term mul_op factor
     """
-    if len(p) == 1:
-        p[0] = []
+    if len(p) == 2:
+        p[0] = p[1]
     else:
-        op = p[1]
-        right = p[2]
-        rest = p[3]
-
-        def builder(left):
-            expr = BinOp(op, left, right)
-            return expr if not rest else rest[0](expr)
-
-        p[0] = [builder]
+        p[0] = at(BinOp(p[2], p[1], p[3]), p, 2)
 
 def p_factor(p):
     """
@@ -382,15 +384,15 @@ def p_factor(p):
         if p[1] == '(':
             p[0] = p[2]
         elif isinstance(p[1], str) and p[1].upper() == 'NOT':
-            p[0] = UnOp('NOT', p[2])
+            p[0] = at(UnOp('NOT', p[2]), p, 1)
         else:
-            p[0] = Call(p[1], p[3])
+            p[0] = at(Call(p[1], p[3]), p, 1)
             
     else:
         if isinstance(p[1], VarAccess):
             p[0] = p[1]
         else:
-            p[0] = Literal(p[1])
+            p[0] = at(Literal(p[1]), p, 1)
 
 def p_add_op(p):
     """
@@ -399,6 +401,7 @@ def p_add_op(p):
            | OR
     """
     p[0] = p[1]
+    keep_position(p)
 
 def p_mul_op(p):
     """
@@ -409,6 +412,7 @@ def p_mul_op(p):
            | AND
     """
     p[0] = p[1]
+    keep_position(p)
 
 def p_relation_op(p):
     """
@@ -420,6 +424,7 @@ def p_relation_op(p):
                 | GE
     """
     p[0] = p[1]
+    keep_position(p)
 
 
 #
@@ -430,14 +435,18 @@ def p_compound_statement(p):
     """
     compound_statement : BEGIN statement_list END
     """
-    p[0] = CompoundStatement(p[2])
+    p[0] = at(CompoundStatement(p[2]), p, 1)
 
 def p_statement_list(p):
     """
     statement_list : statement
                    | statement_list ';' statement
     """
-    p[0] = [p[1]] if len(p) == 2 else p[1] + [p[3]]
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_statement(p):
     """
@@ -458,7 +467,7 @@ def p_assignment_statement(p):
     """
     assignment_statement : var_access ASSIGN expr
     """
-    p[0] = Assign(p[1], p[3])
+    p[0] = at(Assign(p[1], p[3]), p, 2)
 
 def p_proc_statement(p):
     """
@@ -469,6 +478,7 @@ def p_proc_statement(p):
         p[0] = Call(p[1], [])
     else:
         p[0] = Call(p[1], p[3])
+    at(p[0], p, 1)
 
 def p_labeled_statement(p):
     """
@@ -489,13 +499,18 @@ def p_read_statement(p):
             p[0] = Read([])
         else:
             p[0] = Read(p[3])
+    at(p[0], p, 1)
 
 def p_var_access_list(p):
     """
     var_access_list : var_access
                     | var_access_list ',' var_access
     """
-    p[0] = [p[1]] if len(p) == 2 else p[1] + [p[3]]
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_write_statement(p):
     """
@@ -510,13 +525,18 @@ def p_write_statement(p):
             p[0] = Write([], newline=True)
         else:
             p[0] = Write(p[3], newline=True)
+    at(p[0], p, 1)
 
 def p_write_list(p):
     """
     write_list : write_param
                | write_list ',' write_param
     """
-    p[0] = [p[1]] if len(p) == 2 else p[1] + [p[3]]
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_write_param(p):
     """
@@ -541,12 +561,13 @@ def p_if_statement(p):
         p[0] = If(p[2], p[4])
     else:
         p[0] = If(p[2], p[4], p[6])
+    at(p[0], p, 1)
 
 def p_while_statement(p):
     """
     while_statement : WHILE expr DO statement
     """
-    p[0] = While(p[2], p[4])
+    p[0] = at(While(p[2], p[4]), p, 1)
 
 def p_for_statement(p):
     """
@@ -557,18 +578,32 @@ def p_for_statement(p):
         p[0] = For(p[2], p[4], p[6], p[8])
     else:
         p[0] = For(p[2], p[4], p[6], p[8], downto=True)
+    at(p[0], p, 1)
 
 
 def p_error(p):
-    print('Erro sintático:', p)
+    parser.errors.append(f"Erro sintático: {p}")
     parser.success = False
 
 
-parser = yacc.yacc()
-data = sys.stdin.read()
-parser.success = True
-ast = parser.parse(data)
+parser = plycache.build_parser(sys.modules[__name__])
+
+
+def parse(data, fast_lexer=False):
+    """Analisa 'data' com o lexer e o parser já construídos; devolve
+    (ast ou None, lista de diagnósticos). Pode ser chamada repetidamente.
+    fast_lexer usa o lexer de analex_rapido em vez do PLY."""
+    lx = lexer
+    if fast_lexer:
+        from analex_rapido import lexer as lx
+    lx.lineno = 1
+    lx.errors = []
+    parser.errors = lx.errors
+    parser.success = True
+    ast = parser.parse(data, lexer=lx)
+    return (ast if parser.success else None), lx.errors
+
 
-if parser.success:
-    print("Analise sintatica concluida com sucesso.")
-    print(generate_ewvm(ast))
\ No newline at end of file
+if __name__ == '__main__':
+    from compilador import main
+    main()
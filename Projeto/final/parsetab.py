@@ -1,154 +0,0 @@
-
-# parsetab.py
-# This file is automatically generated. Do not edit.
-# pylint: disable=W,C,R
-_tabversion = '3.10'
-
-_lr_method = 'LALR'
-
-_lr_signature = "leftORleft+-left*/DIVMODANDrightNOTnonassocNELEGELTGTAND ARRAY ASSIGN BEGIN CHAR CONST DIV DO DOTDOT DOWNTO ELSE END FALSE FOR FUNCTION GE GT ID IF INT LE LT MOD NE NOT OF OR PROCEDURE PROGRAM READ READLN REAL STRING THEN TO TRUE VAR WHILE WRITE WRITELN\nprogram : program_heading ';' block '.'\n\nprogram_heading : PROGRAM ID '(' id_list ')'\n                | PROGRAM ID\n\nblock : const_part procfunc_part var_part compound_statement\n\nconst_part :\n           | CONST const_list\n\nconst_list : const_def ';'\n           | const_list const_def ';'\n\nconst_def : ID '=' constant\n\nconstant : sign INT\n         | INT\n         | sign REAL\n         | REAL\n         | CHAR\n         | STRING\n         | ID\n\nsign : '+'\n     | '-'\n\nvar_part :\n         | VAR var_list\n\nvar_list : var_dec ';'\n         | var_list var_dec ';'\n\nvar_dec : id_list ':' tipo\n\nid_list : ID\n        | ID ',' id_list\n\ntipo : ID\n     | new_type\n\nnew_type : enumerated_type\n         | subrange_type\n         | array_type\n\nenumerated_type : '(' id_list ')'\n\nsubrange_type : constant DOTDOT constant\n\narray_type : ARRAY '[' ordinal_type_list ']' OF tipo\n\nordinal_type : enumerated_type\n             | subrange_type\n             | ID\n\nordinal_type_list : ordinal_type\n                  | ordinal_type_list ',' ordinal_type\n\nprocfunc_part :\n              | procfunc_part proc_dec\n              | procfunc_part func_dec\n\nproc_dec : proc_heading ';' block ';'\n\nfunc_dec : func_heading ';' block ';'\n\nproc_heading : PROCEDURE ID\n             | PROCEDURE ID '(' param_list ')'\n\nfunc_heading : FUNCTION ID ':' ID\n             | FUNCTION ID '(' param_list ')' ':' ID\n\nparam_list : param\n           | param_list ';' param\n\nparam : id_list ':' ID\n      | VAR id_list ':' ID\n\nvar_access : ID var_suffix\n\nvar_suffix :\n           | '[' expr_list ']' var_suffix\n\nexpr_list : expr\n          | expr_list ',' expr\n\nexpr : simple_expr\n     | simple_expr relation_op simple_expr\n\nsimple_expr : term term_sequence\n            | sign term term_sequence\n\nterm : factor factor_sequence\n\nterm_sequence :\n              | add_op term term_sequence\n\nfactor_sequence :\n                | mul_op factor factor_sequence\n\nfactor : var_access\n       | INT\n       | REAL\n       | CHAR\n       | STRING\n       | ID '(' expr_list ')'\n       | '(' expr ')'\n       | NOT factor\n       | TRUE\n       | FALSE\n\nadd_op : '+'\n       | '-'\n       | OR\n\nmul_op : '*'\n       | '/'\n       | DIV\n       | MOD\n       | AND\n\nrelation_op : '='\n            | NE\n            | LT\n            | GT\n            | LE\n            | GE\n\ncompound_statement : BEGIN statement_list END\n\nstatement_list : statement\n               | statement_list ';' statement\n\nstatement :\n          | assignment_statement\n          | proc_statement\n          | read_statement\n          | write_statement\n          | labeled_statement\n          | compound_statement\n          | if_statement\n          | while_statement\n          | for_statement\n\nassignment_statement : var_access ASSIGN expr\n\nproc_statement : ID\n               | ID '(' expr_list ')'\n\nlabeled_statement : INT ':' statement\n\nread_statement : READ '(' var_access_list ')'\n               | READLN\n               | READLN '(' var_access_list ')'\n\nvar_access_list : var_access\n                | var_access_list ',' var_access\n\nwrite_statement : WRITE '(' write_list ')'\n                | WRITELN\n                | WRITELN '(' write_list ')'\n\nwrite_list : write_param\n           | write_list ',' write_param\n\nwrite_param : expr\n            | expr ':' expr\n            | expr ':' expr ':' expr\n\nif_statement : IF expr THEN statement\n             | IF expr THEN statement ELSE statement\n\nwhile_statement : WHILE expr DO statement\n\nfor_statement : FOR ID ASSIGN expr TO expr DO statement\n              | FOR ID ASSIGN expr DOWNTO expr DO statement\n"
-    
-_lr_action_items = {'PROGRAM':([0,],[3,]),'$end':([1,10,],[0,-1,]),';':([2,5,13,21,22,25,29,30,31,33,37,40,41,43,44,45,46,50,51,52,53,54,55,56,57,58,59,60,62,64,66,71,74,75,79,80,81,82,85,91,93,94,96,97,98,99,100,101,102,105,106,110,111,112,113,114,115,121,122,125,126,127,128,140,141,149,154,155,164,165,170,175,177,178,180,181,184,185,186,187,188,189,191,192,194,195,201,202,206,210,211,212,213,218,219,221,227,228,229,230,231,],[4,-3,26,35,36,39,-2,-4,-93,72,-44,-16,-9,-11,-13,-14,-15,82,-91,-94,-95,-96,-97,-98,-99,-100,-101,-102,-104,-108,-113,109,119,120,-10,-12,-90,-93,-52,-93,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-23,-26,-27,-28,-29,-30,171,-48,-46,171,-92,-103,-106,-93,-59,-62,-61,-73,-93,-45,-105,-53,-107,-109,-112,-114,-120,-58,-62,-60,-64,-72,-122,-31,-32,-49,-50,-54,-93,-63,-65,-71,-51,-47,-121,-93,-93,-33,-123,-124,]),'ID':([3,8,9,12,20,23,24,26,27,28,31,32,39,47,48,68,69,70,72,73,76,77,78,82,83,84,86,87,88,89,90,91,95,103,104,109,116,124,141,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,165,166,168,169,171,172,176,179,182,183,203,204,210,214,215,217,220,224,227,228,],[5,14,15,14,15,37,38,-7,40,15,62,15,-8,-17,-18,102,102,108,-21,111,15,125,15,62,102,102,102,134,134,102,102,62,102,102,102,-22,15,15,62,102,-84,-85,-86,-87,-88,-89,102,-76,-77,-78,102,-79,-80,-81,-82,-83,102,62,102,40,200,15,202,102,134,102,102,218,219,62,102,102,200,102,111,62,62,]),'VAR':([4,7,11,12,18,19,26,35,36,39,76,78,119,120,171,],[-5,-39,20,-6,-40,-41,-7,-5,-5,-8,124,124,-42,-43,124,]),'PROCEDURE':([4,7,11,12,18,19,26,35,36,39,119,120,],[-5,-39,23,-6,-40,-41,-7,-5,-5,-8,-42,-43,]),'FUNCTION':([4,7,11,12,18,19,26,35,36,39,119,120,],[-5,-39,24,-6,-40,-41,-7,-5,-5,-8,-42,-43,]),'BEGIN':([4,7,11,12,17,18,19,26,31,32,35,36,39,72,82,91,109,119,120,141,165,210,227,228,],[-5,-39,-19,-6,31,-40,-41,-7,31,-20,-5,-5,-8,-21,31,31,-22,-42,-43,31,31,31,31,31,]),'CONST':([4,35,36,],[8,8,8,]),'(':([5,37,38,47,48,62,63,64,65,66,68,69,73,83,84,86,89,90,95,102,103,104,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,166,169,176,182,183,214,215,217,220,224,],[9,76,78,-17,-18,84,87,88,89,90,103,103,116,103,103,103,103,103,103,162,103,103,103,-84,-85,-86,-87,-88,-89,103,-76,-77,-78,103,-79,-80,-81,-82,-83,103,103,116,103,103,103,103,103,116,103,116,]),'.':([6,30,81,],[10,-4,-90,]),'=':([14,85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,187,188,189,191,206,211,212,213,],[27,-52,143,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-62,-60,-64,-72,-54,-63,-65,-71,]),')':([15,16,49,85,93,94,96,97,98,99,100,101,102,105,106,121,122,126,129,130,132,133,134,135,136,137,138,139,149,154,155,163,164,167,177,186,187,188,189,190,191,201,202,205,206,207,208,209,211,212,213,218,226,],[-24,29,-25,-52,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,170,-48,174,175,-55,178,-110,-53,180,181,-115,-117,184,-59,-62,-61,191,-73,194,-53,-58,-62,-60,-64,213,-72,-49,-50,-56,-54,-111,-116,-118,-63,-65,-71,-51,-119,]),':':([15,34,38,49,67,85,93,94,96,97,98,99,100,101,102,105,106,123,138,149,154,155,164,173,174,177,186,187,188,189,191,206,209,211,212,213,],[-24,73,77,-25,91,-52,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,172,183,-59,-62,-61,-73,203,204,-53,-58,-62,-60,-64,-72,-54,220,-63,-65,-71,]),',':([15,40,43,44,45,46,79,80,85,93,94,96,97,98,99,100,101,102,105,106,129,130,131,132,133,134,135,136,137,138,139,149,154,155,164,177,186,187,188,189,190,191,194,195,196,197,198,199,200,205,206,207,208,209,211,212,213,225,226,],[28,-16,-11,-13,-14,-15,-10,-12,-52,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,176,-55,176,179,-110,-53,179,182,-115,-117,182,-59,-62,-61,-73,-53,-58,-62,-60,-64,176,-72,-31,-32,217,-37,-34,-35,-36,-56,-54,-111,-116,-118,-63,-65,-71,-38,-119,]),'INT':([27,31,42,47,48,68,69,73,82,83,84,86,89,90,91,95,103,104,141,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,165,166,168,169,176,182,183,210,214,215,217,220,224,227,228,],[43,67,79,-17,-18,98,98,43,67,98,98,98,98,98,67,98,98,98,67,98,-84,-85,-86,-87,-88,-89,98,-76,-77,-78,98,-79,-80,-81,-82,-83,98,67,98,43,43,98,98,98,67,98,98,43,98,43,67,67,]),'REAL':([27,42,47,48,68,69,73,83,84,86,89,90,95,103,104,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,166,168,169,176,182,183,214,215,217,220,224,],[44,80,-17,-18,99,99,44,99,99,99,99,99,99,99,99,99,-84,-85,-86,-87,-88,-89,99,-76,-77,-78,99,-79,-80,-81,-82,-83,99,99,44,44,99,99,99,99,99,44,99,44,]),'CHAR':([27,47,48,68,69,73,83,84,86,89,90,95,103,104,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,166,168,169,176,182,183,214,215,217,220,224,],[45,-17,-18,100,100,45,100,100,100,100,100,100,100,100,100,-84,-85,-86,-87,-88,-89,100,-76,-77,-78,100,-79,-80,-81,-82,-83,100,100,45,45,100,100,100,100,100,45,100,45,]),'STRING':([27,47,48,68,69,73,83,84,86,89,90,95,103,104,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,166,168,169,176,182,183,214,215,217,220,224,],[46,-17,-18,101,101,46,101,101,101,101,101,101,101,101,101,-84,-85,-86,-87,-88,-89,101,-76,-77,-78,101,-79,-80,-81,-82,-83,101,101,46,46,101,101,101,101,101,46,101,46,]),'+':([27,68,69,73,83,84,85,86,89,90,94,96,97,98,99,100,101,102,103,105,106,142,143,144,145,146,147,148,154,155,162,164,166,168,169,176,177,182,183,187,189,191,206,212,213,214,215,217,220,224,],[47,47,47,47,47,47,-52,47,47,47,151,-64,-66,-67,-68,-69,-70,-53,47,-74,-75,47,-84,-85,-86,-87,-88,-89,151,-61,47,-73,47,47,47,47,-53,47,47,151,-64,-72,-54,-65,-71,47,47,47,47,47,]),'-':([27,68,69,73,83,84,85,86,89,90,94,96,97,98,99,100,101,102,103,105,106,142,143,144,145,146,147,148,154,155,162,164,166,168,169,176,177,182,183,187,189,191,206,212,213,214,215,217,220,224,],[48,48,48,48,48,48,-52,48,48,48,152,-64,-66,-67,-68,-69,-70,-53,48,-74,-75,48,-84,-85,-86,-87,-88,-89,152,-61,48,-73,48,48,48,48,-53,48,48,152,-64,-72,-54,-65,-71,48,48,48,48,48,]),'END':([31,50,51,52,53,54,55,56,57,58,59,60,62,64,66,81,82,85,91,93,94,96,97,98,99,100,101,102,105,106,127,128,140,141,149,154,155,164,165,175,177,178,180,181,184,185,186,187,188,189,191,192,206,210,211,212,213,221,227,228,230,231,],[-93,81,-91,-94,-95,-96,-97,-98,-99,-100,-101,-102,-104,-108,-113,-90,-93,-52,-93,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-92,-103,-106,-93,-59,-62,-61,-73,-93,-105,-53,-107,-109,-112,-114,-120,-58,-62,-60,-64,-72,-122,-54,-93,-63,-65,-71,-121,-93,-93,-123,-124,]),'READ':([31,82,91,141,165,210,227,228,],[63,63,63,63,63,63,63,63,]),'READLN':([31,82,91,141,165,210,227,228,],[64,64,64,64,64,64,64,64,]),'WRITE':([31,82,91,141,165,210,227,228,],[65,65,65,65,65,65,65,65,]),'WRITELN':([31,82,91,141,165,210,227,228,],[66,66,66,66,66,66,66,66,]),'IF':([31,82,91,141,165,210,227,228,],[68,68,68,68,68,68,68,68,]),'WHILE':([31,82,91,141,165,210,227,228,],[69,69,69,69,69,69,69,69,]),'FOR':([31,82,91,141,165,210,227,228,],[70,70,70,70,70,70,70,70,]),']':([40,43,44,45,46,79,80,85,93,94,96,97,98,99,100,101,102,105,106,130,131,149,154,155,164,177,186,187,188,189,191,194,195,196,197,198,199,200,205,206,211,212,213,225,],[-16,-11,-13,-14,-15,-10,-12,-52,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-55,177,-59,-62,-61,-73,-53,-58,-62,-60,-64,-72,-31,-32,216,-37,-34,-35,-36,-56,-54,-63,-65,-71,-38,]),'DOTDOT':([43,44,45,46,79,80,111,117,200,],[-11,-13,-14,-15,-10,-12,-16,168,-16,]),'NOT':([47,48,68,69,83,84,86,89,90,95,103,104,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,166,176,182,183,214,215,220,],[-17,-18,104,104,104,104,104,104,104,104,104,104,104,-84,-85,-86,-87,-88,-89,104,-76,-77,-78,104,-79,-80,-81,-82,-83,104,104,104,104,104,104,104,104,]),'TRUE':([47,48,68,69,83,84,86,89,90,95,103,104,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,166,176,182,183,214,215,220,],[-17,-18,105,105,105,105,105,105,105,105,105,105,105,-84,-85,-86,-87,-88,-89,105,-76,-77,-78,105,-79,-80,-81,-82,-83,105,105,105,105,105,105,105,105,]),'FALSE':([47,48,68,69,83,84,86,89,90,95,103,104,142,143,144,145,146,147,148,150,151,152,153,156,157,158,159,160,161,162,166,176,182,183,214,215,220,],[-17,-18,106,106,106,106,106,106,106,106,106,106,106,-84,-85,-86,-87,-88,-89,106,-76,-77,-78,106,-79,-80,-81,-82,-83,106,106,106,106,106,106,106,106,]),'ELSE':([52,53,54,55,56,57,58,59,60,62,64,66,81,85,91,93,94,96,97,98,99,100,101,102,105,106,128,140,141,149,154,155,164,165,175,177,178,180,181,184,185,186,187,188,189,191,192,206,210,211,212,213,221,227,228,230,231,],[-94,-95,-96,-97,-98,-99,-100,-101,-102,-104,-108,-113,-90,-52,-93,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-103,-106,-93,-59,-62,-61,-73,-93,-105,-53,-107,-109,-112,-114,210,-58,-62,-60,-64,-72,-122,-54,-93,-63,-65,-71,-121,-93,-93,-123,-124,]),'ASSIGN':([61,62,85,108,177,206,],[83,-53,-52,166,-53,-54,]),'[':([62,102,118,134,177,],[86,86,169,86,86,]),'ARRAY':([73,224,],[118,118,]),'*':([85,96,97,98,99,100,101,102,105,106,164,177,189,191,206,213,],[-52,157,-66,-67,-68,-69,-70,-53,-74,-75,-73,-53,157,-72,-54,-71,]),'/':([85,96,97,98,99,100,101,102,105,106,164,177,189,191,206,213,],[-52,158,-66,-67,-68,-69,-70,-53,-74,-75,-73,-53,158,-72,-54,-71,]),'DIV':([85,96,97,98,99,100,101,102,105,106,164,177,189,191,206,213,],[-52,159,-66,-67,-68,-69,-70,-53,-74,-75,-73,-53,159,-72,-54,-71,]),'MOD':([85,96,97,98,99,100,101,102,105,106,164,177,189,191,206,213,],[-52,160,-66,-67,-68,-69,-70,-53,-74,-75,-73,-53,160,-72,-54,-71,]),'AND':([85,96,97,98,99,100,101,102,105,106,164,177,189,191,206,213,],[-52,161,-66,-67,-68,-69,-70,-53,-74,-75,-73,-53,161,-72,-54,-71,]),'OR':([85,94,96,97,98,99,100,101,102,105,106,154,155,164,177,187,189,191,206,212,213,],[-52,153,-64,-66,-67,-68,-69,-70,-53,-74,-75,153,-61,-73,-53,153,-64,-72,-54,-65,-71,]),'NE':([85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,187,188,189,191,206,211,212,213,],[-52,144,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-62,-60,-64,-72,-54,-63,-65,-71,]),'LT':([85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,187,188,189,191,206,211,212,213,],[-52,145,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-62,-60,-64,-72,-54,-63,-65,-71,]),'GT':([85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,187,188,189,191,206,211,212,213,],[-52,146,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-62,-60,-64,-72,-54,-63,-65,-71,]),'LE':([85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,187,188,189,191,206,211,212,213,],[-52,147,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-62,-60,-64,-72,-54,-63,-65,-71,]),'GE':([85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,187,188,189,191,206,211,212,213,],[-52,148,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-62,-60,-64,-72,-54,-63,-65,-71,]),'THEN':([85,92,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,186,187,188,189,191,206,211,212,213,],[-52,141,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-58,-62,-60,-64,-72,-54,-63,-65,-71,]),'DO':([85,93,94,96,97,98,99,100,101,102,105,106,107,149,154,155,164,177,186,187,188,189,191,206,211,212,213,222,223,],[-52,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,165,-59,-62,-61,-73,-53,-58,-62,-60,-64,-72,-54,-63,-65,-71,227,228,]),'TO':([85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,186,187,188,189,191,193,206,211,212,213,],[-52,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-58,-62,-60,-64,-72,214,-54,-63,-65,-71,]),'DOWNTO':([85,93,94,96,97,98,99,100,101,102,105,106,149,154,155,164,177,186,187,188,189,191,193,206,211,212,213,],[-52,-57,-62,-64,-66,-67,-68,-69,-70,-53,-74,-75,-59,-62,-61,-73,-53,-58,-62,-60,-64,-72,215,-54,-63,-65,-71,]),'OF':([216,],[224,]),}
-
-_lr_action = {}
-for _k, _v in _lr_action_items.items():
-   for _x,_y in zip(_v[0],_v[1]):
-      if not _x in _lr_action:  _lr_action[_x] = {}
-      _lr_action[_x][_k] = _y
-del _lr_action_items
-
-_lr_goto_items = {'program':([0,],[1,]),'program_heading':([0,],[2,]),'block':([4,35,36,],[6,74,75,]),'const_part':([4,35,36,],[7,7,7,]),'procfunc_part':([7,],[11,]),'const_list':([8,],[12,]),'const_def':([8,12,],[13,25,]),'id_list':([9,20,28,32,76,78,116,124,171,],[16,34,49,34,123,123,167,173,123,]),'var_part':([11,],[17,]),'proc_dec':([11,],[18,]),'func_dec':([11,],[19,]),'proc_heading':([11,],[21,]),'func_heading':([11,],[22,]),'compound_statement':([17,31,82,91,141,165,210,227,228,],[30,57,57,57,57,57,57,57,57,]),'var_list':([20,],[32,]),'var_dec':([20,32,],[33,71,]),'constant':([27,73,168,169,217,224,],[41,117,195,117,117,117,]),'sign':([27,68,69,73,83,84,86,89,90,103,142,162,166,168,169,176,182,183,214,215,217,220,224,],[42,95,95,42,95,95,95,95,95,95,95,95,95,42,42,95,95,95,95,95,42,95,42,]),'statement_list':([31,],[50,]),'statement':([31,82,91,141,165,210,227,228,],[51,127,140,185,192,221,230,231,]),'assignment_statement':([31,82,91,141,165,210,227,228,],[52,52,52,52,52,52,52,52,]),'proc_statement':([31,82,91,141,165,210,227,228,],[53,53,53,53,53,53,53,53,]),'read_statement':([31,82,91,141,165,210,227,228,],[54,54,54,54,54,54,54,54,]),'write_statement':([31,82,91,141,165,210,227,228,],[55,55,55,55,55,55,55,55,]),'labeled_statement':([31,82,91,141,165,210,227,228,],[56,56,56,56,56,56,56,56,]),'if_statement':([31,82,91,141,165,210,227,228,],[58,58,58,58,58,58,58,58,]),'while_statement':([31,82,91,141,165,210,227,228,],[59,59,59,59,59,59,59,59,]),'for_statement':([31,82,91,141,165,210,227,228,],[60,60,60,60,60,60,60,60,]),'var_access':([31,68,69,82,83,84,86,87,88,89,90,91,95,103,104,141,142,150,156,162,165,166,176,179,182,183,210,214,215,220,227,228,],[61,97,97,61,97,97,97,133,133,97,97,61,97,97,97,61,97,97,97,97,61,97,97,207,97,97,61,97,97,97,61,61,]),'var_suffix':([62,102,134,177,],[85,85,85,206,]),'expr':([68,69,83,84,86,89,90,103,162,166,176,182,183,214,215,220,],[92,107,128,130,130,138,138,163,130,193,205,138,209,222,223,226,]),'simple_expr':([68,69,83,84,86,89,90,103,142,162,166,176,182,183,214,215,220,],[93,93,93,93,93,93,93,93,186,93,93,93,93,93,93,93,93,]),'term':([68,69,83,84,86,89,90,95,103,142,150,162,166,176,182,183,214,215,220,],[94,94,94,94,94,94,94,154,94,94,187,94,94,94,94,94,94,94,94,]),'factor':([68,69,83,84,86,89,90,95,103,104,142,150,156,162,166,176,182,183,214,215,220,],[96,96,96,96,96,96,96,96,96,164,96,96,189,96,96,96,96,96,96,96,96,]),'tipo':([73,224,],[110,229,]),'new_type':([73,224,],[112,112,]),'enumerated_type':([73,169,217,224,],[113,198,198,113,]),'subrange_type':([73,169,217,224,],[114,199,199,114,]),'array_type':([73,224,],[115,115,]),'param_list':([76,78,],[121,126,]),'param':([76,78,171,],[122,122,201,]),'expr_list':([84,86,162,],[129,131,190,]),'var_access_list':([87,88,],[132,135,]),'write_list':([89,90,],[136,139,]),'write_param':([89,90,182,],[137,137,208,]),'relation_op':([93,],[142,]),'term_sequence':([94,154,187,],[149,188,211,]),'add_op':([94,154,187,],[150,150,150,]),'factor_sequence':([96,189,],[155,212,]),'mul_op':([96,189,],[156,156,]),'ordinal_type_list':([169,],[196,]),'ordinal_type':([169,217,],[197,225,]),}
-
-_lr_goto = {}
-for _k, _v in _lr_goto_items.items():
-   for _x, _y in zip(_v[0], _v[1]):
-       if not _x in _lr_goto: _lr_goto[_x] = {}
-       _lr_goto[_x][_k] = _y
-del _lr_goto_items
-_lr_productions = [
-  ("S' -> program","S'",1,None,None,None),
-  ('program -> program_heading ; block .','program',4,'p_program','parser.py',21),
-  ('program_heading -> PROGRAM ID ( id_list )','program_heading',5,'p_program_heading','parser.py',28),
-  ('program_heading -> PROGRAM ID','program_heading',2,'p_program_heading','parser.py',29),
-  ('block -> const_part procfunc_part var_part compound_statement','block',4,'p_block','parser.py',43),
-  ('const_part -> <empty>','const_part',0,'p_const_part','parser.py',54),
-  ('const_part -> CONST const_list','const_part',2,'p_const_part','parser.py',55),
-  ('const_list -> const_def ;','const_list',2,'p_const_list','parser.py',61),
-  ('const_list -> const_list const_def ;','const_list',3,'p_const_list','parser.py',62),
-  ('const_def -> ID = constant','const_def',3,'p_const_def','parser.py',71),
-  ('constant -> sign INT','constant',2,'p_constant','parser.py',77),
-  ('constant -> INT','constant',1,'p_constant','parser.py',78),
-  ('constant -> sign REAL','constant',2,'p_constant','parser.py',79),
-  ('constant -> REAL','constant',1,'p_constant','parser.py',80),
-  ('constant -> CHAR','constant',1,'p_constant','parser.py',81),
-  ('constant -> STRING','constant',1,'p_constant','parser.py',82),
-  ('constant -> ID','constant',1,'p_constant','parser.py',83),
-  ('sign -> +','sign',1,'p_sign','parser.py',102),
-  ('sign -> -','sign',1,'p_sign','parser.py',103),
-  ('var_part -> <empty>','var_part',0,'p_var_part','parser.py',114),
-  ('var_part -> VAR var_list','var_part',2,'p_var_part','parser.py',115),
-  ('var_list -> var_dec ;','var_list',2,'p_var_list','parser.py',121),
-  ('var_list -> var_list var_dec ;','var_list',3,'p_var_list','parser.py',122),
-  ('var_dec -> id_list : tipo','var_dec',3,'p_var_dec','parser.py',131),
-  ('id_list -> ID','id_list',1,'p_id_list','parser.py',137),
-  ('id_list -> ID , id_list','id_list',3,'p_id_list','parser.py',138),
-  ('tipo -> ID','tipo',1,'p_tipo','parser.py',149),
-  ('tipo -> new_type','tipo',1,'p_tipo','parser.py',150),
-  ('new_type -> enumerated_type','new_type',1,'p_new_type','parser.py',159),
-  ('new_type -> subrange_type','new_type',1,'p_new_type','parser.py',160),
-  ('new_type -> array_type','new_type',1,'p_new_type','parser.py',161),
-  ('enumerated_type -> ( id_list )','enumerated_type',3,'p_enumerated_type','parser.py',167),
-  ('subrange_type -> constant DOTDOT constant','subrange_type',3,'p_subrange_type','parser.py',173),
-  ('array_type -> ARRAY [ ordinal_type_list ] OF tipo','array_type',6,'p_array_type','parser.py',179),
-  ('ordinal_type -> enumerated_type','ordinal_type',1,'p_ordinal_type','parser.py',185),
-  ('ordinal_type -> subrange_type','ordinal_type',1,'p_ordinal_type','parser.py',186),
-  ('ordinal_type -> ID','ordinal_type',1,'p_ordinal_type','parser.py',187),
-  ('ordinal_type_list -> ordinal_type','ordinal_type_list',1,'p_ordinal_type_list','parser.py',193),
-  ('ordinal_type_list -> ordinal_type_list , ordinal_type','ordinal_type_list',3,'p_ordinal_type_list','parser.py',194),
-  ('procfunc_part -> <empty>','procfunc_part',0,'p_procfunc_part','parser.py',205),
-  ('procfunc_part -> procfunc_part proc_dec','procfunc_part',2,'p_procfunc_part','parser.py',206),
-  ('procfunc_part -> procfunc_part func_dec','procfunc_part',2,'p_procfunc_part','parser.py',207),
-  ('proc_dec -> proc_heading ; block ;','proc_dec',4,'p_proc_dec','parser.py',216),
-  ('func_dec -> func_heading ; block ;','func_dec',4,'p_func_dec','parser.py',223),
-  ('proc_heading -> PROCEDURE ID','proc_heading',2,'p_proc_heading','parser.py',230),
-  ('proc_heading -> PROCEDURE ID ( param_list )','proc_heading',5,'p_proc_heading','parser.py',231),
-  ('func_heading -> FUNCTION ID : ID','func_heading',4,'p_func_heading','parser.py',240),
-  ('func_heading -> FUNCTION ID ( param_list ) : ID','func_heading',7,'p_func_heading','parser.py',241),
-  ('param_list -> param','param_list',1,'p_param_list','parser.py',250),
-  ('param_list -> param_list ; param','param_list',3,'p_param_list','parser.py',251),
-  ('param -> id_list : ID','param',3,'p_param','parser.py',260),
-  ('param -> VAR id_list : ID','param',4,'p_param','parser.py',261),
-  ('var_access -> ID var_suffix','var_access',2,'p_var_access','parser.py',276),
-  ('var_suffix -> <empty>','var_suffix',0,'p_var_suffix','parser.py',282),
-  ('var_suffix -> [ expr_list ] var_suffix','var_suffix',4,'p_var_suffix','parser.py',283),
-  ('expr_list -> expr','expr_list',1,'p_expr_list','parser.py',297),
-  ('expr_list -> expr_list , expr','expr_list',3,'p_expr_list','parser.py',298),
-  ('expr -> simple_expr','expr',1,'p_expr','parser.py',304),
-  ('expr -> simple_expr relation_op simple_expr','expr',3,'p_expr','parser.py',305),
-  ('simple_expr -> term term_sequence','simple_expr',2,'p_simple_expr','parser.py',314),
-  ('simple_expr -> sign term term_sequence','simple_expr',3,'p_simple_expr','parser.py',315),
-  ('term -> factor factor_sequence','term',2,'p_term','parser.py',328),
-  ('term_sequence -> <empty>','term_sequence',0,'p_term_sequence','parser.py',336),
-  ('term_sequence -> add_op term term_sequence','term_sequence',3,'p_term_sequence','parser.py',337),
-  ('factor_sequence -> <empty>','factor_sequence',0,'p_factor_sequence','parser.py',354),
-  ('factor_sequence -> mul_op factor factor_sequence','factor_sequence',3,'p_factor_sequence','parser.py',355),
-  ('factor -> var_access','factor',1,'p_factor','parser.py',372),
-  ('factor -> INT','factor',1,'p_factor','parser.py',373),
-  ('factor -> REAL','factor',1,'p_factor','parser.py',374),
-  ('factor -> CHAR','factor',1,'p_factor','parser.py',375),
-  ('factor -> STRING','factor',1,'p_factor','parser.py',376),
-  ('factor -> ID ( expr_list )','factor',4,'p_factor','parser.py',377),
-  ('factor -> ( expr )','factor',3,'p_factor','parser.py',378),
-  ('factor -> NOT factor','factor',2,'p_factor','parser.py',379),
-  ('factor -> TRUE','factor',1,'p_factor','parser.py',380),
-  ('factor -> FALSE','factor',1,'p_factor','parser.py',381),
-  ('add_op -> +','add_op',1,'p_add_op','parser.py',403),
-  ('add_op -> -','add_op',1,'p_add_op','parser.py',404),
-  ('add_op -> OR','add_op',1,'p_add_op','parser.py',405),
-  ('mul_op -> *','mul_op',1,'p_mul_op','parser.py',411),
-  ('mul_op -> /','mul_op',1,'p_mul_op','parser.py',412),
-  ('mul_op -> DIV','mul_op',1,'p_mul_op','parser.py',413),
-  ('mul_op -> MOD','mul_op',1,'p_mul_op','parser.py',414),
-  ('mul_op -> AND','mul_op',1,'p_mul_op','parser.py',415),
-  ('relation_op -> =','relation_op',1,'p_relation_op','parser.py',421),
-  ('relation_op -> NE','relation_op',1,'p_relation_op','parser.py',422),
-  ('relation_op -> LT','relation_op',1,'p_relation_op','parser.py',423),
-  ('relation_op -> GT','relation_op',1,'p_relation_op','parser.py',424),
-  ('relation_op -> LE','relation_op',1,'p_relation_op','parser.py',425),
-  ('relation_op -> GE','relation_op',1,'p_relation_op','parser.py',426),
-  ('compound_statement -> BEGIN statement_list END','compound_statement',3,'p_compound_statement','parser.py',437),
-  ('statement_list -> statement','statement_list',1,'p_statement_list','parser.py',443),
-  ('statement_list -> statement_list ; statement','statement_list',3,'p_statement_list','parser.py',444),
-  ('statement -> <empty>','statement',0,'p_statement','parser.py',450),
-  ('statement -> assignment_statement','statement',1,'p_statement','parser.py',451),
-  ('statement -> proc_statement','statement',1,'p_statement','parser.py',452),
-  ('statement -> read_statement','statement',1,'p_statement','parser.py',453),
-  ('statement -> write_statement','statement',1,'p_statement','parser.py',454),
-  ('statement -> labeled_statement','statement',1,'p_statement','parser.py',455),
-  ('statement -> compound_statement','statement',1,'p_statement','parser.py',456),
-  ('statement -> if_statement','statement',1,'p_statement','parser.py',457),
-  ('statement -> while_statement','statement',1,'p_statement','parser.py',458),
-  ('statement -> for_statement','statement',1,'p_statement','parser.py',459),
-  ('assignment_statement -> var_access ASSIGN expr','assignment_statement',3,'p_assignment_statement','parser.py',465),
-  ('proc_statement -> ID','proc_statement',1,'p_proc_statement','parser.py',471),
-  ('proc_statement -> ID ( expr_list )','proc_statement',4,'p_proc_statement','parser.py',472),
-  ('labeled_statement -> INT : statement','labeled_statement',3,'p_labeled_statement','parser.py',481),
-  ('read_statement -> READ ( var_access_list )','read_statement',4,'p_read_statement','parser.py',487),
-  ('read_statement -> READLN','read_statement',1,'p_read_statement','parser.py',488),
-  ('read_statement -> READLN ( var_access_list )','read_statement',4,'p_read_statement','parser.py',489),
-  ('var_access_list -> var_access','var_access_list',1,'p_var_access_list','parser.py',501),
-  ('var_access_list -> var_access_list , var_access','var_access_list',3,'p_var_access_list','parser.py',502),
-  ('write_statement -> WRITE ( write_list )','write_statement',4,'p_write_statement','parser.py',508),
-  ('write_statement -> WRITELN','write_statement',1,'p_write_statement','parser.py',509),
-  ('write_statement -> WRITELN ( write_list )','write_statement',4,'p_write_statement','parser.py',510),
-  ('write_list -> write_param','write_list',1,'p_write_list','parser.py',522),
-  ('write_list -> write_list , write_param','write_list',3,'p_write_list','parser.py',523),
-  ('write_param -> expr','write_param',1,'p_write_param','parser.py',529),
-  ('write_param -> expr : expr','write_param',3,'p_write_param','parser.py',530),
-  ('write_param -> expr : expr : expr','write_param',5,'p_write_param','parser.py',531),
-  ('if_statement -> IF expr THEN statement','if_statement',4,'p_if_statement','parser.py',543),
-  ('if_statement -> IF expr THEN statement ELSE statement','if_statement',6,'p_if_statement','parser.py',544),
-  ('while_statement -> WHILE expr DO statement','while_statement',4,'p_while_statement','parser.py',553),
-  ('for_statement -> FOR ID ASSIGN expr TO expr DO statement','for_statement',8,'p_for_statement','parser.py',559),
-  ('for_statement -> FOR ID ASSIGN expr DOWNTO expr DO statement','for_statement',8,'p_for_statement','parser.py',560),
-]
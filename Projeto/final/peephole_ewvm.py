@@ -0,0 +1,330 @@
+import sys
+from typing import List, Dict, Optional, Callable
+
+from vm_ewvm import Instr, format_instr, parse_instr
+
+# Otimizador peephole sobre as instruções EWVM emitidas pelo CodeGenerator.
+#
+# Trabalha sobre as instruções como o gerador as emite (vm_ewvm.Instr): pares
+# (OP, operando) com o operando já convertido; os rótulos são (':', nome).
+# As regras de janela recebem a lista e uma posição e devolvem
+# (nº de instruções consumidas, substituição) ou None; as regras globais
+# (saltos, código morto, rótulos) recebem a lista inteira. O passo corre em
+# várias rondas até não haver alterações (ou até max_rounds).
+
+PUSHES = ('PUSHI', 'PUSHG', 'PUSHL', 'PUSHF', 'PUSHS')
+
+# efeito na pilha (retira, coloca) das instruções sem efeitos laterais
+STACK_EFFECT = {
+    'PUSHI': (0, 1), 'PUSHG': (0, 1), 'PUSHL': (0, 1), 'PUSHF': (0, 1), 'PUSHS': (0, 1),
+    'PUSHGP': (0, 1), 'PUSHFP': (0, 1),
+    'ADD': (2, 1), 'SUB': (2, 1), 'MUL': (2, 1), 'DIV': (2, 1), 'MOD': (2, 1),
+    'FADD': (2, 1), 'FSUB': (2, 1), 'FMUL': (2, 1), 'FDIV': (2, 1),
+    'EQUAL': (2, 1), 'INF': (2, 1), 'INFEQ': (2, 1), 'SUP': (2, 1), 'SUPEQ': (2, 1),
+    'AND': (2, 1), 'OR': (2, 1), 'NOT': (1, 1), 'ITOF': (1, 1), 'FTOI': (1, 1),
+    'PADD': (2, 1), 'LOADN': (2, 1),
+}
+
+
+def is_int(ins, value=None):
+    if ins[0] != 'PUSHI' or type(ins[1]) is not int:
+        return False
+    return value is None or ins[1] == value
+
+
+def int_arg(ins):
+    return ins[1]
+
+
+def trunc_div(a, b):
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+# ---------------------
+# Regras de janela
+# ---------------------
+def rule_add_zero(code, i):
+    # PUSHI 0 ; <expr> ; ADD  ->  <expr>   (início dos cálculos de índice)
+    if not is_int(code[i], 0):
+        return None
+    depth = 0
+    j = i + 1
+    while j < len(code):
+        op = code[j][0]
+        effect = STACK_EFFECT.get(op)
+        if effect is None:
+            return None
+        depth -= effect[0]
+        if depth < 0:
+            return None
+        depth += effect[1]
+        if depth == 1 and j + 1 < len(code) and code[j + 1][0] == 'ADD':
+            return j + 2 - i, code[i + 1:j + 1]
+        j += 1
+    return None
+
+
+def rule_neutral(code, i):
+    # PUSHI 0 ; ADD|SUB  e  PUSHI 1 ; MUL|DIV  não fazem nada
+    if i + 1 >= len(code):
+        return None
+    op = code[i + 1][0]
+    if is_int(code[i], 0) and op in ('ADD', 'SUB'):
+        return 2, []
+    if is_int(code[i], 1) and op in ('MUL', 'DIV'):
+        return 2, []
+    return None
+
+
+def rule_const_fold(code, i):
+    # PUSHI a ; PUSHI b ; op  ->  PUSHI (a op b)
+    if i + 2 >= len(code) or not (is_int(code[i]) and is_int(code[i + 1])):
+        return None
+    a, b = int_arg(code[i]), int_arg(code[i + 1])
+    op = code[i + 2][0]
+    if op == 'ADD':
+        r = a + b
+    elif op == 'SUB':
+        r = a - b
+    elif op == 'MUL':
+        r = a * b
+    elif op == 'DIV' and b != 0:
+        r = trunc_div(a, b)
+    elif op == 'MOD' and b != 0:
+        r = a - b * trunc_div(a, b)
+    else:
+        return None
+    return 3, [('PUSHI', r)]
+
+
+def rule_add_chain(code, i):
+    # PUSHI a ; ADD|SUB ; PUSHI b ; ADD|SUB  ->  PUSHI c ; ADD
+    if i + 3 >= len(code):
+        return None
+    a, op1, b, op2 = code[i:i + 4]
+    if not (is_int(a) and is_int(b) and op1[0] in ('ADD', 'SUB') and op2[0] in ('ADD', 'SUB')):
+        return None
+    c = (int_arg(a) if op1[0] == 'ADD' else -int_arg(a)) + \
+        (int_arg(b) if op2[0] == 'ADD' else -int_arg(b))
+    if c >= 0:
+        return 4, [('PUSHI', c), ('ADD', None)]
+    return 4, [('PUSHI', -c), ('SUB', None)]
+
+
+def rule_store_load(code, i):
+    # STOREG n ; PUSHG n  ->  DUP 1 ; STOREG n
+    if i + 1 >= len(code):
+        return None
+    a, b = code[i], code[i + 1]
+    if (a[0], b[0]) in (('STOREG', 'PUSHG'), ('STOREL', 'PUSHL')) and a[1] == b[1]:
+        return 2, [('DUP', 1), a]
+    return None
+
+
+def rule_self_assign(code, i):
+    # PUSHG n ; STOREG n  ->  nada
+    if i + 1 >= len(code):
+        return None
+    a, b = code[i], code[i + 1]
+    if (a[0], b[0]) in (('PUSHG', 'STOREG'), ('PUSHL', 'STOREL')) and a[1] == b[1]:
+        return 2, []
+    return None
+
+
+def rule_const_index(code, i):
+    # PUSHGP ; PUSHI b ; PADD ; PUSHI k ; LOADN       ->  PUSHG b+k
+    # PUSHGP ; PUSHI b ; PADD ; PUSHI k ; X ; STOREN  ->  X ; STOREG b+k
+    if i + 4 >= len(code) or code[i][0] not in ('PUSHGP', 'PUSHFP'):
+        return None
+    if not (is_int(code[i + 1]) and code[i + 2][0] == 'PADD' and is_int(code[i + 3])):
+        return None
+    slot = int_arg(code[i + 1]) + int_arg(code[i + 3])
+    g = code[i][0] == 'PUSHGP'
+    if code[i + 4][0] == 'LOADN':
+        return 5, [('PUSHG' if g else 'PUSHL', slot)]
+    if i + 5 < len(code) and code[i + 4][0] in PUSHES and code[i + 5][0] == 'STOREN':
+        return 6, [code[i + 4], ('STOREG' if g else 'STOREL', slot)]
+    return None
+
+
+def rule_index_offset(code, i):
+    # PUSHI b ; PADD ; X ; PUSHI c ; SUB ; LOADN      ->  X ; PUSHI b-c ; ADD ; LOADN
+    # (e o mesmo com um valor Y antes de STOREN; só em arrays de uma dimensão,
+    #  onde o índice já não é multiplicado)
+    if i + 5 >= len(code):
+        return None
+    b, padd, x, c, sub = code[i:i + 5]
+    if not (is_int(b) and padd[0] == 'PADD' and x[0] in ('PUSHG', 'PUSHL', 'PUSHI')
+            and is_int(c) and sub[0] in ('ADD', 'SUB')):
+        return None
+    off = int_arg(b) + (int_arg(c) if sub[0] == 'ADD' else -int_arg(c))
+    nxt = code[i + 5]
+    if nxt[0] == 'LOADN':
+        return 6, [x, ('PUSHI', off), ('ADD', None), nxt]
+    if i + 6 < len(code) and nxt[0] in PUSHES and code[i + 6][0] == 'STOREN':
+        return 7, [x, ('PUSHI', off), ('ADD', None), nxt, code[i + 6]]
+    return None
+
+
+# ---------------------
+# Regras globais
+# ---------------------
+def label_positions(code) -> Dict[str, int]:
+    return {arg: i for i, (op, arg) in enumerate(code) if op == ':'}
+
+
+def first_instr(code, i):
+    while i < len(code) and code[i][0] == ':':
+        i += 1
+    return i
+
+
+def rule_jump_thread(code):
+    # salto para um JUMP  ->  salto direto para o destino final
+    pos = label_positions(code)
+    hits = 0
+    out = list(code)
+    for i, (op, arg) in enumerate(code):
+        if op not in ('JUMP', 'JZ') or arg not in pos:
+            continue
+        target = arg
+        seen = {target}
+        while True:
+            j = first_instr(code, pos[target])
+            if j < len(code) and code[j][0] == 'JUMP' and code[j][1] in pos and code[j][1] not in seen:
+                target = code[j][1]
+                seen.add(target)
+            else:
+                break
+        if target != arg:
+            out[i] = (op, target)
+            hits += 1
+    return out, hits
+
+
+def rule_jump_next(code):
+    # JUMP L seguido (só com rótulos pelo meio) de L:  ->  nada
+    out = []
+    hits = 0
+    for i, ins in enumerate(code):
+        if ins[0] == 'JUMP':
+            j = i + 1
+            labels = set()
+            while j < len(code) and code[j][0] == ':':
+                labels.add(code[j][1])
+                j += 1
+            if ins[1] in labels:
+                hits += 1
+                continue
+        out.append(ins)
+    return out, hits
+
+
+def rule_unreachable(code):
+    # instruções depois de JUMP/STOP/RETURN e antes do próximo rótulo
+    out = []
+    hits = 0
+    dead = False
+    for ins in code:
+        if ins[0] == ':':
+            dead = False
+        elif dead:
+            hits += 1
+            continue
+        out.append(ins)
+        if ins[0] in ('JUMP', 'STOP', 'RETURN'):
+            dead = True
+    return out, hits
+
+
+def rule_dead_labels(code):
+    used = {arg for op, arg in code if op in ('JUMP', 'JZ', 'PUSHA')}
+    out = [ins for ins in code if ins[0] != ':' or ins[1] in used]
+    return out, len(code) - len(out)
+
+
+WINDOW_RULES: Dict[str, Callable] = {
+    'add-zero': rule_add_zero,
+    'neutral': rule_neutral,
+    'const-fold': rule_const_fold,
+    'add-chain': rule_add_chain,
+    'self-assign': rule_self_assign,
+    'const-index': rule_const_index,
+    'index-offset': rule_index_offset,
+    'store-load': rule_store_load,
+}
+
+GLOBAL_RULES: Dict[str, Callable] = {
+    'jump-thread': rule_jump_thread,
+    'jump-next': rule_jump_next,
+    'unreachable': rule_unreachable,
+    'dead-labels': rule_dead_labels,
+}
+
+ALL_RULES = list(WINDOW_RULES) + list(GLOBAL_RULES)
+
+
+class Peephole:
+    def __init__(self, rules: Optional[List[str]] = None, max_rounds=20):
+        rules = ALL_RULES if rules is None else rules
+        unknown = [r for r in rules if r not in WINDOW_RULES and r not in GLOBAL_RULES]
+        if unknown:
+            raise ValueError(f"Regras peephole desconhecidas: {', '.join(unknown)}")
+        self.window = [(r, WINDOW_RULES[r]) for r in rules if r in WINDOW_RULES]
+        self.globals = [(r, GLOBAL_RULES[r]) for r in rules if r in GLOBAL_RULES]
+        self.max_rounds = max_rounds
+        self.hits: Dict[str, int] = {r: 0 for r in rules}
+        self.rounds = 0
+        self.before = 0
+        self.after = 0
+
+    def optimize(self, code: List[Instr]) -> List[Instr]:
+        self.before += len(code)
+        for _ in range(self.max_rounds):
+            self.rounds += 1
+            changed = False
+            for name, rule in self.globals:
+                code, n = rule(code)
+                if n:
+                    self.hits[name] += n
+                    changed = True
+            out = []
+            i = 0
+            while i < len(code):
+                for name, rule in self.window:
+                    m = rule(code, i)
+                    if m is not None:
+                        used, repl = m
+                        self.hits[name] += 1
+                        out.extend(repl)
+                        i += used
+                        changed = True
+                        break
+                else:
+                    out.append(code[i])
+                    i += 1
+            code = out
+            if not changed:
+                break
+        self.after += len(code)
+        return code
+
+    def report(self) -> str:
+        lines = [f"peephole: {self.before} -> {self.after} instrucoes ({self.rounds} rondas)"]
+        for name, n in self.hits.items():
+            if n:
+                lines.append(f"  {name}: {n}")
+        return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    # uso: python peephole_ewvm.py programa.ewvm  (código otimizado no stdout, estatísticas no stderr)
+    if len(sys.argv) != 2:
+        print("uso: python peephole_ewvm.py programa.ewvm", file=sys.stderr)
+        sys.exit(2)
+    with open(sys.argv[1], encoding='utf-8') as f:
+        code = [parse_instr(l) for l in f.read().splitlines() if l.strip()]
+    opt = Peephole()
+    print("\n".join(format_instr(ins) for ins in opt.optimize(code)))
+    print(opt.report(), file=sys.stderr)
@@ -0,0 +1,129 @@
+import hashlib
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+
+import ply
+import ply.lex as lex
+import ply.yacc as yacc
+
+# Cache das tabelas do PLY (lextab.py / parsetab.pickle) numa diretoria própria.
+#
+# O nome de cada ficheiro inclui um hash da gramática (regras, docstrings,
+# precedências, tokens) e da versão do PLY, por isso:
+#   - se o ficheiro existe é carregado diretamente, sem validar a gramática
+#     nem reconstruir a expressão regular mestre do lexer;
+#   - se a gramática mudou o nome muda e as tabelas são regeneradas uma vez.
+# Não se escreve o parser.out de depuração.
+#
+# A diretoria é PLC_CACHE_DIR, ou __plycache__ ao lado deste ficheiro.
+
+CACHE_DIR = os.environ.get('PLC_CACHE_DIR') or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '__plycache__')
+
+
+def _digest(parts):
+    h = hashlib.sha256()
+    h.update(ply.__version__.encode())
+    for part in parts:
+        h.update(b'\0')
+        h.update(repr(part).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def _doc(obj):
+    # a indentação das docstrings varia entre versões do Python
+    return ' '.join((obj.__doc__ or '').split())
+
+
+def _rules(module, prefix):
+    out = []
+    for name in sorted(vars(module)):
+        if not name.startswith(prefix):
+            continue
+        value = getattr(module, name)
+        out.append((name, _doc(value) if callable(value) else value))
+    return out
+
+
+def lexer_key(module, reflags):
+    return _digest([getattr(module, 'tokens', ()), getattr(module, 'literals', ''),
+                    getattr(module, 'states', ()), reflags, _rules(module, 't_')])
+
+
+def parser_key(module):
+    return _digest([getattr(module, 'tokens', ()), getattr(module, 'precedence', ()),
+                    getattr(module, 'start', None), _rules(module, 'p_')])
+
+
+def _load(name):
+    path = os.path.join(CACHE_DIR, name)
+    if not os.path.exists(path):
+        return None
+    spec = importlib.util.spec_from_file_location(name[:-3], path)
+    tab = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(tab)
+    except Exception:
+        return None
+    return tab
+
+
+def _publish(name, write):
+    # escreve numa diretoria temporária e move: vários processos podem estar
+    # a gerar as mesmas tabelas ao mesmo tempo
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=CACHE_DIR)
+    except OSError:
+        return
+    try:
+        write(tmp)
+        os.replace(os.path.join(tmp, name), os.path.join(CACHE_DIR, name))
+    except OSError:
+        pass
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    prefix = name.split('_')[0] + '_'
+    for old in os.listdir(CACHE_DIR):
+        if old.startswith(prefix) and old != name:
+            try:
+                os.remove(os.path.join(CACHE_DIR, old))
+            except OSError:
+                pass
+
+
+def build_lexer(module, reflags=int(lex.re.VERBOSE)):
+    name = 'lextab_' + lexer_key(module, reflags)
+    tab = _load(name + '.py')
+    if tab is not None:
+        try:
+            return lex.lex(module=module, optimize=1, lextab=tab, reflags=reflags)
+        except ImportError:
+            pass
+    lexer = lex.lex(module=module, reflags=reflags)
+    _publish(name + '.py', lambda d: lexer.writetab(name, d))
+    return lexer
+
+
+def build_parser(module):
+    # as tabelas LALR vão em pickle: carregar um módulo com 30 KB de literais
+    # obriga a compilá-lo sempre que não há .pyc (PYTHONDONTWRITEBYTECODE)
+    name = 'parsetab_' + parser_key(module) + '.pickle'
+    path = os.path.join(CACHE_DIR, name)
+    if os.path.exists(path):
+        try:
+            return yacc.yacc(module=module, picklefile=path, optimize=True, debug=False)
+        except Exception:
+            pass
+    holder = {}
+
+    def write(d):
+        holder['parser'] = yacc.yacc(module=module, picklefile=os.path.join(d, name), debug=False)
+    _publish(name, write)
+    if 'parser' not in holder:
+        # sem diretoria de cache utilizável: gera só em memória
+        holder['parser'] = yacc.yacc(module=module, debug=False, write_tables=False)
+    return holder['parser']
@@ -0,0 +1,314 @@
+from typing import Dict, List, Optional
+from ast1 import *
+
+# Análise semântica: percorre a árvore uma única vez e anota
+#   - cada expressão com o tipo resolvido (expr.etype): 'INTEGER', 'REAL',
+#     'BOOLEAN', 'CHAR', 'STRING', o ArrayType de um array inteiro, ou None;
+#   - cada VarAccess / Call com o símbolo a que se refere (node.sym).
+# O gerador de código passa a ler estes campos em vez de recalcular tipos.
+#
+# Em tempo de execução um CHAR é o código do carácter (como CHARAT devolve);
+# um literal de um carácter usado onde se espera uma STRING é anotado como
+# STRING para continuar a ser emitido com PUSHS.
+
+SCALARS = ('INTEGER', 'REAL', 'BOOLEAN', 'CHAR', 'STRING')
+RELATIONAL = ('=', '<>', '<', '<=', '>', '>=')
+
+
+class Symbol:
+    def __init__(self, name, kind, type_node=None, etype=None, byref=False,
+                 level=0, params=None, decl=None):
+        self.name = name
+        self.kind = kind            # 'var', 'param', 'const', 'func', 'proc', 'builtin'
+        self.type = type_node       # nó de tipo declarado (Type / ArrayType / ...)
+        self.etype = etype          # tipo resolvido
+        self.byref = byref
+        self.level = level          # profundidade do bloco onde foi declarado
+        self.params = params        # lista de (nome, etype, byref) para subprogramas
+        self.decl = decl            # Proc / Func declarado (subprogramas)
+
+
+class Scope:
+    def __init__(self, parent=None, level=0):
+        self.parent = parent
+        self.level = level
+        self.symbols: Dict[str, Symbol] = {}
+
+    def lookup(self, name) -> Optional[Symbol]:
+        key = name.upper()
+        s = self
+        while s is not None:
+            sym = s.symbols.get(key)
+            if sym is not None:
+                return sym
+            s = s.parent
+        return None
+
+
+def resolve_type(tnode):
+    if isinstance(tnode, Type):
+        name = tnode.name.upper()
+        return name if name in SCALARS else None
+    if isinstance(tnode, SubrangeType):
+        low = tnode.low.value if isinstance(tnode.low, Literal) else None
+        return 'CHAR' if isinstance(low, str) else 'INTEGER'
+    if isinstance(tnode, EnumeratedType):
+        return 'INTEGER'
+    if isinstance(tnode, ArrayType):
+        return tnode
+    return None
+
+
+def literal_type(value):
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'REAL'
+    if isinstance(value, str):
+        if value.upper() in ('TRUE', 'FALSE'):
+            return 'BOOLEAN'  # o parser guarda TRUE/FALSE como texto
+        return 'CHAR' if len(value) == 1 else 'STRING'
+    return None
+
+
+BUILTINS = {
+    'LENGTH': Symbol('length', 'builtin', etype='INTEGER', params=[('s', 'STRING', False)]),
+}
+
+
+class SemanticAnalyzer:
+    def __init__(self):
+        self.errors: List[str] = []
+        self.scope: Optional[Scope] = None
+
+    def error(self, msg, node=None):
+        line = getattr(node, 'line', None)
+        self.errors.append(f"Linha {line}: {msg}" if line else msg)
+
+    # ---------------------
+    # Programa e blocos
+    # ---------------------
+    def analyze_program(self, program: Program):
+        builtins = Scope()
+        builtins.symbols.update(BUILTINS)
+        self.scope = Scope(builtins, 1)
+        self.analyze_block(program.block)
+        program.analyzed = True
+        return program
+
+    def declare(self, sym: Symbol, node=None):
+        key = sym.name.upper()
+        if key in self.scope.symbols:
+            self.error(f"Identificador repetido: {sym.name}", node)
+        self.scope.symbols[key] = sym
+
+    def analyze_block(self, block: Block):
+        level = self.scope.level
+        for c in block.consts:
+            value = c.value
+            if isinstance(value, VarAccess):
+                self.expr(value)
+                etype = value.etype
+            else:
+                etype = literal_type(value.value)
+            self.declare(Symbol(c.name, 'const', etype=etype, level=level), c)
+        for vdecl in block.vars:
+            etype = resolve_type(vdecl.type)
+            for name in vdecl.names:
+                self.declare(Symbol(name, 'var', vdecl.type, etype, level=level))
+        # os subprogramas ficam visíveis antes dos corpos (chamadas entre eles)
+        for decl in block.procsfuncs:
+            params = [(n, resolve_type(p.type), p.byref) for p in decl.params for n in p.names]
+            if isinstance(decl, Func):
+                sym = Symbol(decl.name, 'func', decl.rettype, resolve_type(decl.rettype),
+                             level=level, params=params, decl=decl)
+            else:
+                sym = Symbol(decl.name, 'proc', level=level, params=params, decl=decl)
+            decl.sym = sym
+            self.declare(sym, decl)
+        for decl in block.procsfuncs:
+            self.analyze_subprogram(decl)
+        self.stmt(block.compound)
+
+    def analyze_subprogram(self, decl):
+        outer = self.scope
+        self.scope = Scope(outer, outer.level + 1)
+        for p in decl.params:
+            for name in p.names:
+                self.declare(Symbol(name, 'param', p.type, resolve_type(p.type),
+                                    byref=p.byref, level=self.scope.level))
+        self.analyze_block(decl.block)
+        self.scope = outer
+
+    # ---------------------
+    # Statements
+    # ---------------------
+    def stmt(self, stmt):
+        if stmt is None:
+            return
+        if isinstance(stmt, CompoundStatement):
+            for s in stmt.statements:
+                self.stmt(s)
+        elif isinstance(stmt, Assign):
+            ttype = self.lvalue(stmt.target)
+            self.expr(stmt.expr)
+            self.coerce(stmt.expr, ttype)
+        elif isinstance(stmt, If):
+            self.expr(stmt.cond)
+            self.stmt(stmt.thenstmt)
+            self.stmt(stmt.elsestmt)
+        elif isinstance(stmt, While):
+            self.expr(stmt.cond)
+            self.stmt(stmt.body)
+        elif isinstance(stmt, For):
+            sym = self.scope.lookup(stmt.var)
+            if sym is None or sym.kind not in ('var', 'param'):
+                self.error(f"Variável de controlo não declarada: {stmt.var}", stmt)
+            elif sym.etype not in ('INTEGER', 'CHAR'):
+                self.error(f"Variável de controlo não ordinal: {stmt.var}", stmt)
+            self.expr(stmt.start)
+            self.expr(stmt.end)
+            self.stmt(stmt.body)
+        elif isinstance(stmt, Read):
+            for v in stmt.vars:
+                self.lvalue(v)
+        elif isinstance(stmt, Write):
+            for wp in stmt.params:
+                for e in (wp if isinstance(wp, tuple) else (wp,)):
+                    self.expr(e)
+        elif isinstance(stmt, Call):
+            self.call(stmt, statement=True)
+        else:
+            self.error(f"Statement não suportado: {type(stmt).__name__}", stmt)
+
+    def lvalue(self, target: VarAccess):
+        sym = self.scope.lookup(target.name)
+        if sym is not None and sym.kind == 'func':
+            # atribuição ao resultado da função
+            target.sym = sym
+            target.etype = sym.etype
+            return sym.etype
+        if sym is not None and sym.kind not in ('var', 'param'):
+            self.error(f"Não é possível atribuir a '{target.name}'", target)
+        return self.expr(target)
+
+    def coerce(self, expr, expected):
+        # literal de um carácter onde se espera uma string
+        if expected == 'STRING' and isinstance(expr, Literal) and expr.etype == 'CHAR':
+            expr.etype = 'STRING'
+
+    # ---------------------
+    # Expressões
+    # ---------------------
+    def expr(self, expr):
+        if isinstance(expr, Literal):
+            expr.etype = literal_type(expr.value)
+        elif isinstance(expr, VarAccess):
+            expr.etype = self.var_access(expr)
+        elif isinstance(expr, BinOp):
+            expr.etype = self.binop(expr)
+        elif isinstance(expr, UnOp):
+            t = self.expr(expr.expr)
+            expr.etype = 'BOOLEAN' if expr.op.upper() == 'NOT' and t == 'BOOLEAN' else t
+        elif isinstance(expr, Call):
+            expr.etype = self.call(expr)
+        else:
+            self.error(f"Expressão não suportada: {type(expr).__name__}", expr)
+            return None
+        return expr.etype
+
+    def var_access(self, expr: VarAccess):
+        sym = self.scope.lookup(expr.name)
+        expr.sym = sym
+        if sym is None:
+            self.error(f"Identificador não declarado: {expr.name}", expr)
+            for lst in expr.suffixes:
+                for e in lst:
+                    self.expr(e)
+            return None
+        indices = [e for lst in expr.suffixes for e in lst]
+        for e in indices:
+            self.expr(e)
+        if sym.kind in ('proc', 'builtin'):
+            self.error(f"'{expr.name}' não é uma variável", expr)
+            return None
+        if not indices:
+            if sym.kind == 'func' and sym.params:
+                # sem parâmetros, o nome de uma função é uma chamada
+                self.error(f"'{expr.name}' espera {len(sym.params)} argumento(s), recebeu 0", expr)
+            return sym.etype
+        if isinstance(sym.etype, ArrayType):
+            if len(indices) != len(sym.etype.ordinals):
+                self.error(f"Número de índices errado em '{expr.name}'", expr)
+                return None
+            return resolve_type(sym.etype.elemtype)
+        if sym.etype == 'STRING' and len(indices) == 1:
+            return 'CHAR'
+        self.error(f"'{expr.name}' não é um array", expr)
+        return None
+
+    def binop(self, expr: BinOp):
+        lt = self.expr(expr.left)
+        rt = self.expr(expr.right)
+        op = expr.op.upper()
+        if lt == 'STRING' or rt == 'STRING':
+            self.coerce(expr.left, 'STRING')
+            self.coerce(expr.right, 'STRING')
+        if op in RELATIONAL:
+            return 'BOOLEAN'
+        if op in ('AND', 'OR'):
+            return 'BOOLEAN' if lt == rt == 'BOOLEAN' else 'INTEGER'
+        if op == '/':
+            return 'REAL'
+        if op in ('DIV', 'MOD'):
+            return 'INTEGER'
+        if lt == 'REAL' or rt == 'REAL':
+            return 'REAL'
+        if op == '+' and lt in ('STRING', 'CHAR') and rt in ('STRING', 'CHAR'):
+            return 'STRING'
+        return 'INTEGER'
+
+    def call(self, call: Call, statement=False):
+        sym = self.scope.lookup(call.name)
+        call.sym = sym
+        for a in call.args:
+            self.expr(a)
+        if sym is None or sym.kind not in ('func', 'proc', 'builtin'):
+            self.error(f"Subprograma não declarado: {call.name}", call)
+            return None
+        if not statement and sym.kind == 'proc':
+            self.error(f"Procedimento '{call.name}' usado numa expressão", call)
+        if sym.params is not None:
+            if len(call.args) != len(sym.params):
+                self.error(f"'{call.name}' espera {len(sym.params)} argumento(s), recebeu {len(call.args)}",
+                           call)
+            for k, (a, (_, ptype, byref)) in enumerate(zip(call.args, sym.params), 1):
+                self.coerce(a, ptype)
+                if byref and not self.is_variable(a):
+                    self.error(f"Argumento {k} de '{call.name}' tem de ser uma variável (parâmetro var)",
+                               a if getattr(a, 'line', None) else call)
+        return sym.etype
+
+    @staticmethod
+    def is_variable(expr) -> bool:
+        # o que pode ser passado a um parâmetro var: uma variável ou um
+        # elemento de array (não um carácter de uma string)
+        sym = getattr(expr, 'sym', None)
+        if not isinstance(expr, VarAccess) or sym is None or sym.kind not in ('var', 'param'):
+            return False
+        return not expr.suffixes or isinstance(sym.etype, ArrayType)
+
+
+class SemanticError(Exception):
+    def __init__(self, errors):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+# função de interface
+def analyze(ast_root: Program) -> List[str]:
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze_program(ast_root)
+    return analyzer.errors
@@ -0,0 +1,6 @@
+import os
+import sys
+
+FINAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if FINAL not in sys.path:
+    sys.path.insert(0, FINAL)
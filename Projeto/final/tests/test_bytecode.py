@@ -0,0 +1,41 @@
+import os
+import struct
+
+import pytest
+
+import bytecode_ewvm
+from compilador import compile, CompileOptions
+from vm_ewvm import VM, VMError, assemble
+from utils import FINAL
+
+
+def source():
+    with open(os.path.join(FINAL, 'bench', 'programas', 'recursao.pas'), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('optimize', [False, True])
+def test_binario_igual_ao_texto(optimize):
+    text = compile(source(), options=CompileOptions(optimize=optimize)).code
+    data = compile(source(), options=CompileOptions(optimize=optimize, binary=True)).code
+    program = bytecode_ewvm.decode(data)
+    expected = assemble(text)
+    assert program.code == expected.code
+    assert program.labels == expected.labels
+    assert bytecode_ewvm.to_text(program) == text
+    written = []
+    VM(program, output_fn=written.append).run()
+    assert ''.join(written) == "14985000 59998 1350\n"
+
+
+def test_little_endian():
+    data = bytecode_ewvm.encode("START\nPUSHI 258\nSTOP")
+    off = bytecode_ewvm.HEADER.size
+    assert data[off + 16:off + 32] == struct.pack('<qq', 4, 258)
+
+
+def test_truncado():
+    data = compile(source(), options=CompileOptions(binary=True)).code
+    for n in (3, bytecode_ewvm.HEADER.size + 5, len(data) - 1):
+        with pytest.raises(VMError):
+            bytecode_ewvm.decode(data[:n])
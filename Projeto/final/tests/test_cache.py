@@ -0,0 +1,68 @@
+import ast
+import os
+
+import compilador_lote
+from cache_compilacao import COMPILER_MODULES, CompileCache, LOW_WATER
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def local_imports(name):
+    with open(os.path.join(HERE, name + '.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        for n in names:
+            n = n.split('.')[0]
+            if os.path.exists(os.path.join(HERE, n + '.py')):
+                yield n
+
+
+def test_impressao_digital_cobre_os_modulos_importados():
+    # a própria cache não muda o código gerado (tem CACHE_FORMAT)
+    seen, todo = set(), ['compilador']
+    while todo:
+        name = todo.pop()
+        if name in seen or name == 'cache_compilacao':
+            continue
+        seen.add(name)
+        todo.extend(local_imports(name))
+    assert seen <= set(COMPILER_MODULES), sorted(seen - set(COMPILER_MODULES))
+
+
+def disk_bytes(cache):
+    return sum(e[1] for e in cache.entries())
+
+
+def test_put_so_varre_a_diretoria_quando_passa_do_limite(tmp_path, monkeypatch):
+    cache = CompileCache(str(tmp_path), max_bytes=10_000)
+    scans = []
+    entries = CompileCache.entries
+    monkeypatch.setattr(CompileCache, 'entries', lambda self: scans.append(1) or entries(self))
+    for k in range(200):
+        cache.put(f"program p{k}; begin end.", None, 'x' * 200)
+        assert disk_bytes(cache) <= cache.max_bytes
+    scans_in_puts = len(scans) - 200    # as chamadas de disk_bytes
+    assert cache.evictions > 0
+    # um varrimento inicial e um por remoção (desce até LOW_WATER)
+    assert scans_in_puts <= 1 + 200 * 200 // (cache.max_bytes * (1 - LOW_WATER))
+    assert cache._bytes == disk_bytes(cache)
+
+
+def test_lote_conta_as_remocoes(tmp_path, monkeypatch):
+    files = []
+    for k in range(12):
+        path = tmp_path / f"p{k}.pas"
+        path.write_text(f"program p{k}; begin writeln({k}) end.", encoding='utf-8')
+        files.append(str(path))
+    cache_dir = str(tmp_path / 'cache')
+    monkeypatch.setitem(compilador_lote._caches, cache_dir, CompileCache(cache_dir, max_bytes=150))
+    summary = compilador_lote.compile_many(files, workers=1, cache_dir=cache_dir)
+    assert summary['ok'] == 12
+    assert summary['cache_evictions'] > 0
+    assert CompileCache(cache_dir).stats()['evictions'] == summary['cache_evictions']
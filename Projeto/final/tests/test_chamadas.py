@@ -0,0 +1,253 @@
+from utils import assert_same
+
+# convenção de chamada (parâmetros var, encaixe, resultado das funções) e
+# chamadas finais com -O
+
+
+def test_var_e_encaixe():
+    src = """program Nest;
+
+procedure troca(var p, q: integer);
+var t: integer;
+begin
+  t := p; p := q; q := t
+end;
+
+procedure incrementa(var p: integer);
+  procedure mais;
+  begin
+    p := p + 1
+  end;
+begin
+  mais; mais
+end;
+
+function soma(n: integer): integer;
+  procedure junta(k: integer);
+    procedure dentro;
+    begin
+      total := total + k
+    end;
+  begin
+    dentro
+  end;
+var total: integer;
+begin
+  total := 0;
+  while n > 0 do
+  begin
+    junta(n);
+    n := n - 1
+  end;
+  soma := total
+end;
+
+function fact(n: integer): integer;
+begin
+  if n <= 1 then fact := 1 else fact := n * fact(n - 1)
+end;
+
+var a: array[1..5] of integer;
+    x, y, i: integer;
+begin
+  x := 3; y := 7;
+  troca(x, y);
+  writeln(x, ' ', y);
+  for i := 1 to 5 do a[i] := i * 10;
+  troca(a[1], a[5]);
+  incrementa(a[2]);
+  incrementa(x);
+  for i := 1 to 5 do write(a[i], ' ');
+  writeln(x);
+  writeln(soma(10), ' ', fact(6));
+  fact(3)
+end.
+"""
+    assert_same(src, expected="7 3\n50 22 30 40 10 9\n55 720\n")
+
+
+def test_chamada_final_encaixada():
+    # as locais voltam a 0 em cada volta, como numa chamada
+    src = """program TC;
+
+procedure Fora(m: integer);
+  function Conta(n: integer): integer;
+  var c: integer;
+  begin
+    c := c + 1;
+    k := k + c;
+    if n = 0 then Conta := k
+    else Conta := Conta(n - 1)
+  end;
+var k: integer;
+begin
+  k := 0;
+  writeln(Conta(m))
+end;
+
+procedure Troca(var a, b: integer; n: integer);
+var t: integer;
+begin
+  if n > 0 then
+  begin
+    t := a; a := b; b := t;
+    Troca(b, a, n - 1)
+  end
+end;
+
+var x, y: integer;
+begin
+  Fora(5);
+  x := 1; y := 2;
+  Troca(x, y, 3);
+  writeln(x, ' ', y)
+end.
+"""
+    assert_same(src, expected="6\n2 1\n")
+
+
+def test_chamada_final_com_endereco_do_frame():
+    # p(t, ...) passa o endereço de uma local: o frame não pode ser
+    # reaproveitado pelo salto
+    src = """program TV;
+procedure p(var a: integer; n: integer);
+var t: integer;
+begin
+  if n > 0 then
+  begin
+    t := a + n;
+    p(t, n - 1)
+  end
+  else r := a
+end;
+
+procedure q(var a: integer; n: integer);
+begin
+  if n > 0 then
+  begin
+    n := n - 1;
+    q(n, n)
+  end
+  else r := r + a
+end;
+
+var r: integer;
+begin
+  r := 100;
+  p(r, 3);
+  writeln(r);
+  q(r, 2);
+  writeln(r)
+end.
+"""
+    assert_same(src, expected="106\n106\n")
+
+
+def test_funcao_sem_parametros_como_valor():
+    src = """program F;
+function Sete: integer;
+begin
+  g := g + 1;
+  Sete := 7
+end;
+var x, g: integer;
+begin
+  g := 1;
+  x := Sete;
+  writeln(x, ' ', g, ' ', Sete + Sete, ' ', g)
+end.
+"""
+    assert_same(src, expected="7 2 14 4\n")
+
+
+def test_subprogramas_encaixados_com_o_mesmo_nome():
+    # dois Ajuda encaixados em pais diferentes: cada um tem o seu rótulo
+    src = """program Nomes;
+
+procedure A;
+  procedure Ajuda;
+  begin
+    write('a ')
+  end;
+begin
+  Ajuda
+end;
+
+procedure B;
+  procedure Ajuda;
+  begin
+    write('b ')
+  end;
+begin
+  Ajuda;
+  Ajuda
+end;
+
+begin
+  A;
+  B;
+  writeln
+end.
+"""
+    assert_same(src, expected="a b b \n")
+
+
+def test_encaixado_esconde_outro():
+    # os Ajuda encaixados escondem o de topo, com outro nível e outros
+    # parâmetros var: a chamada segue o símbolo, não o nome
+    src = """program Nomes;
+
+procedure Ajuda(n: integer);
+begin
+  write('topo ', n, ' ')
+end;
+
+procedure A;
+  procedure Ajuda(var n: integer);
+  begin
+    n := n + 1
+  end;
+begin
+  Ajuda(x);
+  write('a ', x, ' ')
+end;
+
+procedure B;
+  procedure Ajuda;
+  begin
+    y := y * 10
+  end;
+var y: integer;
+begin
+  y := 4;
+  Ajuda;
+  write('b ', y, ' ')
+end;
+
+var x: integer;
+begin
+  x := 1;
+  Ajuda(x);
+  A;
+  B;
+  Ajuda(x);
+  writeln
+end.
+"""
+    assert_same(src, expected="topo 1 a 2 b 40 topo 2 \n")
+
+
+def test_chamada_final_repoe_o_resultado():
+    # no caso base F não é atribuída: devolve o 0 com que a chamada começa,
+    # também quando -O troca a chamada por um salto
+    src = """program R;
+function F(n: integer): integer;
+begin
+  if n = 5 then F := 42;
+  if n > 0 then F := F(n - 1)
+end;
+begin
+  writeln(F(5))
+end.
+"""
+    assert_same(src, expected="0\n")
@@ -0,0 +1,71 @@
+import sys
+import threading
+
+import pytest
+
+import compilador
+from compilador import compile, CompileOptions
+from compilador_incremental import IncrementalCompiler
+from estatisticas import CompileStats
+from utils import run
+
+
+def deep_source(n):
+    return "program p; var x: integer; begin x := " + "+".join(["1"] * n) + "; writeln(x) end."
+
+
+def test_expressao_profunda():
+    stats = CompileStats()
+    limit = sys.getrecursionlimit()
+    result = compile(deep_source(5000), stats=stats)
+    assert result.ok and stats.counters.get('deep_stack')
+    assert sys.getrecursionlimit() == limit
+    assert run(deep_source(5000)) == "5000\n"
+
+
+def test_pilha_grande_uma_compilacao_de_cada_vez(monkeypatch):
+    limit = sys.getrecursionlimit()
+    compile_ = compilador._compile
+    active, seen = [0], []
+
+    def counting(*args):
+        active[0] += 1
+        seen.append((active[0], sys.getrecursionlimit()))
+        try:
+            return compile_(*args)
+        finally:
+            active[0] -= 1
+
+    monkeypatch.setattr(compilador, '_compile', counting)
+    monkeypatch.setattr(compilador, 'DEEP_RECURSION', 20_000)
+    out = {}
+
+    def work(n):
+        out[n] = compilador._compile_deep(deep_source(n), CompileOptions()).ok
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in (3000, 3001, 9000, 9001)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(out.values()) and len(out) == 4
+    assert all(n == 1 for n, _ in seen)
+    # 4 * len(source) passaria de DEEP_RECURSION em todos
+    assert {lim for _, lim in seen} == {20_000}
+    assert sys.getrecursionlimit() == limit
+
+
+NAO_SUPORTADOS = [
+    "program a; var n: integer; v: array[1..n] of integer; begin v[1] := 1 end.",
+    "program a; var v: array[boolean] of integer; begin end.",
+]
+
+
+@pytest.mark.parametrize('source', NAO_SUPORTADOS)
+def test_erro_do_gerador_e_um_diagnostico(source):
+    for options in (CompileOptions(), CompileOptions(optimize=True)):
+        result = compile(source, options=options)
+        assert not result.ok
+        assert result.diagnostics[0].startswith('Erro na geração de código:')
+    result = IncrementalCompiler(source).compile()
+    assert not result.ok and result.diagnostics[0].startswith('Erro na geração de código:')
@@ -0,0 +1,31 @@
+from utils import assert_same
+
+# Pascal não distingue maiúsculas de minúsculas nos identificadores
+
+
+def test_global_com_outras_maiusculas():
+    src = """program A;
+var Soma, I: integer;
+begin
+  Soma := 0;
+  for I := 1 to 3 do soma := SOMA + i;
+  writeln(soma)
+end.
+"""
+    assert_same(src, expected="6\n")
+
+
+def test_local_e_parametro_com_outras_maiusculas():
+    src = """program B;
+function Total(N: integer): integer;
+var Tot, k: integer;
+begin
+  Tot := 0;
+  for K := 1 to n do tot := TOT + k;
+  total := tot
+end;
+begin
+  writeln(Total(4))
+end.
+"""
+    assert_same(src, expected="10\n")
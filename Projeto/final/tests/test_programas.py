@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from utils import FINAL, assert_same
+
+PROGRAMAS = os.path.join(FINAL, 'bench', 'programas')
+
+# exemplos do enunciado (exN.txt) e dos testes do gerador, com a entrada
+EXEMPLOS = {
+    'ex1.txt': ((), "Ola, Mundo!\n"),
+    'ex2.txt': (('5',), "Introduza um numero inteiro positivo:\nFatorial de 5: 120\n"),
+    'ex3.txt': (('17',), "Introduza um numero inteiro positivo:\n17 e um numero primo\n"),
+    'ex4.txt': (('1', '2', '3', '4', '5'),
+                "Introduza 5 numeros inteiros:\nA soma dos numeros e: 15\n"),
+    'ex5.txt': (('1011',), "Introduza uma string binaria:\n"
+                           "O valor inteiro correspondente e: 11\n"),
+    'in_downto.txt': ((), "3\n2\n1\n"),
+}
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('name', sorted(EXEMPLOS))
+def test_exemplos(name):
+    lines, expected = EXEMPLOS[name]
+    assert_same(read(os.path.join(FINAL, name)), lines, expected)
+
+
+def test_precedencia():
+    # real: só se compara entre modos
+    assert_same(read(os.path.join(FINAL, 'in_precedence.txt')))
+
+
+@pytest.mark.parametrize('name', sorted(f[:-4] for f in os.listdir(PROGRAMAS)
+                                        if f.endswith('.pas')))
+def test_programas_bench(name):
+    base = os.path.join(PROGRAMAS, name)
+    lines = read(base + '.in').splitlines() if os.path.exists(base + '.in') else ()
+    expected = read(base + '.out') if os.path.exists(base + '.out') else None
+    assert_same(read(base + '.pas'), lines, expected)
+
+
+def test_limite_do_for_partilhado():
+    # n só aparece como limite do for: não pode partilhar o slot de t
+    src = """program Limite;
+procedure p;
+var n, i, t: integer;
+begin
+  n := 3;
+  for i := 1 to n do begin t := i * 100; write(t, ' ') end
+end;
+begin
+  p;
+  writeln
+end.
+"""
+    assert_same(src, expected="100 200 300 \n")
@@ -0,0 +1,100 @@
+from utils import assert_same
+
+# propagação de constantes (optimize_ast) com parâmetros var: escrever no
+# parâmetro muda a variável passada
+
+
+def test_while_com_var():
+    src = """program A;
+procedure q(var p: integer);
+begin
+  g := 0;
+  while g < 3 do p := p + 1;
+  writeln(g)
+end;
+var g: integer;
+begin
+  q(g)
+end.
+"""
+    assert_same(src, expected="3\n")
+
+
+def test_read_com_var():
+    src = """program B;
+procedure q(var p: integer);
+begin
+  g := 1;
+  readln(p);
+  writeln(g)
+end;
+var g: integer;
+begin
+  q(g)
+end.
+"""
+    assert_same(src, ('7',), expected="7\n")
+
+
+def test_for_com_var():
+    src = """program C;
+procedure q(var p: integer);
+var k: integer;
+begin
+  g := 5;
+  for k := 1 to 3 do p := k;
+  writeln(g)
+end;
+var g: integer;
+begin
+  q(g)
+end.
+"""
+    assert_same(src, expected="3\n")
+
+
+
+def test_limite_do_for_com_var():
+    # o limite do For é avaliado uma só vez, mesmo que o corpo o altere
+    # através de um parâmetro var
+    src = """program D;
+procedure q(var p: integer);
+var k, n: integer;
+begin
+  g := 3;
+  n := 0;
+  for k := 1 to g do
+  begin
+    p := p + 1;
+    n := n + 1
+  end;
+  writeln(n, ' ', g)
+end;
+var g: integer;
+begin
+  q(g)
+end.
+"""
+    assert_same(src, expected="3 6\n")
+
+
+def test_limite_do_for_e_parametro_var():
+    src = """program E;
+procedure q(var p: integer);
+var k, n: integer;
+begin
+  n := 0;
+  for k := 1 to p do
+  begin
+    g := g + 1;
+    n := n + 1
+  end;
+  writeln(n, ' ', g)
+end;
+var g: integer;
+begin
+  g := 3;
+  q(g)
+end.
+"""
+    assert_same(src, expected="3 6\n")
@@ -0,0 +1,34 @@
+import pytest
+
+from compilador import compile
+from utils import run
+
+DECLS = """program V;
+const k = 3;
+procedure inc(var n: integer);
+begin
+  n := n + 1
+end;
+function um: integer;
+begin
+  um := 1
+end;
+var x: integer;
+    s: string;
+    a: array[1..2] of integer;
+begin
+  %s
+end.
+"""
+
+
+@pytest.mark.parametrize('call', ['inc(3)', 'inc(x + 1)', 'inc(k)', 'inc(um)', 'inc(s[1])'])
+def test_argumento_var_tem_de_ser_variavel(call):
+    result = compile(DECLS % call)
+    assert not result.ok
+    assert any(d.startswith('Erro semântico') and 'parâmetro var' in d
+               for d in result.diagnostics), result.diagnostics
+
+
+def test_argumento_var_variavel_ou_elemento():
+    assert run(DECLS % "x := 1; a[2] := 5; inc(x); inc(a[2]); writeln(x, ' ', a[2])") == "2 6\n"
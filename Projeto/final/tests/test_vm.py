@@ -0,0 +1,54 @@
+import pytest
+
+from vm_ewvm import run_ewvm, VMError
+from utils import run
+
+
+def output(source):
+    written = []
+    run_ewvm(source, output_fn=written.append)
+    return ''.join(written)
+
+
+def test_globais_reservadas_antes_de_start():
+    assert output("PUSHN 2\nSTART\nPUSHI 7\nSTOREG 1\nPUSHG 1\nWRITEI\nSTOP") == "7"
+
+
+@pytest.mark.parametrize('source', [
+    "START\nPUSHI 7\nSTOREG 0\nSTOP",
+    "PUSHN 1\nSTART\nPUSHG 1\nSTOP",
+    "PUSHN 1\nSTART\nPUSHG -1\nSTOP",
+    "PUSHN 2\nSTART\nPUSHGP\nPUSHI 2\nLOADN\nSTOP",
+])
+def test_global_nao_reservada(source):
+    with pytest.raises(VMError):
+        run_ewvm(source)
+
+
+def test_programa_reserva_as_suas_globais():
+    source = """program p;
+    var a: array[1..3] of integer; i, s: integer;
+    begin
+      s := 0;
+      for i := 1 to 3 do a[i] := i * i;
+      for i := 1 to 3 do s := s + a[i];
+      writeln(s)
+    end."""
+    assert run(source) == "14\n"
+
+
+def test_max_steps_conta_todas_as_instrucoes():
+    source = "START\nPUSHI 1\nWRITEI\nSTOP"
+    assert run_ewvm(source, output_fn=lambda s: None, max_steps=4).steps == 4
+    with pytest.raises(VMError):
+        run_ewvm(source, output_fn=lambda s: None, max_steps=3)
+
+
+@pytest.mark.parametrize('source', [
+    # com fp = 0, st[-2] seria um valor do topo da pilha
+    "START\nPUSHI 1\nPUSHI 2\nPUSHL -2\nSTOP",
+    "START\nPUSHI 1\nPUSHI 2\nPUSHI 3\nSTOREL -2\nSTOP",
+])
+def test_local_abaixo_da_pilha(source):
+    with pytest.raises(VMError):
+        run_ewvm(source)
@@ -0,0 +1,39 @@
+import os
+
+from compilador import compile, CompileOptions
+from vm_ewvm import run_ewvm
+
+FINAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# O0, -O, --checks e os dois juntos: a saída do programa tem de ser a mesma
+MODES = {
+    'O0': CompileOptions(),
+    'O1': CompileOptions(optimize=True),
+    'checks': CompileOptions(checks=True),
+    'O1-checks': CompileOptions(optimize=True, checks=True),
+}
+
+
+def run(source, lines=(), options=None, max_steps=10_000_000):
+    """Compila source e executa-o na VM local; devolve o que escreveu."""
+    result = compile(source, options=options or CompileOptions())
+    assert result.ok, result.diagnostics
+    feed = iter(lines)
+    written = []
+    run_ewvm(result.code, input_fn=lambda: next(feed, ''), output_fn=written.append,
+             max_steps=max_steps)
+    return ''.join(written)
+
+
+def outputs(source, lines=()):
+    """Saída do programa em cada um dos MODES."""
+    return {mode: run(source, lines, options) for mode, options in MODES.items()}
+
+
+def assert_same(source, lines=(), expected=None):
+    out = outputs(source, lines)
+    if expected is None:
+        expected = out['O0']
+    for mode, text in out.items():
+        assert text == expected, f"{mode}: {text!r} != {expected!r}"
+    return expected
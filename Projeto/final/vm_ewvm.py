@@ -0,0 +1,551 @@
+import sys
+import time
+from typing import List, Dict, Tuple, Optional, Callable
+
+# Interpretador local da EWVM: permite executar (e medir) o código gerado
+# por generate_ewvm() sem recorrer à máquina virtual web.
+#
+# Modelo de memória:
+#   - a pilha é uma lista Python (sp == len(pilha)), fp indexa essa lista;
+#   - gp é um segmento próprio com as células empilhadas antes de START (o
+#     gerador reserva as globais com PUSHN n); aceder a uma global para lá
+#     dessas é um erro, como na EWVM, onde gp é a base da pilha;
+#   - a heap é feita de listas independentes (ALLOC / ALLOCN);
+#   - um endereço é um par (segmento, deslocamento), por isso PADD, LOADN
+#     e STOREN funcionam da mesma forma sobre gp, pilha ou heap;
+#   - as strings são guardadas diretamente como str Python.
+
+# Códigos numéricos das instruções (a ordem é também a do formato binário)
+(NOP, START, STOP, ERR,
+ PUSHI, PUSHN, PUSHF, PUSHS, PUSHG, PUSHL, PUSHSP, PUSHFP, PUSHGP, PUSHA,
+ LOAD, LOADN, STORE, STOREN, STOREL, STOREG,
+ DUP, DUPN, POP, POPN, SWAP, PADD, ALLOC, ALLOCN, FREE,
+ ADD, SUB, MUL, DIV, MOD, NOT, INF, INFEQ, SUP, SUPEQ, EQUAL, AND, OR,
+ FADD, FSUB, FMUL, FDIV, FINF, FINFEQ, FSUP, FSUPEQ,
+ ITOF, FTOI, ATOI, ATOF, STRI, STRF, CONCAT, STRLEN, CHARAT, CHRCODE,
+ JUMP, JZ, CALL, RETURN, CHECK,
+ WRITEI, WRITEF, WRITES, WRITELN, WRITECHR, READ) = range(71)
+
+OPNAMES = (
+    'NOP', 'START', 'STOP', 'ERR',
+    'PUSHI', 'PUSHN', 'PUSHF', 'PUSHS', 'PUSHG', 'PUSHL', 'PUSHSP', 'PUSHFP', 'PUSHGP', 'PUSHA',
+    'LOAD', 'LOADN', 'STORE', 'STOREN', 'STOREL', 'STOREG',
+    'DUP', 'DUPN', 'POP', 'POPN', 'SWAP', 'PADD', 'ALLOC', 'ALLOCN', 'FREE',
+    'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'NOT', 'INF', 'INFEQ', 'SUP', 'SUPEQ', 'EQUAL', 'AND', 'OR',
+    'FADD', 'FSUB', 'FMUL', 'FDIV', 'FINF', 'FINFEQ', 'FSUP', 'FSUPEQ',
+    'ITOF', 'FTOI', 'ATOI', 'ATOF', 'STRI', 'STRF', 'CONCAT', 'STRLEN', 'CHARAT', 'CHRCODE',
+    'JUMP', 'JZ', 'CALL', 'RETURN', 'CHECK',
+    'WRITEI', 'WRITEF', 'WRITES', 'WRITELN', 'WRITECHR', 'READ',
+)
+OPCODES: Dict[str, int] = {name: i for i, name in enumerate(OPNAMES)}
+
+# Tipo do operando de cada instrução:
+#   'i' inteiro, 'f' real, 's' string, 'l' rótulo, 'c' par de inteiros (CHECK)
+ARGKIND: Dict[int, str] = {
+    PUSHI: 'i', PUSHN: 'i', PUSHG: 'i', PUSHL: 'i', LOAD: 'i', STORE: 'i',
+    STOREL: 'i', STOREG: 'i', DUP: 'i', POP: 'i', ALLOC: 'i',
+    PUSHF: 'f',
+    PUSHS: 's', ERR: 's',
+    PUSHA: 'l', JUMP: 'l', JZ: 'l',
+    CHECK: 'c',
+}
+
+
+class VMError(Exception):
+    pass
+
+
+class EWVMProgram:
+    def __init__(self, code: List[Tuple[int, object]], labels: Dict[str, int],
+                 refs: Optional[Dict[int, str]] = None):
+        self.code = code          # lista de (opcode, operando)
+        self.labels = labels      # rótulo -> índice da instrução
+        self.refs = refs or {}    # instrução de salto -> nome do rótulo usado
+
+
+def unquote(s: str) -> str:
+    # inverso do escape feito pelo gerador em PUSHS "..."
+    out = []
+    i = 0
+    while i < len(s):
+        c = s[i]
+        if c == '\\' and i + 1 < len(s) and s[i + 1] in '"\\nt':
+            nxt = s[i + 1]
+            out.append({'n': '\n', 't': '\t'}.get(nxt, nxt))
+            i += 2
+        else:
+            out.append(c)
+            i += 1
+    return ''.join(out)
+
+
+def quote(s: str) -> str:
+    return '"' + s.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\t', '\\t') + '"'
+
+
+def assemble(source) -> EWVMProgram:
+    """Converte texto EWVM (string ou lista de linhas) numa EWVMProgram."""
+    lines = source.splitlines() if isinstance(source, str) else source
+    code: List[Tuple[int, object]] = []
+    labels: Dict[str, int] = {}
+    pending: List[Tuple[int, str, int]] = []  # (índice, rótulo, linha)
+
+    for lineno, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line or line.startswith('//'):
+            continue
+        # rótulo, eventualmente seguido de instrução na mesma linha
+        head = line.split(None, 1)[0]
+        if head.endswith(':'):
+            labels[head[:-1]] = len(code)
+            line = line[len(head):].strip()
+            if not line:
+                continue
+        parts = line.split(None, 1)
+        name = parts[0].upper()
+        op = OPCODES.get(name)
+        if op is None:
+            raise VMError(f"Linha {lineno}: instrução desconhecida '{parts[0]}'")
+        kind = ARGKIND.get(op)
+        if kind is None:
+            if len(parts) > 1:
+                raise VMError(f"Linha {lineno}: {name} não aceita operandos")
+            code.append((op, None))
+            continue
+        if len(parts) < 2:
+            raise VMError(f"Linha {lineno}: {name} precisa de um operando")
+        text = parts[1].strip()
+        try:
+            if kind == 'i':
+                arg = int(text)
+            elif kind == 'f':
+                arg = float(text)
+            elif kind == 's':
+                if len(text) < 2 or text[0] != '"' or text[-1] != '"':
+                    raise ValueError(text)
+                arg = unquote(text[1:-1])
+            elif kind == 'c':
+                a, b = text.split(',')
+                arg = (int(a), int(b))
+            else:
+                arg = None
+                pending.append((len(code), text, lineno))
+        except ValueError:
+            raise VMError(f"Linha {lineno}: operando inválido para {name}: {text}")
+        code.append((op, arg))
+
+    refs: Dict[int, str] = {}
+    for idx, lbl, lineno in pending:
+        if lbl not in labels:
+            raise VMError(f"Linha {lineno}: rótulo não definido '{lbl}'")
+        code[idx] = (code[idx][0], labels[lbl])
+        refs[idx] = lbl
+
+    return EWVMProgram(code, labels, refs)
+
+
+# Instruções como o gerador as emite, antes de haver texto: (NOME, operando)
+# com o operando já no tipo final (int, float, str, nome do rótulo ou o par
+# do CHECK; None sem operando) e (':', nome) para um rótulo.
+Instr = Tuple[str, object]
+
+
+def _quoted(op):
+    def fmt(arg):
+        s = arg.replace('"', '\\"')
+        return f'{op} "{s}"'
+    return fmt
+
+
+# operandos que não se escrevem com str(); os restantes ficam "OP operando"
+_FORMAT = {
+    ':': lambda arg: f"{arg}:",
+    'PUSHS': _quoted('PUSHS'),
+    'ERR': _quoted('ERR'),
+    'CHECK': lambda arg: f"CHECK {arg[0]},{arg[1]}",
+}
+
+
+def format_instr(ins: Instr) -> str:
+    """Linha de texto EWVM de uma instrução."""
+    op, arg = ins
+    if arg is None:
+        return op
+    special = _FORMAT.get(op)
+    return special(arg) if special is not None else f"{op} {arg}"
+
+
+def parse_instr(line: str) -> Instr:
+    """Inverso de format_instr (para ler texto EWVM como instruções)."""
+    line = line.strip()
+    if line.endswith(':') and ' ' not in line:
+        return (':', line[:-1])
+    parts = line.split(None, 1)
+    op = parts[0].upper()
+    if len(parts) < 2:
+        return (op, None)
+    text = parts[1].strip()
+    kind = ARGKIND.get(OPCODES.get(op))
+    try:
+        if kind == 'i':
+            return (op, int(text))
+        if kind == 'f':
+            return (op, float(text))
+        if kind == 's' and len(text) >= 2 and text[0] == text[-1] == '"':
+            return (op, unquote(text[1:-1]))
+        if kind == 'c':
+            a, b = text.split(',')
+            return (op, (int(a), int(b)))
+    except ValueError:
+        raise VMError(f"Operando inválido para {op}: {text}")
+    return (op, text)
+
+
+def assemble_instrs(instrs: List[Instr]) -> EWVMProgram:
+    """Monta as instruções do gerador sem passar por texto."""
+    code: List[Tuple[int, object]] = []
+    labels: Dict[str, int] = {}
+    pending: List[int] = []
+    for op, arg in instrs:
+        if op == ':':
+            labels[arg] = len(code)
+            continue
+        opcode = OPCODES.get(op)
+        if opcode is None:
+            raise VMError(f"Instrução desconhecida '{op}'")
+        if ARGKIND.get(opcode) == 'l':
+            pending.append(len(code))
+        code.append((opcode, arg))
+    refs: Dict[int, str] = {}
+    for idx in pending:
+        opcode, lbl = code[idx]
+        if lbl not in labels:
+            raise VMError(f"Rótulo não definido '{lbl}'")
+        code[idx] = (opcode, labels[lbl])
+        refs[idx] = lbl
+    return EWVMProgram(code, labels, refs)
+
+
+def format_float(x: float) -> str:
+    # a EWVM (JavaScript) escreve 15.0 como "15"
+    if x == int(x) and abs(x) < 1e21:
+        return str(int(x))
+    return repr(x)
+
+
+def _trunc_div(a, b):
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+class VM:
+    def __init__(self, program: EWVMProgram,
+                 input_fn: Optional[Callable[[], str]] = None,
+                 output_fn: Optional[Callable[[str], None]] = None,
+                 max_steps: Optional[int] = None):
+        self.program = program
+        # gmem[-1] não falharia no ciclo: uma global negativa nunca está reservada
+        for pc, (op, arg) in enumerate(program.code):
+            if op in (PUSHG, STOREG) and arg < 0:
+                raise VMError(f"Global {arg} não reservada (pc={pc})")
+        self.input_fn = input_fn or (lambda: sys.stdin.readline().rstrip('\n'))
+        self.output_fn = output_fn or sys.stdout.write
+        self.max_steps = max_steps
+
+        self.stack: List = []
+        self.gmem: List = []
+        self.callstack: List[Tuple[int, int]] = []
+        self.fp = 0
+        self.pc = 0
+
+        self.steps = 0      # instruções executadas
+        self.elapsed = 0.0  # tempo de parede da última execução (s)
+        self.max_depth = 0  # profundidade máxima da pilha de chamadas
+
+    def run(self):
+        code = self.program.code
+        st = self.stack
+        gmem = self.gmem
+        calls = self.callstack
+        push = st.append
+        pop = st.pop
+        write = self.output_fn
+        read = self.input_fn
+        limit = self.max_steps if self.max_steps is not None else sys.maxsize
+
+        fp = self.fp
+        pc = self.pc
+        steps = 0
+        depth = self.max_depth
+        ncode = len(code)
+        t0 = time.perf_counter()
+
+        try:
+            while True:
+                if pc >= ncode:
+                    raise VMError("Execução terminou sem STOP")
+                op, arg = code[pc]
+                pc += 1
+                steps += 1
+                if steps > limit:
+                    raise VMError(f"Limite de {limit} instruções atingido")
+
+                if op == PUSHG:
+                    try:
+                        push(gmem[arg])
+                    except IndexError:
+                        raise VMError(f"Global {arg} não reservada (pc={pc - 1})")
+                elif op == PUSHI:
+                    push(arg)
+                elif op == STOREG:
+                    v = pop()
+                    try:
+                        gmem[arg] = v
+                    except IndexError:
+                        raise VMError(f"Global {arg} não reservada (pc={pc - 1})")
+                elif op == PUSHL:
+                    i = fp + arg
+                    if i < 0:   # st[-1] não falharia
+                        raise VMError(f"Acesso fora da pilha (pc={pc - 1})")
+                    push(st[i])
+                elif op == STOREL:
+                    v = pop()
+                    i = fp + arg
+                    if i < 0:
+                        raise VMError(f"Acesso fora da pilha (pc={pc - 1})")
+                    st[i] = v
+                elif op == ADD:
+                    b = pop(); st[-1] += b
+                elif op == SUB:
+                    b = pop(); st[-1] -= b
+                elif op == MUL:
+                    b = pop(); st[-1] *= b
+                elif op == JZ:
+                    if pop() == 0:
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == INFEQ:
+                    b = pop(); st[-1] = 1 if st[-1] <= b else 0
+                elif op == INF:
+                    b = pop(); st[-1] = 1 if st[-1] < b else 0
+                elif op == SUPEQ:
+                    b = pop(); st[-1] = 1 if st[-1] >= b else 0
+                elif op == SUP:
+                    b = pop(); st[-1] = 1 if st[-1] > b else 0
+                elif op == EQUAL:
+                    b = pop(); st[-1] = 1 if st[-1] == b else 0
+                elif op == LOADN:
+                    n = pop()
+                    seg, off = pop()
+                    try:
+                        push(seg[off + n])
+                    except IndexError:
+                        raise VMError(f"Acesso fora do segmento (pc={pc - 1})")
+                elif op == STOREN:
+                    v = pop()
+                    n = pop()
+                    seg, off = pop()
+                    try:
+                        seg[off + n] = v
+                    except IndexError:
+                        raise VMError(f"Acesso fora do segmento (pc={pc - 1})")
+                elif op == PADD:
+                    n = pop()
+                    seg, off = pop()
+                    push((seg, off + n))
+                elif op == PUSHGP:
+                    push((gmem, 0))
+                elif op == PUSHFP:
+                    push((st, fp))
+                elif op == PUSHSP:
+                    push((st, len(st)))
+                elif op == DIV:
+                    b = pop()
+                    if b == 0:
+                        raise VMError(f"Divisão por zero (pc={pc - 1})")
+                    st[-1] = _trunc_div(st[-1], b)
+                elif op == MOD:
+                    b = pop()
+                    if b == 0:
+                        raise VMError(f"Divisão por zero (pc={pc - 1})")
+                    a = st[-1]
+                    st[-1] = a - b * _trunc_div(a, b)
+                elif op == AND:
+                    b = pop(); st[-1] = 1 if (st[-1] and b) else 0
+                elif op == OR:
+                    b = pop(); st[-1] = 1 if (st[-1] or b) else 0
+                elif op == NOT:
+                    st[-1] = 1 if st[-1] == 0 else 0
+                elif op == PUSHA:
+                    push(arg)
+                elif op == CALL:
+                    target = pop()
+                    calls.append((pc, fp))
+                    if len(calls) > depth:
+                        depth = len(calls)
+                    fp = len(st)
+                    pc = target
+                elif op == RETURN:
+                    if not calls:
+                        raise VMError(f"RETURN sem CALL (pc={pc - 1})")
+                    del st[fp:]
+                    pc, fp = calls.pop()
+                elif op == LOAD:
+                    seg, off = pop()
+                    try:
+                        push(seg[off + arg])
+                    except IndexError:
+                        raise VMError(f"Acesso fora do segmento (pc={pc - 1})")
+                elif op == STORE:
+                    v = pop()
+                    seg, off = pop()
+                    try:
+                        seg[off + arg] = v
+                    except IndexError:
+                        raise VMError(f"Acesso fora do segmento (pc={pc - 1})")
+                elif op == PUSHF:
+                    push(arg)
+                elif op == PUSHS:
+                    push(arg)
+                elif op == PUSHN:
+                    st.extend([0] * arg)
+                elif op == DUP:
+                    if arg == 1:
+                        push(st[-1])
+                    else:
+                        st.extend(st[-arg:])
+                elif op == DUPN:
+                    n = pop()
+                    st.extend(st[-n:])
+                elif op == POP:
+                    del st[len(st) - arg:]
+                elif op == POPN:
+                    n = pop()
+                    del st[len(st) - n:]
+                elif op == SWAP:
+                    st[-1], st[-2] = st[-2], st[-1]
+                elif op == ALLOC:
+                    push(([0] * arg, 0))
+                elif op == ALLOCN:
+                    push(([0] * pop(), 0))
+                elif op == FREE:
+                    pop()
+                elif op == FADD:
+                    b = pop(); st[-1] = float(st[-1]) + b
+                elif op == FSUB:
+                    b = pop(); st[-1] = float(st[-1]) - b
+                elif op == FMUL:
+                    b = pop(); st[-1] = float(st[-1]) * b
+                elif op == FDIV:
+                    b = pop()
+                    if b == 0:
+                        raise VMError(f"Divisão por zero (pc={pc - 1})")
+                    st[-1] = float(st[-1]) / b
+                elif op == FINF:
+                    b = pop(); st[-1] = 1 if st[-1] < b else 0
+                elif op == FINFEQ:
+                    b = pop(); st[-1] = 1 if st[-1] <= b else 0
+                elif op == FSUP:
+                    b = pop(); st[-1] = 1 if st[-1] > b else 0
+                elif op == FSUPEQ:
+                    b = pop(); st[-1] = 1 if st[-1] >= b else 0
+                elif op == ITOF:
+                    st[-1] = float(st[-1])
+                elif op == FTOI:
+                    st[-1] = int(st[-1])
+                elif op == ATOI:
+                    try:
+                        st[-1] = int(str(st[-1]).strip())
+                    except ValueError:
+                        raise VMError(f"ATOI: '{st[-1]}' não é um inteiro")
+                elif op == ATOF:
+                    try:
+                        st[-1] = float(str(st[-1]).strip())
+                    except ValueError:
+                        raise VMError(f"ATOF: '{st[-1]}' não é um real")
+                elif op == STRI:
+                    st[-1] = str(st[-1])
+                elif op == STRF:
+                    st[-1] = format_float(st[-1])
+                elif op == CONCAT:
+                    b = pop(); st[-1] = str(st[-1]) + str(b)
+                elif op == STRLEN:
+                    st[-1] = len(st[-1])
+                elif op == CHARAT:
+                    n = pop()
+                    s = st[-1]
+                    if not 0 <= n < len(s):
+                        raise VMError(f"CHARAT: índice {n} fora da string (pc={pc - 1})")
+                    st[-1] = ord(s[n])
+                elif op == CHRCODE:
+                    st[-1] = ord(st[-1][0])
+                elif op == CHECK:
+                    low, high = arg
+                    if not low <= st[-1] <= high:
+                        raise VMError(f"Índice {st[-1]} fora de [{low}, {high}] (pc={pc - 1})")
+                elif op == WRITEI:
+                    write(str(pop()))
+                elif op == WRITEF:
+                    write(format_float(pop()))
+                elif op == WRITES:
+                    write(str(pop()))
+                elif op == WRITELN:
+                    write("\n")
+                elif op == WRITECHR:
+                    write(chr(pop()))
+                elif op == READ:
+                    push(read())
+                elif op == START:
+                    # o que foi empilhado antes de START são as globais
+                    gmem.extend(st)
+                    del st[:]
+                    fp = 0
+                elif op == STOP:
+                    break
+                elif op == NOP:
+                    pass
+                elif op == ERR:
+                    raise VMError(arg)
+                else:
+                    raise VMError(f"Instrução não suportada: {OPNAMES[op]}")
+        except IndexError:
+            raise VMError(f"Acesso fora da pilha (pc={pc - 1})")
+        finally:
+            self.fp = fp
+            self.pc = pc
+            self.steps += steps
+            self.max_depth = depth
+            self.elapsed = time.perf_counter() - t0
+
+        return self
+
+
+# função de interface
+def run_ewvm(source, input_fn=None, output_fn=None, max_steps=None) -> VM:
+    program = assemble(source) if isinstance(source, (str, list)) else source
+    vm = VM(program, input_fn=input_fn, output_fn=output_fn, max_steps=max_steps)
+    return vm.run()
+
+
+if __name__ == '__main__':
+    # uso: python vm_ewvm.py programa.ewvm|programa.ewvb [--stats]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) != 1:
+        print("uso: python vm_ewvm.py programa.ewvm|programa.ewvb [--stats]", file=sys.stderr)
+        sys.exit(2)
+    with open(args[0], 'rb') as f:
+        binary = f.read(4) == b'EWVB'
+    try:
+        if binary:
+            import bytecode_ewvm
+            source = bytecode_ewvm.load(args[0])
+        else:
+            with open(args[0], encoding='utf-8') as f:
+                source = f.read()
+        vm = run_ewvm(source)
+    except VMError as e:
+        print(f"Erro na VM: {e}", file=sys.stderr)
+        sys.exit(1)
+    if '--stats' in sys.argv:
+        print(f"instrucoes: {vm.steps}  tempo: {vm.elapsed * 1000:.3f} ms", file=sys.stderr)